@@ -1,6 +1,10 @@
 import socket
 import time
 from client.CLI.player import Player
+from client.CLI.state_cache import StateCache
+from client.CLI.codec import SUPPORTED_CODECS, JSON_CODEC, BINARY_CODEC, encode_message, decode_message
+from client.CLI.framing import FrameReader, FrameWriter
+from client.CLI.countdown import Countdown
 import threading
 import json
 import logging
@@ -24,11 +28,24 @@ class Client:
         """
         username = input("Please enter your username: ")
         self.player = Player(username)
+        # Game state rebuilt from the server's numbered updates
+        self.state_cache = StateCache()
+        # Codec of the server's game state messages, responses are sent back with the same one
+        self.codec = JSON_CODEC
         self.game_event = None
         self.server = self.desktop
         self.port = 5555
         self.addr = (self.server, self.port)
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Reads whole frames from the server into one reusable buffer
+        self.frame_reader = FrameReader(self.client)
+        # Sends queued frames with one sendmsg call, header and message are never joined
+        self.frame_writer = FrameWriter(self.client)
+        # Acknowledgements and typed commands are sent from different threads, frames must not interleave
+        self.send_lock = threading.Lock()
+        # Counts down to the start of the game locally, the server only sends the deadline when it changes
+        self.countdown = Countdown()
+        self.countdown_thread = None
 
         self.connect_to_server()
         
@@ -61,7 +78,7 @@ class Client:
          while True:
             try:
                 # logging.info(f"About to receive message data...")
-                received_data = self.receive_with_length(self.client)
+                received_data = self.receive_with_length()
 
                 if not received_data:
                     print("No data received.")
@@ -72,22 +89,36 @@ class Client:
                 message_type = message['type']
                 content = message['content']
 
-                if message_type not in ['INIT', 'message', 'countdown', 'gameplay_data']:
+                if message_type not in ['INIT', 'catalog', 'message', 'countdown', 'gameplay_data']:
                      print('Invalid message type')
                      continue
                 
                 match message_type:
                     case 'countdown':
-                        print(f"Game starting in: {content}", end='\r')
+                        self.countdown.update(content)
+                        if self.countdown_thread is None or not self.countdown_thread.is_alive():
+                            self.countdown_thread = threading.Thread(target=self.countdown.show, daemon=True)
+                            self.countdown_thread.start()
                     case 'INIT':
                         self.send_acknowledgment(self.client, "Message received")
                         print(content)
+                    case 'catalog':
+                        # Game states only carry card ids, this maps them back to cards
+                        self.player.set_card_catalog(content['cards'])
                     case 'message':
                         print(content)
                     case 'gameplay_data':
+                        self.countdown.stop()
                         try:
-                            processed_state = self.process_state(content)
+                            state = self.state_cache.apply(content)
+                            if state is None:
+                                print("Missed a game state update, asking for the full state...")
+                                processed_state = {'type': 'ack', 'payload': "Resync"}
+                            else:
+                                processed_state = self.process_state(state)
                             if processed_state:
+                                # Tell the server which state this client has so it can send the next one as a patch
+                                processed_state['seq'] = self.state_cache.seq
                                 message = self.make_message(processed_state)
                                 self.send_acknowledgment(self.client, message)
                         except socket.error as e:
@@ -105,40 +136,43 @@ class Client:
         """
         while True:
             user_input = input()  # Get user input
-            message = {'type': 'action', 'payload': user_input}  # Construct message
-            command_to_send = self.make_message(message)  # Convert message to JSON
+            message = {'type': 'action', 'payload': user_input, 'seq': self.state_cache.seq}  # Construct message
+            command_to_send = self.make_message(message)  # Encode message with the server's codec
             self.send_with_length(self.client, command_to_send)  # Send message with length prefix
     
     def decode_message(self, message):
         """
-        This function decodes a JSON message.
+        This function decodes a message sent with either codec, JSON or binary.
         Args:
-            message (str): The message to decode.
+            message (str or bytes): The message to decode.
         Returns:
             dict: The decoded message.
         """
-        return json.loads(message)
+        if isinstance(message, bytes) and message[:1] != b'{':
+            self.codec = BINARY_CODEC
+        return decode_message(message)
 
     def send_with_length(self, client_socket, message):
         """
         This function sends a message with a 4-byte length prefix.
         Args:
             client_socket (socket): The client socket to send the message to.
-            message (str): The message to send.
+            message (str or bytes): The message to send, bytes if it is already encoded.
         """
-        message_length = str(len(message))  # Get message length
-        message_length = message_length.zfill(4)  # Pad with zeros to make it a 4-byte length prefix
-        full_message = message_length + message  # Concatenate the length prefix and the actual message
         try:
-            client_socket.send(full_message.encode())  # Send the full message
+            with self.send_lock:
+                self.frame_writer.send(message)  # Send the length prefix and the message, however many writes it takes
         except BrokenPipeError as e:
             logging.error(f"Client disconnected because: {str(e)}")  # Log error if client disconnects
             client_socket.close()  # Close the client socket
 
-    def receive_with_length(self, client_socket):
-        message_length = int(client_socket.recv(4).decode())
-        message = client_socket.recv(message_length).decode()
-        return message
+    def receive_with_length(self):
+        """
+        This function receives the next message from the server.
+        Returns:
+            bytes: The message, None once the server has closed the connection.
+        """
+        return self.frame_reader.read_frame()
 
     def send_acknowledgment(self, client_socket, ack):
         try:
@@ -149,7 +183,7 @@ class Client:
             print(f"Failed to send acknowledgment: {str(e)}")
 
     def make_message(self, message):
-        return json.dumps(message)
+        return encode_message(message, self.codec)
     
     def process_state(self, state):
 
@@ -161,8 +195,8 @@ class Client:
             return {'type': 'ack', 'payload': ack}
         elif phase == "DEALING":
             print(f"Dealing cards...")
-            hands = state.get('hands')
-            player_hand = hands.get(self.player.get_player_id())
+            # Only this player's hand is sent
+            player_hand = state.get('hand')
             # print(f"This is your hand: {player_hand}")
             self.player.set_hand(player_hand)
             self.player.print_hand()
@@ -189,7 +223,7 @@ class Client:
             current_player_username = current_player.get('username')
             trick = state.get('trick')
             player_num = state.get('player_num')
-            card = list(trick.values())[-1]
+            card = self.player.get_card(list(trick.values())[-1])
             print(f"{previous_player_username}, played {card}")
             if len(trick) < player_num:
                 if current_player_username == self.player.get_username():
@@ -204,8 +238,8 @@ class Client:
             winner = state.get('trick_winner')
             winner_name = winner.get('username')
             print(f"{winner_name} won this trick!")
-            hands = state.get('hands')
-            player_hand = hands.get(self.player.get_player_id())
+            # Only this player's hand is sent
+            player_hand = state.get('hand')
             # print(f"This is your hand: {player_hand}")
             self.player.set_hand(player_hand)
             self.player.print_hand()
@@ -221,7 +255,8 @@ class Client:
     
     def run(self):
         # logging.info(f"Sending username...")
-        player = json.dumps(self.player.to_dict())
+        # Offer every codec this client speaks, the server picks one
+        player = json.dumps({**self.player.to_dict(), 'codecs': list(SUPPORTED_CODECS)})
         
         self.send_with_length(self.client, player)
         # logging.info(f"Sent username")
@@ -0,0 +1,121 @@
+import asyncio
+import math
+import threading
+import time
+
+
+def format_seconds(seconds):
+    """
+    Formats a number of seconds left the way the lobby shows it, rounded up so 00:00 only shows once it is over.
+
+    Args:
+        seconds (float): The seconds left.
+
+    Returns:
+        str: The time left as MM:SS.
+    """
+    mins, secs = divmod(max(0, math.ceil(seconds)), 60)
+    return '{:02d}:{:02d}'.format(mins, secs)
+
+
+class Countdown:
+    """
+    The Countdown class counts down to the start of the game on the client's own clock. The server only sends
+    a countdown message when the deadline changes, with the deadline and its own time, so the client's clock
+    never has to agree with the server's: only the seconds left when the message was made are used.
+    """
+    def __init__(self, clock=time.monotonic):
+        """
+        Initializes a new instance of the Countdown class.
+
+        Args:
+            clock (callable): The function returning the client's current time in seconds.
+        """
+        self.clock = clock
+        # When the game starts on the client's clock, None while no countdown is running
+        self.deadline = None
+        # Set once the countdown is over, or the game has started
+        self.finished = threading.Event()
+
+    def update(self, content):
+        """
+        Moves the countdown to the deadline of a countdown message.
+
+        Args:
+            content (dict): The content of the message, the server's starts_at and server_time.
+        """
+        starts_at = content.get('starts_at')
+        if starts_at is None:
+            self.deadline = None
+        else:
+            self.deadline = self.clock() + starts_at - content.get('server_time')
+            self.finished.clear()
+
+    def seconds_left(self):
+        """
+        Returns the seconds until the game starts.
+
+        Returns:
+            float: The seconds left, None while no countdown is running.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.clock())
+
+    def next_wait(self):
+        """
+        Returns how long to wait before the time shown changes.
+
+        Returns:
+            float: The seconds until the next whole second left, or a second while no countdown is running.
+        """
+        seconds_left = self.seconds_left()
+        if not seconds_left:
+            return 1.0
+        return seconds_left % 1 or 1.0
+
+    def render(self):
+        """
+        Returns the line the lobby shows.
+
+        Returns:
+            str: The time left, or None while no countdown is running.
+        """
+        seconds_left = self.seconds_left()
+        if seconds_left is None:
+            return None
+        return f"Game starting in: {format_seconds(seconds_left)}"
+
+    def show(self):
+        """
+        Prints the time left every second until the countdown is over, for a client reading the server on a thread.
+        """
+        while not self.finished.is_set():
+            self.print_line()
+            self.finished.wait(self.next_wait())
+
+    async def show_async(self):
+        """
+        Prints the time left every second until the countdown is over, for a client on an event loop.
+        """
+        while not self.finished.is_set():
+            self.print_line()
+            await asyncio.sleep(self.next_wait())
+
+    def print_line(self):
+        """
+        Prints the time left over the previous line, and finishes the countdown once it reaches zero.
+        """
+        line = self.render()
+        if line is None:
+            return
+        print(line, end='\r')
+        if self.seconds_left() == 0:
+            print()
+            self.finished.set()
+
+    def stop(self):
+        """
+        Stops the countdown, once the game has started.
+        """
+        self.finished.set()
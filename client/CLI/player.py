@@ -12,6 +12,8 @@ class Player:
         self.username = username
         # List of cards representing the hand
         self.hand = []
+        # Card dicts indexed by card id, sent by the server when connecting
+        self.card_catalog = ()
         self.score = 0
         self.player_id = self.generate_unique_id()
     
@@ -33,11 +35,32 @@ class Player:
         """
         self.hand = hand
     
+    def set_card_catalog(self, card_catalog):
+        """
+        Set the catalog used to look up the cards behind the card ids the server sends.
+
+        Args:
+            card_catalog (list): The card dict of every card, indexed by card id.
+        """
+        self.card_catalog = card_catalog
+
+    def get_card(self, card_id):
+        """
+        Look up a card by its id.
+
+        Args:
+            card_id (int): The id of the card.
+
+        Returns:
+            dict: The card.
+        """
+        return self.card_catalog[card_id]
+
     def print_hand(self):
         print("Hand:\n")
         i = 0
-        for card in self.hand:
-            print(str(i) + ": " + str(card))
+        for card_id in self.hand:
+            print(str(i) + ": " + str(self.get_card(card_id)))
             i += 1
 
     def get_score(self):
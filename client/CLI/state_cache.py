@@ -0,0 +1,60 @@
+def apply_patch(document, patch):
+    """
+    Applies a JSON merge patch sent by the server without changing the document. A key set to None is
+    removed, a nested dict is patched key by key and any other value replaces the old one.
+
+    Args:
+        document (dict): The state to patch.
+        patch (dict): The patch.
+
+    Returns:
+        dict: The patched state.
+    """
+    result = dict(document)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class StateCache:
+    """
+    The StateCache class rebuilds the game state from the numbered updates the server sends. Each update is
+    a patch against a state the client acknowledged earlier (its base), or the full state when it has no
+    base. The states from the base onwards are kept, since the server never patches against an older one.
+    """
+    def __init__(self):
+        # Game states keyed by sequence number
+        self.states = {}
+        # Sequence number of the latest state, sent back with every response
+        self.seq = None
+
+    def apply(self, update):
+        """
+        Applies an update from the server.
+
+        Args:
+            update (dict): The update, with 'seq', 'base' and 'patch' keys.
+
+        Returns:
+            dict: The new game state, or None if the update's base is unknown. The cache is then cleared so
+                the next response asks for the full state.
+        """
+        base = update.get('base')
+        if base is None:
+            self.states = {}
+            state = apply_patch({}, update['patch'])
+        elif base in self.states:
+            self.states = {seq: state for seq, state in self.states.items() if seq >= base}
+            state = apply_patch(self.states[base], update['patch'])
+        else:
+            self.states = {}
+            self.seq = None
+            return None
+        self.seq = update['seq']
+        self.states[self.seq] = state
+        return state
@@ -2,6 +2,9 @@ import asyncio
 import websockets
 import json
 from player import Player
+from state_cache import StateCache
+from codec import SUPPORTED_CODECS, JSON_CODEC, BINARY_CODEC, encode_message, decode_message
+from countdown import Countdown
 
 class WebSocketClient:
     def __init__(self, uri="ws://192.168.86.34:8765"):
@@ -9,6 +12,13 @@ class WebSocketClient:
         self.websocket = None
         username = input("Please enter your username: ")
         self.player = Player(username)
+        # Game state rebuilt from the server's numbered updates
+        self.state_cache = StateCache()
+        # Codec of the server's game state messages, responses are sent back with the same one
+        self.codec = JSON_CODEC
+        # Counts down to the start of the game locally, the server only sends the deadline when it changes
+        self.countdown = Countdown()
+        self.countdown_task = None
       
     async def connect(self):
         self.websocket = await websockets.connect(self.uri)
@@ -28,22 +38,35 @@ class WebSocketClient:
                 message_type = message['type']
                 content = message['content']
 
-                if message_type not in ['INIT', 'message', 'countdown', 'gameplay_data']:
+                if message_type not in ['INIT', 'catalog', 'message', 'countdown', 'gameplay_data']:
                     print('Invalid message type')
                     continue
 
                 match message_type:
                     case 'countdown':
-                        print(f"Game starting in: {content}", end='\r')
+                        self.countdown.update(content)
+                        if self.countdown_task is None or self.countdown_task.done():
+                            self.countdown_task = asyncio.create_task(self.countdown.show_async())
                     case 'INIT':
                         # await self.send_acknowledgment("Message received")
                         print(content)
+                    case 'catalog':
+                        # Game states only carry card ids, this maps them back to cards
+                        self.player.set_card_catalog(content['cards'])
                     case 'message':
                         print(content)
                     case 'gameplay_data':
+                        self.countdown.stop()
                         try:
-                            processed_state = self.process_state(content)
+                            state = self.state_cache.apply(content)
+                            if state is None:
+                                print("Missed a game state update, asking for the full state...")
+                                processed_state = {'type': 'ack', 'payload': "Resync"}
+                            else:
+                                processed_state = self.process_state(state)
                             if processed_state:
+                                # Tell the server which state this client has so it can send the next one as a patch
+                                processed_state['seq'] = self.state_cache.seq
                                 message = self.make_message(processed_state)
                                 print(message)
                                 await self.send_acknowledgment(message)
@@ -55,7 +78,7 @@ class WebSocketClient:
                 break
     
     def make_message(self, message):
-        return json.dumps(message)
+        return encode_message(message, self.codec)
 
     def process_state(self, state):
         phase = state.get('phase')
@@ -66,8 +89,8 @@ class WebSocketClient:
             return {'type': 'ack', 'payload': ack}
         elif phase == "DEALING":
             print(f"Dealing cards...")
-            hands = state.get('hands')
-            player_hand = hands.get(self.player.get_player_id())
+            # Only this player's hand is sent
+            player_hand = state.get('hand')
             # print(f"This is your hand: {player_hand}")
             self.player.set_hand(player_hand)
             self.player.print_hand()
@@ -94,7 +117,7 @@ class WebSocketClient:
             current_player_username = current_player.get('username')
             trick = state.get('trick')
             player_num = state.get('player_num')
-            card = list(trick.values())[-1]
+            card = self.player.get_card(list(trick.values())[-1])
             print(f"{previous_player_username}, played {card}")
             if len(trick) < player_num:
                 if current_player_username == self.player.get_username():
@@ -109,8 +132,8 @@ class WebSocketClient:
             winner = state.get('trick_winner')
             winner_name = winner.get('username')
             print(f"{winner_name} won this trick!")
-            hands = state.get('hands')
-            player_hand = hands.get(self.player.get_player_id())
+            # Only this player's hand is sent
+            player_hand = state.get('hand')
             # print(f"This is your hand: {player_hand}")
             self.player.set_hand(player_hand)
             self.player.print_hand()
@@ -129,8 +152,8 @@ class WebSocketClient:
         loop = asyncio.get_event_loop()
         while True:
             user_input = await loop.run_in_executor(None, input)  # Get user input
-            message = {'type': 'action', 'payload': user_input}  # Construct message
-            command_to_send = json.dumps(message)  # Convert message to JSON
+            message = {'type': 'action', 'payload': user_input, 'seq': self.state_cache.seq}  # Construct message
+            command_to_send = self.make_message(message)  # Encode message with the server's codec
             await self.websocket.send(command_to_send)  # Send message with websocket
     
     async def send_acknowledgment(self, ack):
@@ -143,17 +166,20 @@ class WebSocketClient:
 
     def decode_message(self, message):
         """
-        This function decodes a JSON message.
+        This function decodes a message sent with either codec, JSON or binary.
         Args:
-            message (str): The message to decode.
+            message (str or bytes): The message to decode.
         Returns:
             dict: The decoded message.
         """
-        return json.loads(message)
+        if isinstance(message, bytes) and message[:1] != b'{':
+            self.codec = BINARY_CODEC
+        return decode_message(message)
 
 async def main():
     client = WebSocketClient()
-    player = json.dumps(client.player.to_dict())
+    # Offer every codec this client speaks, the server picks one
+    player = json.dumps({**client.player.to_dict(), 'codecs': list(SUPPORTED_CODECS)})
     await client.connect()
     asyncio.create_task(client.send_message())
     await client.websocket.send(player)
@@ -7,6 +7,8 @@ import UsernameContext from '../Context/username-context'
 import {v4 as uuidv4} from 'uuid';
 import { initiateConnection } from "../Connect/WebSocket";
 
+let countdownInterval = null
+
 function Join(props) {
   const userNameContext = useContext(UsernameContext);
   const router = useRouter();
@@ -15,6 +17,27 @@ function Join(props) {
     userNameContext.setUsername(event.target.value)
   }
 
+  // The server only sends the deadline when it changes, the time left is counted down here
+  const startCountdown = ({starts_at, server_time}) => {
+    clearInterval(countdownInterval)
+    if (starts_at === null) {
+      userNameContext.setCountdown("")
+      return
+    }
+    const deadline = Date.now() + (starts_at - server_time) * 1000
+    const tick = () => {
+      const secondsLeft = Math.max(0, Math.ceil((deadline - Date.now()) / 1000))
+      const mins = String(Math.floor(secondsLeft / 60)).padStart(2, "0")
+      const secs = String(secondsLeft % 60).padStart(2, "0")
+      userNameContext.setCountdown(`${mins}:${secs}`)
+      if (secondsLeft === 0) {
+        clearInterval(countdownInterval)
+      }
+    }
+    tick()
+    countdownInterval = setInterval(tick, 250)
+  }
+
   const joinClickHandler = () => {
 
       const socket = initiateConnection();
@@ -30,7 +53,7 @@ function Join(props) {
           userNameContext.setPlayers(message.content);
         }
         else if (message.type === "countdown") {
-          userNameContext.setCountdown(message.content)
+          startCountdown(message.content)
         }
       }
       
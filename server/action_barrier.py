@@ -0,0 +1,122 @@
+import asyncio
+
+
+class ActionBarrier:
+    """
+    The ActionBarrier class collects one response (an action or an acknowledgement) per player for the current
+    game step. The game awaits it instead of polling, so a table that is waiting on its players costs nothing
+    until the response it is waiting for arrives.
+    """
+    def __init__(self, maxsize):
+        """
+        Initializes a new instance of the ActionBarrier class.
+
+        Args:
+            maxsize (int): The number of responses that complete the barrier, normally the number of players.
+        """
+        self.maxsize = maxsize
+        # Responses keyed by player id, kept in the order they arrived
+        self.responses = {}
+        # List of (future, predicate) pairs for coroutines waiting on the barrier
+        self.waiters = []
+
+    def qsize(self):
+        """
+        Returns the number of players that have responded.
+
+        Returns:
+            int: The number of collected responses.
+        """
+        return len(self.responses)
+
+    def full(self):
+        """
+        Returns a boolean indicating whether every player has responded.
+
+        Returns:
+            bool: True if the barrier is complete, False otherwise.
+        """
+        return len(self.responses) >= self.maxsize
+
+    def empty(self):
+        """
+        Returns a boolean indicating whether there are no responses left to process.
+
+        Returns:
+            bool: True if no responses are collected, False otherwise.
+        """
+        return not self.responses
+
+    def put_nowait(self, player_id, response):
+        """
+        Records a player's response and wakes any waiter whose condition is now met. A second response from
+        the same player replaces the first one, so one player cannot complete the barrier alone.
+
+        Args:
+            player_id (str): The ID of the player that responded.
+            response (dict): The action or acknowledgement sent by the player.
+        """
+        self.responses.pop(player_id, None)
+        self.responses[player_id] = response
+        self.notify()
+
+    async def put(self, player_id, response):
+        """
+        Records a player's response. Provided so callers can use the barrier like an asyncio.Queue.
+
+        Args:
+            player_id (str): The ID of the player that responded.
+            response (dict): The action or acknowledgement sent by the player.
+        """
+        self.put_nowait(player_id, response)
+
+    def get_nowait(self):
+        """
+        Removes and returns the oldest collected response.
+
+        Returns:
+            dict: The oldest response.
+        """
+        player_id = next(iter(self.responses))
+        return self.responses.pop(player_id)
+
+    async def get(self):
+        """
+        Removes and returns the oldest collected response, waiting for one if there is none yet.
+
+        Returns:
+            dict: The oldest response.
+        """
+        await self.wait_for(lambda: not self.empty())
+        return self.get_nowait()
+
+    async def wait_full(self):
+        """
+        Waits until every player has responded.
+        """
+        await self.wait_for(self.full)
+
+    async def wait_for(self, predicate):
+        """
+        Waits until the given condition on the barrier holds. The waiter is only woken by a response that
+        makes the condition true.
+
+        Args:
+            predicate (callable): A function with no arguments returning True once the wait is over.
+        """
+        while not predicate():
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (waiter, predicate)
+            self.waiters.append(entry)
+            try:
+                await waiter
+            finally:
+                self.waiters.remove(entry)
+
+    def notify(self):
+        """
+        Wakes every waiter whose condition holds.
+        """
+        for waiter, predicate in self.waiters:
+            if not waiter.done() and predicate():
+                waiter.set_result(True)
@@ -0,0 +1,107 @@
+import numpy as np
+from deck import CARD_CATALOG
+from game import TRICK_DOMINANCE, LEADING_SUITS, LEADING_SUIT_INDEX, NUM_CARDS
+
+# TRICK_DOMINANCE viewed as [leading suit index, challenger, winning card]
+DOMINANCE = np.frombuffer(TRICK_DOMINANCE, dtype=np.uint8).reshape(len(LEADING_SUITS), NUM_CARDS, NUM_CARDS).astype(bool)
+
+# Leading suit index a card sets when it is led, or -1 for cards that leave the lead to the next card
+LEAD_BY_CARD = np.array([
+    LEADING_SUIT_INDEX[card.suit] if card.suit is not None
+    else LEADING_SUIT_INDEX['None Pirate'] if card.type in ['Pirate', 'Skull King', 'Kraken', 'White Whale', 'Mermaid']
+    else -1
+    for card in CARD_CATALOG
+])
+# Bonus of each suited card, and the Pirate bonus that only counts after a Skull King in the same trick
+SUIT_BONUS_BY_CARD = np.array([card.bonus if card.suit is not None else 0 for card in CARD_CATALOG])
+PIRATE_BONUS_BY_CARD = np.array([card.bonus if card.type == 'Pirate' else 0 for card in CARD_CATALOG])
+IS_SKULL_KING = np.array([card.type == 'Skull King' for card in CARD_CATALOG])
+
+
+def leading_suits(cards):
+    """
+    Finds the leading suit of many tricks at once, the same way Game.validate_play_card sets it.
+
+    Args:
+        cards (ndarray): Card ids of shape (..., players), in the order they were played.
+
+    Returns:
+        ndarray: Index into game.LEADING_SUITS for every trick, of shape (...).
+    """
+    leads = LEAD_BY_CARD[cards]
+    sets_lead = leads >= 0
+    first_lead = np.argmax(sets_lead, axis=-1)
+    lead = np.take_along_axis(leads, first_lead[..., None], axis=-1)[..., 0]
+    # Tricks made of escapes only keep the escape lead
+    return np.where(sets_lead.any(axis=-1), lead, LEADING_SUIT_INDEX['None Escape'])
+
+
+def resolve_tricks(cards):
+    """
+    Resolves many tricks at once, the same way Game.resolve_trick does.
+
+    Args:
+        cards (ndarray): Card ids of shape (..., players), in the order they were played.
+
+    Returns:
+        ndarray: Position in play order of the winning card of every trick, of shape (...).
+    """
+    cards = np.asarray(cards)
+    lead = leading_suits(cards)
+    winning_card = cards[..., 0]
+    winner = np.zeros(cards.shape[:-1], dtype=np.int64)
+    for position in range(1, cards.shape[-1]):
+        takes_trick = DOMINANCE[lead, cards[..., position], winning_card]
+        winning_card = np.where(takes_trick, cards[..., position], winning_card)
+        winner = np.where(takes_trick, position, winner)
+    return winner
+
+
+def trick_bonuses(cards):
+    """
+    Adds up the bonus points in many tricks at once, the same way game.trick_bonus does for one trick.
+
+    Args:
+        cards (ndarray): Card ids of shape (..., players), in the order they were played.
+
+    Returns:
+        ndarray: Bonus points in every trick, of shape (...).
+    """
+    cards = np.asarray(cards)
+    skull_kings = IS_SKULL_KING[cards]
+    skull_king_played_before = (np.cumsum(skull_kings, axis=-1) - skull_kings) > 0
+    bonus = SUIT_BONUS_BY_CARD[cards] + np.where(skull_king_played_before, PIRATE_BONUS_BY_CARD[cards], 0)
+    return bonus.sum(axis=-1)
+
+
+def score_rounds(cards, first_seats, bids):
+    """
+    Resolves and scores a batch of complete rounds.
+
+    Args:
+        cards (ndarray): Card ids of shape (games, tricks, players), in the order they were played in each
+            trick. The number of tricks is the round number.
+        first_seats (ndarray): Seat of the player who led each trick, of shape (games, tricks). Play goes
+            round the table from there, as in Game.advance_turn.
+        bids (ndarray): Bid of each seat, of shape (games, players).
+
+    Returns:
+        dict: Arrays with the winning seat of every trick ('winners', shape (games, tricks)) and, per seat
+            (shape (games, players)), the tricks won ('tricks_won'), the bonus points in those tricks
+            ('bonuses') and the round score ('round_scores').
+    """
+    cards = np.asarray(cards)
+    first_seats = np.asarray(first_seats)
+    bids = np.asarray(bids)
+    num_games, round_number, num_players = cards.shape
+
+    winners = (first_seats + resolve_tricks(cards)) % num_players
+    won_by_seat = winners[..., None] == np.arange(num_players)
+    tricks_won = won_by_seat.sum(axis=1)
+    bonuses = (won_by_seat * trick_bonuses(cards)[..., None]).sum(axis=1)
+
+    zero_bid_scores = np.where(tricks_won == 0, round_number * 10, round_number * -10)
+    bid_scores = np.where(tricks_won == bids, bids * 20 + bonuses, np.abs(bids - tricks_won) * -10)
+    round_scores = np.where(bids == 0, zero_bid_scores, bid_scores)
+
+    return {'winners': winners, 'tricks_won': tricks_won, 'bonuses': bonuses, 'round_scores': round_scores}
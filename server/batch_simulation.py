@@ -0,0 +1,215 @@
+import os
+import random
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from simulation import Simulator, RandomPolicy
+from deck import CARD_CATALOG
+
+
+class SimulationStats:
+    """
+    The SimulationStats class aggregates the results of many simulated games. Each worker fills its own
+    instance and only these aggregates travel back to the parent process, where they are merged.
+    """
+    def __init__(self):
+        """
+        Initializes a new, empty instance of the SimulationStats class.
+        """
+        self.games = 0
+        # Number of players finishing a game on each final score
+        self.final_scores = Counter()
+        # Number of bids made, and of bids met exactly, for each bid value
+        self.bids_made = Counter()
+        self.bids_met = Counter()
+        # Number of times each card id was played, and how often it was in a trick its player won
+        self.card_plays = [0] * len(CARD_CATALOG)
+        self.card_wins = [0] * len(CARD_CATALOG)
+
+    def trick_resolved(self, game, trick, winner_id):
+        """
+        Records which cards were played in a trick and which of them won it.
+
+        Args:
+            game (Game): The game being played.
+            trick (dict): The card id played by each player, keyed by player ID.
+            winner_id (str): The ID of the player that won the trick.
+        """
+        for player_id, card_id in trick.items():
+            self.card_plays[card_id] += 1
+            if player_id == winner_id:
+                self.card_wins[card_id] += 1
+
+    def round_scored(self, game):
+        """
+        Records how each bid in the round turned out.
+
+        Args:
+            game (Game): The game being played.
+        """
+        tricks_won = game.get_tricks_won()
+        for player_id, bid in game.get_bids().items():
+            self.bids_made[bid] += 1
+            if tricks_won.get(player_id, 0) == bid:
+                self.bids_met[bid] += 1
+
+    def game_finished(self, game):
+        """
+        Records the final scores of a game.
+
+        Args:
+            game (Game): The finished game.
+        """
+        self.games += 1
+        self.final_scores.update(game.get_score_sheet().values())
+
+    def merge(self, other):
+        """
+        Adds the results gathered by another instance to this one.
+
+        Args:
+            other (SimulationStats): The results to add.
+        """
+        self.games += other.games
+        self.final_scores.update(other.final_scores)
+        self.bids_made.update(other.bids_made)
+        self.bids_met.update(other.bids_met)
+        for card_id in range(len(CARD_CATALOG)):
+            self.card_plays[card_id] += other.card_plays[card_id]
+            self.card_wins[card_id] += other.card_wins[card_id]
+
+    def bid_accuracy(self):
+        """
+        Returns the share of bids that were met exactly, for each bid value.
+
+        Returns:
+            dict: The accuracy of each bid value, keyed by bid.
+        """
+        return {bid: self.bids_met[bid] / made for bid, made in sorted(self.bids_made.items())}
+
+    def card_win_rates(self):
+        """
+        Returns how often each card was in a trick won by the player who played it.
+
+        Returns:
+            list: The win rate of each card id, or None for cards never played.
+        """
+        return [wins / plays if plays else None for wins, plays in zip(self.card_wins, self.card_plays)]
+
+    def score_percentiles(self, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Returns the final scores at the given percentiles.
+
+        Args:
+            percentiles (tuple): The percentiles to look up.
+
+        Returns:
+            dict: The score at each percentile, keyed by percentile.
+        """
+        total = sum(self.final_scores.values())
+        results = {}
+        scores = sorted(self.final_scores.items())
+        for percentile in percentiles:
+            seen = 0
+            for score, count in scores:
+                seen += count
+                if seen * 100 >= percentile * total:
+                    results[percentile] = score
+                    break
+        return results
+
+
+def shard_seeds(master_seed, shards):
+    """
+    Derives one seed per shard from the master seed.
+
+    Args:
+        master_seed (int): The seed of the whole batch.
+        shards (int): The number of shards.
+
+    Returns:
+        list: The seed of each shard.
+    """
+    master_rng = random.Random(master_seed)
+    return [master_rng.getrandbits(64) for _ in range(shards)]
+
+
+def run_shard(num_games, num_players, seed):
+    """
+    Plays one shard of the batch. Runs inside a worker process.
+
+    Args:
+        num_games (int): The number of games in the shard.
+        num_players (int): The number of players per game.
+        seed (int): The seed of the shard.
+
+    Returns:
+        SimulationStats: The aggregated results of the shard.
+    """
+    shard_rng = random.Random(seed)
+    stats = SimulationStats()
+    policies = [RandomPolicy(random.Random(shard_rng.getrandbits(64))) for _ in range(num_players)]
+    simulator = Simulator(num_players, policies, observer=stats, rng=shard_rng)
+    for game_number in range(num_games):
+        simulator.play_game(game_number)
+    return stats
+
+
+def run_batch(num_games, num_players=4, workers=1, master_seed=0, shards=None):
+    """
+    Plays a batch of games spread over a pool of worker processes.
+
+    The games are split into a fixed number of shards, each with its own seed derived from the master seed.
+    The results only depend on the number of games, players and shards and the master seed, not on the
+    number of workers or the order the shards finish in.
+
+    Args:
+        num_games (int): The number of games to play.
+        num_players (int): The number of players per game.
+        workers (int): The number of worker processes. 1 plays every shard in this process.
+        master_seed (int): The seed of the whole batch.
+        shards (int): The number of shards to split the games into. Defaults to 64.
+
+    Returns:
+        SimulationStats: The merged results of every shard.
+    """
+    if shards is None:
+        shards = 64
+    shards = max(1, min(shards, num_games))
+    games_per_shard = [num_games // shards + (1 if shard < num_games % shards else 0) for shard in range(shards)]
+    seeds = shard_seeds(master_seed, shards)
+
+    stats = SimulationStats()
+    if workers == 1:
+        for shard_games, seed in zip(games_per_shard, seeds):
+            stats.merge(run_shard(shard_games, num_players, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_stats in executor.map(run_shard, games_per_shard, [num_players] * shards, seeds):
+                stats.merge(shard_stats)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a batch of Pirate King games across worker processes.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=64)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = run_batch(args.games, args.players, args.workers, args.seed, args.shards)
+    seconds = time.perf_counter() - start
+
+    print(f"Played {stats.games} games on {args.workers} workers in {seconds:.2f}s ({stats.games / seconds:.0f} games/s)")
+    print(f"Final score percentiles: {stats.score_percentiles()}")
+    print("Bid accuracy:")
+    for bid, accuracy in stats.bid_accuracy().items():
+        print(f"  bid {bid:2d}: {accuracy:6.1%} of {stats.bids_made[bid]} bids")
+    print("Trick win rate per card:")
+    for card_id, win_rate in enumerate(stats.card_win_rates()):
+        if win_rate is not None:
+            print(f"  {card_id:2d} {str(CARD_CATALOG[card_id]):<55} {win_rate:6.1%}")
@@ -0,0 +1,87 @@
+"""
+Size and speed of the binary codec against JSON, for the messages of every phase.
+
+Replays random games like bench_state_bandwidth.py and collects, per phase, the gameplay_data messages
+one player is sent: the full state the servers used to send and the numbered patch they send now. Each
+message is encoded and decoded with both codecs.
+
+Run from the server directory:
+    python benchmarks/bench_codec.py --games 20 --players 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_state_bandwidth import game_states
+from codec import BINARY_CODEC, JSON_CODEC, encode_message, decode_message
+from phase import Phase
+from projections import project_game_state, project_private_states
+from state_delta import StateHistory
+
+
+def collect_messages(num_games, num_players):
+    """
+    Returns:
+        dict: (full messages, patch messages) sent to player0, keyed by phase.
+    """
+    messages = defaultdict(lambda: ([], []))
+    for seed in range(num_games):
+        history = StateHistory()
+        for game in game_states(num_players, seed):
+            public_state = project_game_state(game)
+            private_states = project_private_states(game)
+            history.push(public_state, private_states)
+            full_messages, patch_messages = messages[game.phase.value]
+            full_messages.append({'type': 'gameplay_data',
+                                  'content': {**public_state, **private_states.get('player0', {})}})
+            base = history.base_for('player0')
+            patch = {**history.public_patch(base), **history.private_patch(base, 'player0')}
+            patch_messages.append({'type': 'gameplay_data', 'content': {'seq': history.seq, 'base': base, 'patch': patch}})
+            history.acknowledge('player0', history.seq)
+    return messages
+
+
+def measure(messages, message_codec, repeat):
+    """
+    Returns:
+        tuple: (mean encoded bytes, encodes per second, decodes per second)
+    """
+    encoded = [encode_message(message, message_codec) for message in messages]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            encode_message(message, message_codec)
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in encoded:
+            decode_message(frame)
+    decode_seconds = time.perf_counter() - start
+    count = len(messages) * repeat
+    return sum(map(len, encoded)) / len(encoded), count / encode_seconds, count / decode_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = collect_messages(args.games, args.players)
+    print(f"{'phase':>16} {'kind':>5}  {'json B':>7} {'bin B':>6} {'ratio':>6}  "
+          f"{'json enc/s':>10} {'bin enc/s':>10}  {'json dec/s':>10} {'bin dec/s':>10}")
+    for phase in Phase:
+        for kind, phase_messages in zip(("full", "patch"), messages[phase.value]):
+            json_size, json_encodes, json_decodes = measure(phase_messages, JSON_CODEC, args.repeat)
+            binary_size, binary_encodes, binary_decodes = measure(phase_messages, BINARY_CODEC, args.repeat)
+            print(f"{phase.value:>16} {kind:>5}  {json_size:7.0f} {binary_size:6.0f} {json_size / binary_size:5.1f}x  "
+                  f"{json_encodes:10.0f} {binary_encodes:10.0f}  {json_decodes:10.0f} {binary_decodes:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
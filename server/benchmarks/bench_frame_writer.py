@@ -0,0 +1,97 @@
+"""
+Send cost of a burst of frames to many clients.
+
+Each burst is a countdown, a game state and a prompt sent to every client over local socket pairs. The old
+path built each frame with a string concatenation and sent it with its own send call, the FrameWriter queues
+the header and message buffers of the whole burst and sends them with one sendmsg call per client.
+
+Run from the server directory:
+    python benchmarks/bench_frame_writer.py --clients 50 --bursts 2000
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framing import FrameWriter
+from bench_state_bandwidth import game_states
+from phase import Phase
+from projections import project_game_state
+
+
+def legacy_send(sock, message):
+    """
+    The send path Server used before framing.py, one concatenated frame per send call.
+    """
+    message_length = str(len(message)).zfill(4)
+    sock.send(message_length.encode() + message.encode())
+
+
+def drain(sock):
+    """
+    Reads and discards everything sent to a socket until it is closed.
+    """
+    while sock.recv(1 << 16):
+        pass
+
+
+def measure(mode, clients, bursts, burst):
+    """
+    Sends the given number of bursts to every client.
+
+    Returns:
+        tuple: (bursts delivered per second, send system calls per burst and client).
+    """
+    pairs = [socket.socketpair() for _ in range(clients)]
+    readers = [threading.Thread(target=drain, args=(receiver,)) for _, receiver in pairs]
+    for reader in readers:
+        reader.start()
+    writers = [FrameWriter(sender) for sender, _ in pairs]
+
+    calls = 0
+    start = time.perf_counter()
+    for _ in range(bursts):
+        for (sender, _), writer in zip(pairs, writers):
+            if mode == "legacy":
+                for message in burst:
+                    legacy_send(sender, message)
+                calls += len(burst)
+            else:
+                for message in burst:
+                    writer.queue(message)
+                writer.flush()
+                calls += 1
+    elapsed = time.perf_counter() - start
+
+    for sender, _ in pairs:
+        sender.close()
+    for reader in readers:
+        reader.join()
+    for _, receiver in pairs:
+        receiver.close()
+    return bursts * clients / elapsed, calls / (bursts * clients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--bursts", type=int, default=2000)
+    args = parser.parse_args()
+
+    state = project_game_state(next(game for game in game_states(4, seed=1) if game.phase == Phase.PLAYING))
+    burst = [json.dumps({'type': 'countdown', 'content': '00:05'}),
+             json.dumps({'type': 'gameplay_data', 'content': {'seq': 1, 'base': None, 'patch': state}}),
+             json.dumps({'type': 'message', 'content': "Your turn, please play a card: "})]
+    print(f"burst of {len(burst)} frames, {sum(map(len, burst))} bytes")
+    for mode in ("legacy", "writer"):
+        rate, calls = measure(mode, args.clients, args.bursts, burst)
+        print(f"{mode:>8}: {rate:10.0f} client bursts/s, {calls:.1f} send calls per client burst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Frame reading throughput over a local socket pair.
+
+A sender thread writes length prefixed messages as fast as it can and the receiver reads them back. The old
+reader does a recv for the 4 ASCII digit length and another for the message (looping until the message is
+complete, which the original code did not do). The FrameReader receives into one reusable buffer and
+returns every complete frame it holds before reading again.
+
+Run from the server directory:
+    python benchmarks/bench_framing.py --messages 200000 --sizes 64 512 4096
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framing import FrameReader, make_frame
+
+
+def make_legacy_frame(message):
+    """
+    The zero padded ASCII length prefix Server used before framing.py.
+    """
+    return str(len(message)).zfill(4).encode() + message
+
+
+class LegacyReader:
+    """
+    The recv(4) then recv(n) reader, corrected to keep reading until each part is complete.
+    """
+    def __init__(self, sock):
+        self.sock = sock
+
+    def receive_exactly(self, length):
+        data = self.sock.recv(length)
+        while len(data) < length:
+            data += self.sock.recv(length - len(data))
+        return data
+
+    def read_frame(self):
+        message_length = int(self.receive_exactly(4).decode())
+        return self.receive_exactly(message_length)
+
+
+def measure(mode, messages, size, batch=64):
+    """
+    Streams the given number of messages of the given size through a socket pair.
+
+    Returns:
+        tuple: (messages per second, megabytes of payload per second).
+    """
+    sender_end, receiver_end = socket.socketpair()
+    message = b'm' * size
+    frame = make_frame(message) if mode == "framing" else make_legacy_frame(message)
+
+    def send():
+        # Senders batch frames the way a broadcast to a busy client queues them up
+        burst = frame * batch
+        for _ in range(messages // batch):
+            sender_end.sendall(burst)
+
+    sender = threading.Thread(target=send)
+    reader = FrameReader(receiver_end) if mode == "framing" else LegacyReader(receiver_end)
+    total = (messages // batch) * batch
+    start = time.perf_counter()
+    sender.start()
+    for _ in range(total):
+        received = reader.read_frame()
+    elapsed = time.perf_counter() - start
+    sender.join()
+    assert received == message
+    sender_end.close()
+    receiver_end.close()
+    return total / elapsed, total * size / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--sizes", type=int, nargs='+', default=[64, 512, 4096])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for mode in ("legacy", "framing"):
+            if mode == "legacy" and size > 9999:
+                print(f"{mode:>8}: {size:6d} byte messages do not fit a 4 digit length prefix")
+                continue
+            rate, throughput = measure(mode, args.messages, size)
+            print(f"{mode:>8}: {size:6d} byte messages, {rate:10.0f} messages/s, {throughput:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
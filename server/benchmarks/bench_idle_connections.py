@@ -0,0 +1,113 @@
+"""
+Cost of idle TCP connections on the event loop server compared with one thread per client.
+
+Opens a number of connections that never send anything, so every one of them sits in the INIT state waiting
+for its player, and reports the threads and resident memory the server needed to hold them. The thread mode
+runs the accept loop Server used before it moved to asyncio streams: one OS thread blocked in recv per socket.
+
+Run from the server directory:
+    python benchmarks/bench_idle_connections.py --connections 5000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import Server, raise_open_file_limit
+
+
+def resident_memory():
+    """
+    Returns the resident memory of this process in bytes, 0 where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+
+def start_event_loop_server(server):
+    """
+    Serves on a background event loop, the one thread every connection shares.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_until_complete, args=(server.serve(),), daemon=True).start()
+
+
+def start_threaded_server(server):
+    """
+    Serves the way Server did before, with a thread per accepted socket blocked reading its first message.
+    """
+    def idle_client(client_socket):
+        try:
+            client_socket.recv(4)
+        except OSError:
+            pass
+
+    def accept_connections():
+        while True:
+            client_socket, _ = server.server_socket.accept()
+            threading.Thread(target=idle_client, args=(client_socket,), daemon=True).start()
+
+    threading.Thread(target=accept_connections, daemon=True).start()
+
+
+def measure(mode, connections):
+    """
+    Opens the given number of idle connections to a server running in the given mode.
+
+    Returns:
+        tuple: (seconds to connect, extra threads, extra resident bytes) once every connection is accepted.
+    """
+    server = Server(('127.0.0.1', 0))
+    port = server.server_socket.getsockname()[1]
+    threads_before = threading.active_count()
+    memory_before = resident_memory()
+    if mode == "asyncio":
+        start_event_loop_server(server)
+    else:
+        start_threaded_server(server)
+
+    start = time.perf_counter()
+    clients = [socket.create_connection(('127.0.0.1', port)) for _ in range(connections)]
+    # Let the server pick up the last connections
+    time.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    threads = threading.active_count() - threads_before
+    memory = resident_memory() - memory_before
+
+    for client in clients:
+        client.close()
+    server.server_socket.close()
+    return elapsed, threads, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--mode", choices=("asyncio", "threads", "both"), default="both")
+    args = parser.parse_args()
+    raise_open_file_limit()
+    logging.disable(logging.CRITICAL)
+
+    modes = ("asyncio", "threads") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        # The server prints every connection it loses, keep that out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, threads, memory = measure(mode, args.connections)
+            time.sleep(0.5)
+        print(f"{mode:>8}: {args.connections} idle connections in {elapsed:5.2f}s, {threads:6d} extra threads, "
+              f"{memory / 1024 / 1024:7.1f} MiB extra resident ({memory / args.connections / 1024:5.1f} KiB each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Event loop utilisation with many idle tables.
+
+Starts a number of games that are all waiting for their players to respond and measures how much CPU the
+event loop burns while nobody acts. The ActionBarrier used by Game is compared against the old
+`while not queue.full(): await asyncio.sleep(0)` polling loop.
+
+Run from the server directory:
+    python benchmarks/bench_idle_tables.py --tables 1000 --seconds 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_barrier import ActionBarrier
+from game import Game
+
+
+def make_players(num_players):
+    return [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(num_players)]
+
+
+async def polling_wait(action_queue):
+    """
+    The wait loop Game used before the ActionBarrier.
+    """
+    while not action_queue.full():
+        await asyncio.sleep(0)
+
+
+async def measure(tables, seconds, mode, num_players=4):
+    """
+    Parks the given number of tables and samples CPU time against wall time.
+
+    Returns:
+        tuple: (utilisation, loop iterations per second) while the tables are idle.
+    """
+    tasks = []
+    for table in range(tables):
+        if mode == "barrier":
+            game = Game(make_players(num_players), str(table), Mock(), {}, ActionBarrier(num_players))
+            tasks.append(asyncio.create_task(game.can_advance_game_state()))
+        else:
+            tasks.append(asyncio.create_task(polling_wait(asyncio.Queue(maxsize=num_players))))
+
+    # Let every table reach its wait point before sampling
+    await asyncio.sleep(0.1)
+
+    iterations = 0
+    deadline = time.perf_counter() + seconds
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    # A 10ms sleep probe falls behind when the loop is busy serving the other tables
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+        iterations += 1
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return cpu / wall, iterations / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for mode in ("barrier", "polling"):
+        utilisation, probe_rate = asyncio.run(measure(args.tables, args.seconds, mode))
+        print(f"{mode:>8}: {args.tables} idle tables, event loop CPU utilisation {utilisation:6.1%}, "
+              f"10ms probe ran {probe_rate:6.1f}/s (ideal ~100/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Countdown messages sent per lobby, with deadline messages against one message per player per second.
+
+Players join random lobbies at --join-rate players per second and each leaves with --leave-rate per second
+until the game starts. The lobbies run the real WaitingRoom on a simulated clock, so the deadline messages are
+counted as sent. The per-second scheme the servers used before is counted over the same countdowns: every
+second a countdown runs, every player in the room is sent the time left.
+
+Run from the server directory:
+    python benchmarks/bench_lobby_countdown_messages.py --lobbies 1000 --countdown 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import Server, WaitingRoom
+from timer_wheel import TimerWheel
+
+
+class SimulatedClock:
+    """
+    The time of the simulation, moved forward by the lobby.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingConnection:
+    """
+    Counts the countdown messages and bytes a player is sent.
+    """
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def queue_frame(self, frame):
+        if json.loads(frame[1])['type'] == 'countdown':
+            self.messages += 1
+            self.bytes += len(frame[0]) + len(frame[1])
+
+    async def drain(self):
+        pass
+
+    def get_extra_info(self, name):
+        return None
+
+
+async def run_lobby(server, clock, rng, args):
+    """
+    Runs one lobby until its game starts.
+
+    Returns:
+        tuple: The countdown messages and bytes sent with deadlines, then with a message per second.
+    """
+    room = WaitingRoom(server, 'Lobby')
+    room.broadcast_deadline = None
+    started = []
+    server.start_game = lambda *_: asyncio.sleep(0, started.append(True))
+    connections = []
+    tick_frame = server.make_frame(server.make_message('countdown', '00:00'))
+    per_second_messages = 0
+    step = 0
+    while not started:
+        step += 1
+        clock.now = round(clock.now + server.timer_wheel.tick, 6)
+        server.timer_wheel.advance()
+        if room.starts_at is not None and step % 10 == 0:
+            per_second_messages += room.get_player_num()
+        for connection in list(room.player_sockets):
+            if rng.random() < args.leave_rate * server.timer_wheel.tick:
+                room.remove_player(connection)
+        if rng.random() < args.join_rate * server.timer_wheel.tick and room.is_available():
+            connection = CountingConnection()
+            connections.append(connection)
+            room.add_player({'player_id': str(len(connections))}, connection)
+            if room.is_ready():
+                room.start_timer(args.countdown)
+            elif room.starts_at is not None:
+                await server.send_with_length(connection, room.countdown_message())
+        # Let the broadcasts and the start of the game run
+        for _ in range(3):
+            await asyncio.sleep(0)
+    deadline_messages = sum(connection.messages for connection in connections)
+    deadline_bytes = sum(connection.bytes for connection in connections)
+    per_second_bytes = per_second_messages * sum(len(part) for part in tick_frame)
+    return deadline_messages, deadline_bytes, per_second_messages, per_second_bytes
+
+
+async def run_lobbies(args):
+    server = Server(('127.0.0.1', 0))
+    server.server_socket.close()
+    clock = SimulatedClock()
+    server.timer_wheel = TimerWheel(clock=clock)
+    rng = random.Random(args.seed)
+    return [await run_lobby(server, clock, rng, args) for _ in range(args.lobbies)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lobbies", type=int, default=1000)
+    parser.add_argument("--countdown", type=int, default=10)
+    parser.add_argument("--join-rate", type=float, default=0.5)
+    parser.add_argument("--leave-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    # The rooms print the players of every game they start
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run_lobbies(args))
+    deadline_messages, deadline_bytes, per_second_messages, per_second_bytes = (sum(column) for column in zip(*results))
+    lobbies = len(results)
+    print(f"{lobbies} lobbies, {args.countdown}s countdown, {args.join_rate} joins/s, {args.leave_rate} leaves/s per player")
+    print(f"  per second: {per_second_messages / lobbies:7.1f} messages {per_second_bytes / lobbies:8.0f} bytes per lobby")
+    print(f"  deadline:   {deadline_messages / lobbies:7.1f} messages {deadline_bytes / lobbies:8.0f} bytes per lobby")
+    print(f"  saved:      {(per_second_messages - deadline_messages) / lobbies:7.1f} messages per lobby "
+          f"({1 - deadline_messages / per_second_messages:.0%}), {1 - deadline_bytes / per_second_bytes:.0%} of the bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cost of picking the reducer step and the network projection for a phase.
+
+Compares the PHASE_REDUCERS / PHASE_PROJECTIONS lookups Game and ActionTranslator use against the if/elif
+chain of phase string comparisons they used before, for every phase. A full reducer step is timed as well,
+a BID that does not yet finish the bidding, to put the dispatch cost next to the work around it.
+
+Run from the server directory:
+    python benchmarks/bench_phase_dispatch.py --iterations 1000000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+from phase import Phase
+from projections import PHASE_PROJECTIONS
+
+
+def chain_dispatch(phase):
+    """
+    The if/elif chain game_reducer and game_state_to_network walked before the handler tables.
+    """
+    if phase == "STARTING":
+        return 0
+    elif phase == "DEALING":
+        return 1
+    elif phase == "START_BIDDING":
+        return 2
+    elif phase == "BIDDING":
+        return 3
+    elif phase == "START_PLAYING":
+        return 4
+    elif phase == "PLAYING":
+        return 5
+    elif phase == "RESOLVING":
+        return 6
+    elif phase == "CALCULATE_SCORES":
+        return 7
+
+
+def make_players(num_players):
+    return [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(num_players)]
+
+
+async def reducer_steps(game, iterations):
+    """
+    Runs BID reducer steps on a table that never completes its bids.
+    """
+    action = {'type': 'BID', 'player_id': 'player0', 'bid': 1}
+    for _ in range(iterations):
+        await game.game_reducer(action)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=1000000)
+    args = parser.parse_args()
+
+    reducers = Game.PHASE_REDUCERS
+    print(f"{'phase':>16}  {'if/elif chain':>14}  {'reducer table':>14}  {'projection table':>16}")
+    for phase in Phase:
+        # The chain compared the plain phase strings the game used to store
+        chain = timeit.timeit(lambda: chain_dispatch(phase.value), number=args.iterations)
+        reducer = timeit.timeit(lambda: reducers.get(phase), number=args.iterations)
+        projection = timeit.timeit(lambda: PHASE_PROJECTIONS[phase], number=args.iterations)
+        print(f"{phase.value:>16}  {chain / args.iterations * 1e9:11.1f} ns  "
+              f"{reducer / args.iterations * 1e9:11.1f} ns  {projection / args.iterations * 1e9:13.1f} ns")
+
+    game = Game(make_players(4), "bench", Mock(), {}, Mock())
+    game.phase = Phase.BIDDING
+    steps = args.iterations // 10
+    elapsed = timeit.timeit(lambda: asyncio.run(reducer_steps(game, steps)), number=1)
+    print(f"full BID reducer step: {elapsed / steps * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
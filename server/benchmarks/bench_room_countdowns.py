@@ -0,0 +1,129 @@
+"""
+Many room countdowns at once, on the timer wheel and as one sleeping task per room.
+
+Every room counts down from --countdown seconds with a broadcast per tick that does nothing, so only the
+cost of the timers is measured: CPU time, and how late the ticks fire against when they were due. Before the
+timer wheel the servers ran one countdown at a time, so with more than one room the old code never got near
+either of these. The second part times scheduling and cancelling timers, the wheel against loop.call_later.
+
+Run from the server directory:
+    python benchmarks/bench_room_countdowns.py --rooms 5000 --countdown 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_wheel import TimerWheel
+
+
+class Lateness:
+    """
+    Collects how late each countdown tick fired.
+    """
+    def __init__(self):
+        self.samples = []
+
+    def record(self, due):
+        self.samples.append(time.monotonic() - due)
+
+    def summary(self):
+        samples = sorted(self.samples)
+        return samples[len(samples) // 2], samples[int(len(samples) * 0.99)], samples[-1]
+
+
+async def sleeping_countdowns(rooms, countdown, lateness):
+    """
+    One task per room sleeping a second between ticks, the way WaitingRoom.start_timer counted down.
+    """
+    async def room_countdown():
+        due = time.monotonic()
+        for _ in range(countdown + 1):
+            lateness.record(due)
+            due += 1
+            await asyncio.sleep(due - time.monotonic())
+
+    await asyncio.gather(*(room_countdown() for _ in range(rooms)))
+
+
+async def wheel_countdowns(rooms, countdown, lateness):
+    """
+    Every room counting down on one timer wheel, the way WaitingRoom.start_timer counts down now.
+    """
+    wheel = TimerWheel()
+    driver = asyncio.create_task(wheel.run())
+    finished = asyncio.get_running_loop().create_future()
+    remaining = [rooms]
+
+    def tick(t, due):
+        lateness.record(due)
+        if t > 0:
+            wheel.call_later(1, tick, t - 1, due + 1)
+        else:
+            remaining[0] -= 1
+            if not remaining[0]:
+                finished.set_result(None)
+
+    start = time.monotonic()
+    for _ in range(rooms):
+        tick(countdown, start)
+    await finished
+    driver.cancel()
+
+
+def measure_countdowns(mode, rooms, countdown):
+    lateness = Lateness()
+    run = wheel_countdowns if mode == "wheel" else sleeping_countdowns
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    asyncio.run(run(rooms, countdown, lateness))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return cpu, wall, lateness.summary()
+
+
+async def measure_scheduling(timers):
+    """
+    Times scheduling then cancelling the given number of timers.
+
+    Returns:
+        dict: Nanoseconds per schedule and cancel, keyed by implementation.
+    """
+    results = {}
+    wheel = TimerWheel()
+    start = time.perf_counter()
+    handles = [wheel.call_later(1 + number % 600, len, ()) for number in range(timers)]
+    for handle in handles:
+        handle.cancel()
+    results['wheel'] = (time.perf_counter() - start) / timers * 1e9
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    handles = [loop.call_later(1 + number % 600, len, ()) for number in range(timers)]
+    for handle in handles:
+        handle.cancel()
+    results['call_later'] = (time.perf_counter() - start) / timers * 1e9
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rooms", type=int, default=5000)
+    parser.add_argument("--countdown", type=int, default=3)
+    parser.add_argument("--timers", type=int, default=200000)
+    args = parser.parse_args()
+
+    for mode in ("wheel", "sleep"):
+        cpu, wall, (median, p99, worst) = measure_countdowns(mode, args.rooms, args.countdown)
+        print(f"{mode:>6}: {args.rooms} rooms counting down {args.countdown}s, CPU {cpu:5.2f}s over {wall:5.2f}s, "
+              f"tick lateness median {median * 1000:6.1f}ms p99 {p99 * 1000:6.1f}ms max {worst * 1000:6.1f}ms")
+
+    for name, nanoseconds in asyncio.run(measure_scheduling(args.timers)).items():
+        print(f"{name:>10}: {nanoseconds:6.0f}ns per timer scheduled and cancelled ({args.timers} timers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Bytes sent per game with full state snapshots compared with numbered patches.
+
+Plays random games with the rules in Game and, at every point where game_reducer calls send_state, builds
+the state every player would be sent. Full snapshots are what the servers sent before StateHistory; the
+patch numbers assume every player acknowledges each state before the next one, as the servers' handlers do.
+
+Run from the server directory:
+    python benchmarks/bench_state_bandwidth.py --games 50 --players 4
+"""
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broadcast import StateFrames, encode_frame
+from deck import CARD_CATALOG, mask_to_card_ids
+from game import Game
+from game_random import GameRandom
+from phase import Phase
+from projections import project_game_state, project_private_states
+from state_delta import StateHistory
+
+
+def game_states(num_players, seed):
+    """
+    Plays a game with random legal moves and yields the game each time the reducer would send its state.
+
+    Yields:
+        Game: The game, with its phase set to the one the state is sent in.
+    """
+    rng = random.Random(seed)
+    players = [{'player_id': 'player' + str(seat), 'username': 'user' + str(seat)} for seat in range(num_players)]
+    game = Game(players, str(seed), Mock(), {}, Mock(), rng=GameRandom(seed))
+    # Large tables stop once the deck cannot deal another round
+    for round_number in range(1, min(Game.MAX_ROUNDS, len(CARD_CATALOG) // num_players) + 1):
+        game.round = round_number
+        if round_number > 1:
+            game.choose_next_dealer()
+            game.current_player = game.who_goes_first()
+        game.phase = Phase.STARTING
+        game.init_round_variables()
+        yield game
+        game.phase = Phase.DEALING
+        game.deal_cards()
+        yield game
+        game.phase = Phase.START_BIDDING
+        yield game
+        game.phase = Phase.BIDDING
+        for player in players:
+            game.make_bid(player['player_id'], rng.randint(0, round_number))
+        yield game
+        while not game.round_is_over:
+            game.phase = Phase.START_PLAYING
+            yield game
+            game.phase = Phase.PLAYING
+            for _ in players:
+                player_id = game.get_current_player()['player_id']
+                card_id = rng.choice(mask_to_card_ids(game.legal_moves(player_id)))
+                card_index = game.get_card_index(player_id, card_id)
+                game.validate_play_card(player_id, card_index)
+                game.take_turn(player_id, card_index)
+                yield game
+            game.phase = Phase.RESOLVING
+            game.finish_trick()
+            yield game
+        game.phase = Phase.CALCULATE_SCORES
+        game.calculate_round_scores()
+        yield game
+
+
+def measure(num_games, num_players):
+    """
+    Returns:
+        tuple: (full snapshot bytes, patch bytes), each a Counter keyed by phase.
+    """
+    full_bytes = Counter()
+    patch_bytes = Counter()
+    for seed in range(num_games):
+        history = StateHistory()
+        for game in game_states(num_players, seed):
+            public_state = project_game_state(game)
+            private_states = project_private_states(game)
+            history.push(public_state, private_states)
+            player_ids = list(game.seats)
+            frames = StateFrames(history, player_ids)
+            for player_id in player_ids:
+                full_state = {**public_state, **private_states.get(player_id, {})}
+                full_bytes[game.phase.value] += len(encode_frame('gameplay_data', full_state))
+                patch_bytes[game.phase.value] += len(frames.frame_for(player_id))
+                history.acknowledge(player_id, frames.seq)
+    return full_bytes, patch_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--players", type=int, default=4)
+    args = parser.parse_args()
+
+    full_bytes, patch_bytes = measure(args.games, args.players)
+    print(f"{'phase':>16}  {'full KiB/game':>13}  {'patch KiB/game':>14}  {'ratio':>6}")
+    for phase in Phase:
+        full = full_bytes[phase.value] / args.games / 1024
+        patch = patch_bytes[phase.value] / args.games / 1024
+        print(f"{phase.value:>16}  {full:13.1f}  {patch:14.1f}  {full / patch:5.1f}x")
+    full = sum(full_bytes.values()) / args.games / 1024
+    patch = sum(patch_bytes.values()) / args.games / 1024
+    print(f"{'total':>16}  {full:13.1f}  {patch:14.1f}  {full / patch:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import logging
+from codec import JSON_CODEC, encode_message, add_private_items
+
+
+def encode_frame(message_type, content, codec=JSON_CODEC):
+    """
+    Encodes a message the way the servers send it, ready to be written to any number of sockets.
+
+    Args:
+        message_type (str): The type of the message.
+        content (dict): The content of the message.
+        codec (str): The codec to encode with, see codec.py.
+
+    Returns:
+        bytes: The encoded message.
+    """
+    return encode_message({'type': message_type, 'content': content}, codec)
+
+
+class StateFrames:
+    """
+    The StateFrames class holds the encoded frames of one game state change. Each frame carries the state's
+    sequence number and a patch against the last state the player acknowledged (base), or the full state
+    when base is None. Players on the same base and codec share one encoded bytes object for the public
+    patch; a player with private changes gets a copy of it with their fields added, which costs one small
+    encode.
+    """
+    def __init__(self, history, player_ids, player_codecs=None):
+        """
+        Encodes the frames of the latest state in a history.
+
+        Args:
+            history (StateHistory): The history of the game's states, holding the new state.
+            player_ids (list): The IDs of the players to make frames for.
+            player_codecs (dict): The codec negotiated with each player, keyed by player ID. Players that
+                are missing get JSON.
+        """
+        self.seq = history.seq
+        player_codecs = player_codecs or {}
+        # Encoded public frame and whether its patch is empty, keyed by base and codec
+        public_frames = {}
+        self.frames = {}
+        self.encodes = 0
+        for player_id in player_ids:
+            base = history.base_for(player_id)
+            codec = player_codecs.get(player_id, JSON_CODEC)
+            if (base, codec) not in public_frames:
+                public_patch = history.public_patch(base)
+                content = {'seq': self.seq, 'base': base, 'patch': public_patch}
+                public_frames[base, codec] = (encode_frame('gameplay_data', content, codec), not public_patch)
+                self.encodes += 1
+            frame, public_patch_empty = public_frames[base, codec]
+            private_patch = history.private_patch(base, player_id)
+            if private_patch:
+                # The patch is the last value of the content, which is the last value of the message
+                frame = add_private_items(frame, private_patch, public_patch_empty, codec)
+                self.encodes += 1
+            self.frames[player_id] = frame
+
+    def frame_for(self, player_id):
+        """
+        Returns the frame to send to a player.
+
+        Args:
+            player_id (str): The ID of the player.
+
+        Returns:
+            bytes: The player's frame.
+        """
+        return self.frames[player_id]
+
+
+class EncodeStats:
+    """
+    The EncodeStats class counts how many times game states are encoded, so a change that starts encoding
+    a state once per player again shows up in the numbers.
+    """
+    def __init__(self):
+        """
+        Initializes a new instance of the EncodeStats class.
+        """
+        self.state_changes = 0
+        self.encodes = 0
+        self.max_encodes = 0
+
+    def record(self, frames):
+        """
+        Records the encodes made for one state change.
+
+        Args:
+            frames (StateFrames): The frames of the state change.
+        """
+        self.state_changes += 1
+        self.encodes += frames.encodes
+        self.max_encodes = max(self.max_encodes, frames.encodes)
+        logging.debug(f"State change {self.state_changes} encoded {frames.encodes} times")
+
+    def encodes_per_state(self):
+        """
+        Returns the average number of encodes per state change.
+
+        Returns:
+            float: The average, 0 if no state was encoded yet.
+        """
+        if self.state_changes == 0:
+            return 0.0
+        return self.encodes / self.state_changes
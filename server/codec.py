@@ -0,0 +1,221 @@
+import json
+import struct
+from phase import Phase
+
+# Name of the binary codec, offered by clients next to 'json' when they connect
+BINARY_CODEC = "binary/2"
+JSON_CODEC = "json"
+SUPPORTED_CODECS = (BINARY_CODEC, JSON_CODEC)
+
+# Message types sent as a one byte opcode at the start of a binary message. Opcodes stay below 0x20 so a
+# binary message can never be mistaken for JSON, which starts with '{'.
+MESSAGE_TYPES = ('INIT', 'message', 'countdown', 'gameplay_data', 'ack', 'action', 'catalog')
+MESSAGE_OPCODES = {message_type: opcode for opcode, message_type in enumerate(MESSAGE_TYPES, start=1)}
+
+# Strings sent as a one byte index: the keys of every message and state, and the phases. Both ends must
+# hold the same list, changing it means a new codec name.
+KNOWN_STRINGS = ('content', 'payload', 'seq', 'base', 'patch', 'phase', 'round', 'tricks_won', 'dealer',
+                 'bids', 'first_player', 'previous_player', 'current_player', 'trick', 'player_num',
+                 'trick_winner', 'score_sheet', 'hand', 'player_id', 'username', 'score',
+                 'Game State Processed') + tuple(phase.value for phase in Phase)
+KNOWN_STRING_INDEX = {string: index for index, string in enumerate(KNOWN_STRINGS)}
+
+# Value tags
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_KNOWN = 6
+TAG_LIST = 7
+TAG_DICT = 8
+TAG_END = 9
+
+END = bytes([TAG_END])
+FLOAT = struct.Struct('!d')
+
+def write_varint(buffer, number):
+    while number > 0x7F:
+        buffer.append((number & 0x7F) | 0x80)
+        number >>= 7
+    buffer.append(number)
+
+def read_varint(data, position):
+    number = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, position
+        shift += 7
+
+def write_value(buffer, value):
+    """
+    Appends the tagged binary encoding of a JSON value to a buffer.
+
+    Args:
+        buffer (bytearray): The buffer to append to.
+        value: None, a bool, int, float, str, list or dict of those.
+    """
+    if value is None:
+        buffer.append(TAG_NONE)
+    elif value is True:
+        buffer.append(TAG_TRUE)
+    elif value is False:
+        buffer.append(TAG_FALSE)
+    elif isinstance(value, str):
+        index = KNOWN_STRING_INDEX.get(value)
+        if index is not None:
+            buffer.append(TAG_KNOWN)
+            buffer.append(index)
+        else:
+            encoded = value.encode()
+            buffer.append(TAG_STR)
+            write_varint(buffer, len(encoded))
+            buffer += encoded
+    elif isinstance(value, int):
+        buffer.append(TAG_INT)
+        # Zigzag so small negative scores stay small
+        write_varint(buffer, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, dict):
+        buffer.append(TAG_DICT)
+        write_items(buffer, value)
+        buffer.append(TAG_END)
+    elif isinstance(value, (list, tuple)):
+        buffer.append(TAG_LIST)
+        for item in value:
+            write_value(buffer, item)
+        buffer.append(TAG_END)
+    elif isinstance(value, float):
+        buffer.append(TAG_FLOAT)
+        buffer += FLOAT.pack(value)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} values")
+
+def write_items(buffer, items):
+    """
+    Appends the key value pairs of a dict, without the dict's tag and end marker.
+    """
+    for key, value in items.items():
+        write_value(buffer, key)
+        write_value(buffer, value)
+
+def read_value(data, position):
+    """
+    Decodes one tagged value.
+
+    Args:
+        data (bytes): The encoded message.
+        position (int): The offset of the value's tag.
+
+    Returns:
+        tuple: The value and the offset just past it.
+    """
+    tag = data[position]
+    position += 1
+    if tag == TAG_KNOWN:
+        return KNOWN_STRINGS[data[position]], position + 1
+    if tag == TAG_INT:
+        number, position = read_varint(data, position)
+        return (number >> 1) ^ -(number & 1), position
+    if tag == TAG_DICT:
+        result = {}
+        while data[position] != TAG_END:
+            key, position = read_value(data, position)
+            result[key], position = read_value(data, position)
+        return result, position + 1
+    if tag == TAG_LIST:
+        result = []
+        while data[position] != TAG_END:
+            item, position = read_value(data, position)
+            result.append(item)
+        return result, position + 1
+    if tag == TAG_STR:
+        length, position = read_varint(data, position)
+        return bytes(data[position:position + length]).decode(), position + length
+    if tag == TAG_NONE:
+        return None, position
+    if tag == TAG_TRUE:
+        return True, position
+    if tag == TAG_FALSE:
+        return False, position
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack_from(data, position)[0], position + FLOAT.size
+    raise ValueError(f"Unknown value tag {tag}")
+
+def encode_message(message, codec=JSON_CODEC):
+    """
+    Encodes a message with the given codec. A binary message is the opcode of its type followed by the rest
+    of the message as a tagged dict.
+
+    Args:
+        message (dict): The message, with a 'type' key.
+        codec (str): JSON_CODEC or BINARY_CODEC.
+
+    Returns:
+        bytes: The encoded message.
+    """
+    if codec != BINARY_CODEC:
+        return json.dumps(message).encode()
+    buffer = bytearray((MESSAGE_OPCODES[message['type']], TAG_DICT))
+    for key, value in message.items():
+        if key != 'type':
+            write_value(buffer, key)
+            write_value(buffer, value)
+    buffer.append(TAG_END)
+    return bytes(buffer)
+
+def decode_message(data):
+    """
+    Decodes a message encoded with either codec. JSON messages start with '{', binary ones with an opcode.
+
+    Args:
+        data (bytes or str): The message.
+
+    Returns:
+        dict: The message, with a 'type' key.
+    """
+    if isinstance(data, str) or data[:1] == b'{':
+        return json.loads(data)
+    message, _ = read_value(data, 1)
+    return {'type': MESSAGE_TYPES[data[0] - 1], **message}
+
+def add_private_items(frame, private_items, public_items_empty, codec=JSON_CODEC, depth=3):
+    """
+    Adds fields to the innermost dict of an encoded message whose last value is that dict. The encoded
+    message is copied, not encoded again.
+
+    Args:
+        frame (bytes): The encoded message.
+        private_items (dict): The fields to add, a non empty dict.
+        public_items_empty (bool): Whether the innermost dict is empty in the frame.
+        codec (str): The codec the frame was encoded with.
+        depth (int): How many dicts close at the end of the frame, the innermost one included.
+
+    Returns:
+        bytes: The frame with the fields at the end of its innermost dict.
+    """
+    if codec == BINARY_CODEC:
+        buffer = bytearray(frame[:-depth])
+        write_items(buffer, private_items)
+        return bytes(buffer) + END * depth
+    separator = b'' if public_items_empty else b', '
+    return frame[:-depth] + separator + json.dumps(private_items)[1:].encode() + b'}' * (depth - 1)
+
+def negotiate_codec(offered_codecs):
+    """
+    Picks the codec to use with a client from the ones it offered, preferring the binary codec.
+
+    Args:
+        offered_codecs (list): The codecs the client supports, None for clients that predate negotiation.
+
+    Returns:
+        str: The codec to use.
+    """
+    for codec in SUPPORTED_CODECS:
+        if offered_codecs and codec in offered_codecs:
+            return codec
+    return JSON_CODEC
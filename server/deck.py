@@ -1,8 +1,16 @@
 import random
+import copy
+import json
+import hashlib
 
 # Define the Card class representing standard playing cards
 class Card:
-    def __init__(self, suit, number, bonus, priority):
+    # Cards are shared flyweights from CARD_CATALOG, so keep them small
+    __slots__ = ('suit', 'number', 'bonus', 'priority', 'card_id')
+    # Standard cards have no special type
+    type = None
+
+    def __init__(self, suit, number, bonus, priority, card_id=None):
         """
         Initialize a standard playing card.
 
@@ -11,11 +19,13 @@ class Card:
             number (int): The number of the card.
             bonus (int): The bonus associated with the card.
             priority (int): The priority of the card.
+            card_id (int): The index of the card in the card catalog.
         """
         self.suit = suit
         self.number = number
         self.bonus = bonus
         self.priority = priority
+        self.card_id = card_id
 
     def __str__(self):
         """
@@ -28,7 +38,12 @@ class Card:
 
 # Define the Special_Card class for special cards
 class Special_Card:
-    def __init__(self, type, priority, bonus):
+    __slots__ = ('type', 'priority', 'bonus', 'card_id')
+    # Special cards have no suit or number
+    suit = None
+    number = None
+
+    def __init__(self, type, priority, bonus, card_id=None):
         """
         Initialize a special card.
 
@@ -36,10 +51,12 @@ class Special_Card:
             type (str): The type of the special card.
             priority (int): The priority of the special card.
             bonus (int): The bonus associated with the special card.
+            card_id (int): The index of the card in the card catalog.
         """
         self.type = type
         self.priority = priority
         self.bonus = bonus
+        self.card_id = card_id
     
     def __str__(self):
         """
@@ -52,7 +69,9 @@ class Special_Card:
 
 # Define a subclass Tigress, inheriting from Special_Card
 class Tigress(Special_Card):
-    def __init__(self, type, priority, bonus):
+    __slots__ = ()
+
+    def __init__(self, type, priority, bonus, card_id=None):
         """
         Initialize a Tigress special card.
 
@@ -60,103 +79,267 @@ class Tigress(Special_Card):
             type (str): The type of the Tigress special card.
             priority (int): The priority of the Tigress special card.
             bonus (int): The bonus associated with the Tigress special card.
+            card_id (int): The index of the card in the card catalog.
         """
-        super().__init__(type, priority, bonus)
+        super().__init__(type, priority, bonus, card_id)
 
     def to_dict(self):
         return {'type': self.type, 'priority': self.priority, 'bonus': self.bonus}    
-    
+
+SUITS = ["Parrot", "Pirate Map", "Treasure Chest", "Jolly Roger"]
+# Acts as priority and number
+NUMBERS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
+SPECIALS = {
+    "Pirate": 5,
+    "Escape": 5,
+    "Tigress": 1,
+    "Skull King": 1
+}
+
+def make_deck(suits, numbers):
+    """
+    Create the standard playing cards.
+
+    Args:
+        suits (list): List of card suits.
+        numbers (list): List of card numbers.
+
+    Returns:
+        list: The standard cards, numbered from card id 0.
+    """
+    cards = []
+    for suit in suits:
+        # Assign priority based on the suit
+        match suit:
+            case "Jolly Roger":
+                priority = 2
+            case _:
+                priority = 1
+        for number in numbers:
+            if priority == 1:
+                # Assign bonus based on conditions
+                match number:
+                    case 14:
+                        bonus = 10
+                    case _:
+                        bonus = 0
+            elif priority == 2:
+                # Assign bonus based on conditions
+                match number:
+                    case 14:
+                        bonus = 20
+                    case _:
+                        bonus = 0
+
+            # Create and append a Card object to the deck
+            cards.append(Card(suit, number, bonus, priority, len(cards)))
+    return cards
+
+def make_special_deck(specials, first_id):
+    """
+    Create the special cards.
+
+    Args:
+        specials (dict): Dictionary of special card types and quantities.
+        first_id (int): The card id of the first special card.
+
+    Returns:
+        list: The special cards, numbered from first_id.
+    """
+    cards = []
+    for key, value in specials.items():
+        # Assign bonus and priority based on the special card type
+        match key:
+            case "Pirate":
+                bonus = 30
+                priority = 3
+            case "Escape":
+                bonus = 0
+                priority = 0
+            case "Tigress":
+                # Tigress plays as an escape until players can choose how to play her
+                bonus = 0
+                priority = 0
+            case "Skull King":
+                # Skull king bonus only used in expansion. Not used for now.
+                bonus = 40
+                priority = 4
+        for _ in range(value):
+            # Create and append a Special_Card object to the deck
+            cards.append(Special_Card(key, priority, bonus, first_id + len(cards)))
+    return cards
+
+def make_card_catalog():
+    """
+    Create every card in the game once, indexed by card id.
+
+    Returns:
+        tuple: The cards, where CARD_CATALOG[card_id].card_id == card_id.
+    """
+    cards = make_deck(SUITS, NUMBERS)
+    cards += make_special_deck(SPECIALS, len(cards))
+    return tuple(cards)
+
+# The one shared instance of every card. Decks, hands and tricks only hold card ids into it.
+CARD_CATALOG = make_card_catalog()
+# Network representation of every card, built once. These dicts are shared and must not be modified.
+CARD_DICTS = tuple(card.to_dict() for card in CARD_CATALOG)
+
+# Version of the catalog sent to clients when they connect, after which cards travel as ids. It changes
+# whenever any card does.
+CATALOG_VERSION = hashlib.sha1(json.dumps(CARD_DICTS).encode()).hexdigest()[:12]
+
+# Card ids of a full, unshuffled deck. Every round's deck starts as a copy of it.
+DECK_TEMPLATE = tuple(range(len(CARD_CATALOG)))
+
+def get_card(card_id):
+    """
+    Look up a card by its id.
+
+    Args:
+        card_id (int): The id of the card.
+
+    Returns:
+        Card: The card from the catalog.
+    """
+    return CARD_CATALOG[card_id]
+
+def cards_to_dicts(card_ids):
+    """
+    Convert a list of card ids into the dicts sent over the network.
+
+    Args:
+        card_ids (list): The ids of the cards.
+
+    Returns:
+        list: The card dicts.
+    """
+    return [CARD_DICTS[card_id] for card_id in card_ids]
+
+def card_ids_to_mask(card_ids):
+    """
+    Convert a list of card ids into a bitmask with bit card_id set for every card.
+
+    Args:
+        card_ids (list): The ids of the cards.
+
+    Returns:
+        int: The card mask.
+    """
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << card_id
+    return mask
+
+def mask_to_card_ids(mask):
+    """
+    Convert a card bitmask into a list of card ids, lowest id first.
+
+    Args:
+        mask (int): The card mask.
+
+    Returns:
+        list: The ids of the cards in the mask.
+    """
+    card_ids = []
+    while mask:
+        lowest_bit = mask & -mask
+        card_ids.append(lowest_bit.bit_length() - 1)
+        mask ^= lowest_bit
+    return card_ids
+
+def make_suit_masks():
+    """
+    Build the card mask of every suit.
+
+    Returns:
+        dict: The mask of all cards of each suit, keyed by suit.
+    """
+    suit_masks = {suit: 0 for suit in SUITS}
+    for card in CARD_CATALOG:
+        if card.suit is not None:
+            suit_masks[card.suit] |= 1 << card.card_id
+    return suit_masks
+
+# Mask of every card of each suit, used to answer "does this hand follow suit" with one AND
+SUIT_MASKS = make_suit_masks()
+# Mask of every special card, which can always be played
+SPECIAL_MASK = card_ids_to_mask(card.card_id for card in CARD_CATALOG if card.suit is None)
+
+def find_card_id(suit=None, number=None, type=None):
+    """
+    Find the id of the first card in the catalog with the given suit and number, or the given type.
+
+    Args:
+        suit (str): The suit of a standard card.
+        number (int): The number of a standard card.
+        type (str): The type of a special card.
+
+    Returns:
+        int: The card id, or None if no card matches.
+    """
+    for card in CARD_CATALOG:
+        if card.suit == suit and card.number == number and card.type == type:
+            return card.card_id
+    return None
+
 # Define the Deck class for managing a deck of cards
 class Deck:
-    def __init__(self):
+    def __init__(self, rng=None):
         """
         Initialize a deck of cards.
+
+        Args:
+            rng (random.Random): The random number generator used to shuffle. Defaults to the random module.
+        """
+        self.rng = rng if rng is not None else random
+        # Ids of the cards left in the deck, see CARD_CATALOG
+        self.cards = list(DECK_TEMPLATE)
+
+    def shuffle(self):
+        """
+        Shuffle the deck's cards.
         """
-        suits = ["Parrot", "Pirate Map", "Treasure Chest", "Jolly Roger"]
-        # Acts as priority and number
-        numbers = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
-        self.cards = []  # Initialize an empty list to store cards
-        specials = {
-            "Pirate": 5,
-            "Escape": 5,
-            "Tigress": 1,
-            "Skull King": 1
-        }
+        self.rng.shuffle(self.cards)
 
-        # Initialize the deck by creating standard and special cards
-        self.make_deck(suits, numbers)
-        self.make_special_deck(specials)
+    def copy(self):
+        """
+        Copy the deck so it can be dealt from without changing this one.
 
-    def make_deck(self, suits, numbers):
+        Returns:
+            Deck: A deck holding a new list of the same card ids.
         """
-        Create standard playing cards and add them to the deck.
+        new_deck = copy.copy(self)
+        new_deck.cards = list(self.cards)
+        return new_deck
 
-        Args:
-            suits (list): List of card suits.
-            numbers (list): List of card numbers.
-        """
-        for suit in suits:
-            # Assign priority based on the suit
-            match suit:
-                case "Jolly Roger":
-                    priority = 2
-                case _:
-                    priority = 1
-            for number in numbers:
-                if priority == 1:
-                    # Assign bonus based on conditions
-                    match number:
-                        case 14:
-                            bonus = 10
-                        case _:
-                            bonus = 0
-                elif priority == 2:
-                    # Assign bonus based on conditions
-                    match number:
-                        case 14:
-                            bonus = 20
-                        case _:
-                            bonus = 0
-
-                # Create and append a Card object to the deck
-                self.cards.append(Card(suit, number, bonus, priority))
-
-    def make_special_deck(self, specials):
-        """
-        Create special cards and add them to the deck.
+    def deal_hands(self, num_hands, hand_size):
+        """
+        Deal several hands at once by slicing the shuffled deck, and remove those cards from the deck.
 
         Args:
-            specials (dict): Dictionary of special card types and quantities.
-        """
-        for key, value in specials.items():
-            # Assign bonus and priority based on the special card type
-            match key:
-                case "Pirate":
-                    bonus = 30
-                    priority = 3
-                case "Escape":
-                    bonus = 0
-                    priority = 0
-                case "Skull King":
-                    # Skull king bonus only used in expansion. Not used for now.
-                    bonus = 40
-                    priority = 4
-            for _ in range(value):
-                # Create and append a Special_Card object to the deck
-                self.cards.append(Special_Card(key, priority, bonus))
+            num_hands (int): The number of hands to deal.
+            hand_size (int): The number of cards in each hand.
 
-    def shuffle(self):
-        """
-        Shuffle the deck's cards.
+        Returns:
+            list: One list of card ids per hand.
+
+        Raises:
+            ValueError: If the deck does not hold enough cards.
         """
-        random.shuffle(self.cards)
+        dealt = num_hands * hand_size
+        if dealt > len(self.cards):
+            raise ValueError(f"Cannot deal {num_hands} hands of {hand_size} cards from the {len(self.cards)} cards left")
+        hands = [self.cards[start:start + hand_size] for start in range(0, dealt, hand_size)]
+        self.cards = self.cards[dealt:]
+        return hands
 
     def deal(self):
         """
         Deal a card from the deck.
 
         Returns:
-            Card: The card dealt from the deck, or None if the deck is empty.
+            int: The id of the card dealt from the deck, or None if the deck is empty.
         """
         if len(self.cards) > 0:
             return self.cards.pop()  # Remove and return the top card from the deck
@@ -0,0 +1,191 @@
+import os
+import json
+import logging
+from game import Game
+
+
+class GameEventLog:
+    """
+    The GameEventLog class keeps an append only log of every event a game records, plus periodic snapshots of
+    the whole game. A game is rebuilt by loading its latest snapshot and replaying only the events after it,
+    so recovery never replays more than snapshot_interval events however long the game has run.
+
+    Each game gets its own directory holding snapshot.json and event segment files named events-<seq>.jsonl,
+    where seq is the sequence number of the first event in the segment. Events are buffered in memory and
+    written in batches, and segments older than the latest snapshot are deleted.
+
+    Every batch and snapshot is fsynced before the call returns, so what was written survives a power failure
+    or OS crash. The writes block the caller, which in the servers is the event loop: one fsync per batch_size
+    events and one more per snapshot.
+    """
+    def __init__(self, directory, game_id, batch_size=32, snapshot_interval=256):
+        """
+        Initializes a new instance of the GameEventLog class.
+
+        Args:
+            directory (str): The directory holding the logs of all games.
+            game_id (str): The ID of the game being logged.
+            batch_size (int): The number of buffered events that triggers a write.
+            snapshot_interval (int): The number of events between two snapshots.
+        """
+        self.game_directory = os.path.join(directory, str(game_id))
+        self.batch_size = batch_size
+        self.snapshot_interval = snapshot_interval
+        # Sequence number of the last event appended
+        self.seq = 0
+        # Events waiting to be written
+        self.pending = []
+        self.segment_path = None
+
+    def start(self, game):
+        """
+        Writes the first snapshot of a new game, which every replay starts from.
+
+        Args:
+            game (Game): The game being logged.
+        """
+        os.makedirs(self.game_directory, exist_ok=True)
+        self.snapshot(game)
+
+    def resume(self, game, seq):
+        """
+        Continues logging a game rebuilt by recover_game, starting from a fresh snapshot.
+
+        Args:
+            game (Game): The rebuilt game.
+            seq (int): The sequence number of the last event replayed.
+        """
+        self.seq = seq
+        self.start(game)
+        game.event_log = self
+
+    def append(self, event, game):
+        """
+        Buffers an event the game has just applied, writing the buffer out when it is full and taking a
+        snapshot when one is due.
+
+        Args:
+            event (dict): The event, see Game.apply_event.
+            game (Game): The game after the event was applied.
+        """
+        self.seq += 1
+        self.pending.append({'seq': self.seq, **event})
+        if self.seq % self.snapshot_interval == 0:
+            self.snapshot(game)
+        elif len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every buffered event to the current segment in a single write.
+        """
+        if not self.pending:
+            return
+        lines = ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in self.pending)
+        new_segment = not os.path.exists(self.segment_path)
+        with open(self.segment_path, 'a') as segment:
+            segment.write(lines)
+            segment.flush()
+            os.fsync(segment.fileno())
+        if new_segment:
+            sync_directory(self.game_directory)
+        self.pending = []
+
+    def snapshot(self, game):
+        """
+        Writes a snapshot of the game as it stands after the last appended event, starts a new segment and
+        removes the segments the snapshot makes unnecessary.
+
+        Args:
+            game (Game): The game being logged.
+        """
+        self.flush()
+        snapshot_path = os.path.join(self.game_directory, 'snapshot.json')
+        temp_path = snapshot_path + '.tmp'
+        with open(temp_path, 'w') as snapshot_file:
+            json.dump({'seq': self.seq, 'state': game.to_snapshot()}, snapshot_file, separators=(',', ':'))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        # Replace atomically so a crash never leaves a half written snapshot behind
+        os.replace(temp_path, snapshot_path)
+        sync_directory(self.game_directory)
+
+        old_segments = list_segments(self.game_directory)
+        self.segment_path = os.path.join(self.game_directory, f"events-{self.seq + 1}.jsonl")
+        for _, segment_path in old_segments:
+            os.remove(segment_path)
+        logging.debug(f"Snapshot of game {game.get_game_id()} taken at event {self.seq}")
+
+
+def sync_directory(directory):
+    """
+    Flushes a directory's entries to disk, so files created, renamed or removed in it stay that way after a
+    crash. Windows cannot open directories and does not need this.
+
+    Args:
+        directory (str): The directory.
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+def list_segments(game_directory):
+    """
+    Lists the event segments of a game, oldest first.
+
+    Args:
+        game_directory (str): The directory of the game's log.
+
+    Returns:
+        list: (first sequence number, path) of each segment.
+    """
+    segments = []
+    for file_name in os.listdir(game_directory):
+        if file_name.startswith('events-') and file_name.endswith('.jsonl'):
+            first_seq = int(file_name[len('events-'):-len('.jsonl')])
+            segments.append((first_seq, os.path.join(game_directory, file_name)))
+    return sorted(segments)
+
+
+def recover_game(directory, game_id, action_translator=None, game_state_dict=None, action_queue=None):
+    """
+    Rebuilds a game from its latest snapshot and the events logged after it.
+
+    Args:
+        directory (str): The directory holding the logs of all games.
+        game_id (str): The ID of the game to rebuild.
+        action_translator (ActionTranslator): Passed on to the rebuilt game.
+        game_state_dict (dict): Passed on to the rebuilt game.
+        action_queue (ActionBarrier): Passed on to the rebuilt game.
+
+    Returns:
+        tuple: The rebuilt Game and the sequence number of the last event replayed.
+    """
+    game_directory = os.path.join(directory, str(game_id))
+    with open(os.path.join(game_directory, 'snapshot.json')) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+
+    state = snapshot['state']
+    game = Game(state['players'], state['game_id'], action_translator, game_state_dict, action_queue)
+    game.load_snapshot(state)
+
+    seq = snapshot['seq']
+    for _, segment_path in list_segments(game_directory):
+        with open(segment_path) as segment:
+            for line in segment:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last batch was cut short by the crash, nothing after it was ever applied
+                    break
+                # A crash between writing a snapshot and removing old segments can leave replayed events behind
+                if event['seq'] <= seq:
+                    continue
+                game.apply_event(event)
+                seq = event['seq']
+    return game, seq
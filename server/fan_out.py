@@ -0,0 +1,191 @@
+import asyncio
+import collections
+import logging
+import time
+
+
+class Delivery:
+    """
+    The Delivery class records how a fan out went for one recipient. Times are in seconds from the start of the
+    fan out, and stay None if that step did not finish before the deadline.
+    """
+    def __init__(self, recipient):
+        """
+        Initializes a new instance of the Delivery class.
+
+        Args:
+            recipient: The recipient, a connection or websocket.
+        """
+        self.recipient = recipient
+        # When the message was handed to the recipient's connection
+        self.sent_after = None
+        # When the recipient acknowledged the message, only set for fan outs that wait for acks
+        self.acked_after = None
+        # The exception the send or ack raised, if any
+        self.error = None
+
+    def completed(self, wait_ack):
+        """
+        Returns a boolean indicating whether the recipient got the message in time.
+
+        Args:
+            wait_ack (bool): Whether the fan out waited for acknowledgements.
+
+        Returns:
+            bool: True if the message was sent, and acknowledged when required, before the deadline.
+        """
+        if self.error is not None:
+            return False
+        return (self.acked_after if wait_ack else self.sent_after) is not None
+
+
+class FanOutReport:
+    """
+    The FanOutReport class holds the delivery of a fan out to every recipient.
+    """
+    def __init__(self, deliveries, wait_ack, elapsed):
+        """
+        Initializes a new instance of the FanOutReport class.
+
+        Args:
+            deliveries (list): The Delivery of each recipient, in the order they were given.
+            wait_ack (bool): Whether the fan out waited for acknowledgements.
+            elapsed (float): The seconds the whole fan out took.
+        """
+        self.deliveries = deliveries
+        self.wait_ack = wait_ack
+        self.elapsed = elapsed
+
+    def completed(self):
+        """
+        Returns the recipients that got the message in time.
+
+        Returns:
+            list: The recipients.
+        """
+        return [delivery.recipient for delivery in self.deliveries if delivery.completed(self.wait_ack)]
+
+    def late(self):
+        """
+        Returns the recipients that did not get the message in time, or failed.
+
+        Returns:
+            list: The recipients.
+        """
+        return [delivery.recipient for delivery in self.deliveries if not delivery.completed(self.wait_ack)]
+
+    def latencies(self):
+        """
+        Returns the time each recipient took to acknowledge the message, or to be sent it when no
+        acknowledgement was waited for.
+
+        Returns:
+            dict: The latency in seconds of each recipient that completed, keyed by recipient.
+        """
+        return {delivery.recipient: delivery.acked_after if self.wait_ack else delivery.sent_after
+                for delivery in self.deliveries if delivery.completed(self.wait_ack)}
+
+
+async def fan_out(recipients, send, wait_ack=None, deadline=None):
+    """
+    Sends a message to every recipient at once, so a slow recipient holds up nobody but itself. Each recipient
+    is sent the message and, if wait_ack is given, waited on for an acknowledgement. Recipients that have
+    not finished when the deadline passes are given up on and reported as late.
+
+    Args:
+        recipients (list): The recipients.
+        send (callable): A coroutine function sending the message to one recipient.
+        wait_ack (callable): A coroutine function returning once a recipient has acknowledged the message,
+            None to return as soon as the message is sent. Register what it waits for before calling
+            fan_out (see AckTracker.expect), as an acknowledgement may arrive before the wait starts.
+        deadline (float): The seconds to wait for every recipient, None to wait as long as it takes.
+
+    Returns:
+        FanOutReport: How the fan out went for every recipient.
+    """
+    start = time.perf_counter()
+
+    async def deliver(delivery):
+        try:
+            await send(delivery.recipient)
+            delivery.sent_after = time.perf_counter() - start
+            if wait_ack is not None:
+                await wait_ack(delivery.recipient)
+                delivery.acked_after = time.perf_counter() - start
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            delivery.error = e
+
+    deliveries = [Delivery(recipient) for recipient in recipients]
+    tasks = [asyncio.ensure_future(deliver(delivery)) for delivery in deliveries]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+    report = FanOutReport(deliveries, wait_ack is not None, time.perf_counter() - start)
+    if report.late():
+        logging.warning(f"{len(report.late())} of {len(deliveries)} recipients missed the {deadline}s fan out deadline")
+    return report
+
+
+class AckTracker:
+    """
+    The AckTracker class matches acknowledgements to the messages that asked for them. Clients acknowledge
+    messages in the order they were sent without saying which message they acknowledge, so each recipient
+    keeps a queue of futures and an acknowledgement resolves the oldest one. A message whose wait was given up
+    on still takes the next acknowledgement, so later ones stay matched.
+    """
+    def __init__(self):
+        """
+        Initializes a new instance of the AckTracker class.
+        """
+        # Futures of the messages waiting for an acknowledgement, oldest first, keyed by recipient
+        self.waiting = collections.defaultdict(collections.deque)
+
+    def expect(self, recipient):
+        """
+        Records that a message asking for an acknowledgement was sent to a recipient.
+
+        Args:
+            recipient: The recipient.
+
+        Returns:
+            asyncio.Future: A future resolved with the acknowledgement.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[recipient].append(future)
+        return future
+
+    def acknowledge(self, recipient, ack):
+        """
+        Resolves the oldest message of a recipient that is waiting for an acknowledgement.
+
+        Args:
+            recipient: The recipient that sent the acknowledgement.
+            ack: The acknowledgement.
+
+        Returns:
+            bool: True if a message was waiting for it, False if the acknowledgement was unexpected.
+        """
+        waiting = self.waiting.get(recipient)
+        if not waiting:
+            return False
+        future = waiting.popleft()
+        if not waiting:
+            del self.waiting[recipient]
+        if not future.done():
+            future.set_result(ack)
+        return True
+
+    def forget(self, recipient):
+        """
+        Drops the messages of a recipient that has disconnected.
+
+        Args:
+            recipient: The recipient.
+        """
+        for future in self.waiting.pop(recipient, ()):
+            future.cancel()
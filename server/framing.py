@@ -0,0 +1,438 @@
+# Length prefixed framing of the TCP protocol, mirrored in client/CLI/framing.py.
+#
+# Every message is sent as a 4 byte big-endian length followed by the encoded message (see codec.py). Frames are
+# read into one reusable buffer per connection with recv_into, and every complete frame in the buffer is
+# decoded after a single read, so a burst of small messages costs one system call rather than two per message.
+# Outgoing frames are kept as separate header and message buffers and queued per connection, then flushed
+# together with one scatter-gather write, so neither the header and message nor a burst of frames is copied
+# into one string first.
+import asyncio
+import collections
+import logging
+import struct
+
+# Length of the message that follows, unsigned 32 bit big-endian
+HEADER = struct.Struct('!I')
+# Largest message accepted, a corrupt or hostile header must not make a connection allocate gigabytes
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# Initial size of a connection's read buffer. Buffers are only allocated once data arrives and drop back to
+# this size after a large frame, so idle connections stay cheap.
+DEFAULT_BUFFER_SIZE = 4096
+# A buffer that grew past this many times its initial size is shrunk again once it is empty. Smaller ones are
+# kept, so a stream of frames just over the initial size does not reallocate for each of them.
+SHRINK_FACTOR = 16
+# Initial buffer size of a blocking socket reader, where one large buffer lets a single recv take many frames
+READER_BUFFER_SIZE = 65536
+# Frames a connection may hold unread before it stops reading from its socket
+MAX_PENDING_FRAMES = 64
+# Buffers passed to one sendmsg call, kept well under the IOV_MAX of every supported platform
+MAX_BUFFERS_PER_SEND = 512
+
+
+def frame_parts(message):
+    """
+    Encodes a message and makes the length header to go in front of it, without joining the two.
+
+    Args:
+        message (str or bytes): The message, bytes if it is already encoded.
+
+    Returns:
+        tuple: The header and the message, ready to be queued on any number of connections.
+    """
+    if isinstance(message, str):
+        message = message.encode()
+    return HEADER.pack(len(message)), message
+
+
+def make_frame(message):
+    """
+    Encodes a message and puts its length in front of it, ready to be sent to any number of sockets.
+
+    Args:
+        message (str or bytes): The message, bytes if it is already encoded.
+
+    Returns:
+        bytes: The length prefixed message.
+    """
+    if isinstance(message, str):
+        message = message.encode()
+    return HEADER.pack(len(message)) + message
+
+
+class FrameBuffer:
+    """
+    The FrameBuffer class splits a byte stream into frames. It owns the buffer bytes are received into, so the
+    same code serves blocking sockets (FrameReader) and asyncio protocols (FrameConnection).
+    """
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Initializes a new instance of the FrameBuffer class.
+
+        Args:
+            buffer_size (int): The initial size of the buffer, it grows to fit larger frames.
+            max_frame_size (int): The length above which a frame is rejected.
+        """
+        self.buffer_size = buffer_size
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.view = memoryview(self.buffer)
+        # Received bytes not yet returned as frames are buffer[start:end]
+        self.start = 0
+        self.end = 0
+
+    def missing(self):
+        """
+        Returns the number of bytes still needed to complete the frame being received.
+
+        Returns:
+            int: The missing bytes, at least 1.
+        """
+        available = self.end - self.start
+        if available < HEADER.size:
+            return HEADER.size - available
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        if length > self.max_frame_size:
+            raise ValueError(f"Frame of {length} bytes is larger than the limit of {self.max_frame_size}")
+        return max(HEADER.size + length - available, 1)
+
+    def get_buffer(self, sizehint=-1):
+        """
+        Returns the free space at the end of the buffer to receive into, making room first if the frame being
+        received would not fit.
+
+        Args:
+            sizehint (int): The number of bytes the caller would like to read, -1 if it has no preference.
+
+        Returns:
+            memoryview: The free space at the end of the buffer.
+        """
+        if self.start == self.end:
+            self.start = self.end = 0
+            if len(self.buffer) > self.buffer_size * SHRINK_FACTOR:
+                # Let go of the space a large frame needed
+                self.resize(self.buffer_size)
+        wanted = max(self.missing(), sizehint, 1)
+        if len(self.buffer) - self.end < wanted:
+            self.make_room(wanted)
+        return self.view[self.end:]
+
+    def make_room(self, wanted):
+        """
+        Moves the buffered bytes to the front of the buffer, growing it if that still leaves too little space.
+
+        Args:
+            wanted (int): The free space needed after the buffered bytes.
+        """
+        buffered = self.end - self.start
+        size = max(len(self.buffer), self.buffer_size)
+        while size - buffered < wanted:
+            size *= 2
+        if size != len(self.buffer):
+            self.resize(size)
+        else:
+            self.buffer[:buffered] = self.buffer[self.start:self.end]
+            self.start = 0
+            self.end = buffered
+
+    def resize(self, size):
+        """
+        Replaces the buffer with one of the given size holding the buffered bytes. A new buffer is allocated
+        because a bytearray cannot be resized while a memoryview of it exists.
+
+        Args:
+            size (int): The size of the new buffer.
+        """
+        buffer = bytearray(size)
+        buffered = self.end - self.start
+        buffer[:buffered] = self.view[self.start:self.end]
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.start = 0
+        self.end = buffered
+
+    def buffer_updated(self, nbytes):
+        """
+        Records bytes received into the space returned by get_buffer.
+
+        Args:
+            nbytes (int): The number of bytes received.
+        """
+        self.end += nbytes
+
+    def next_frame(self):
+        """
+        Removes and returns the next complete frame.
+
+        Returns:
+            bytes: The message in the frame, None if no complete frame is buffered.
+        """
+        available = self.end - self.start
+        if available < HEADER.size:
+            return None
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        if length > self.max_frame_size:
+            raise ValueError(f"Frame of {length} bytes is larger than the limit of {self.max_frame_size}")
+        if available < HEADER.size + length:
+            return None
+        frame_start = self.start + HEADER.size
+        self.start = frame_start + length
+        return bytes(self.view[frame_start:self.start])
+
+    def frames(self):
+        """
+        Removes and returns every complete frame.
+
+        Returns:
+            list: The messages in the frames, oldest first.
+        """
+        frames = []
+        frame = self.next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.next_frame()
+        return frames
+
+
+class FrameReader:
+    """
+    The FrameReader class reads frames from a blocking socket.
+    """
+    def __init__(self, sock, buffer_size=READER_BUFFER_SIZE):
+        """
+        Initializes a new instance of the FrameReader class.
+
+        Args:
+            sock (socket): The socket to read from.
+            buffer_size (int): The initial size of the read buffer.
+        """
+        self.sock = sock
+        self.frame_buffer = FrameBuffer(buffer_size)
+
+    def read_frame(self):
+        """
+        Returns the next frame, reading from the socket only when no complete frame is buffered.
+
+        Returns:
+            bytes: The message in the frame, None once the connection is closed.
+        """
+        frame = self.frame_buffer.next_frame()
+        while frame is None:
+            nbytes = self.sock.recv_into(self.frame_buffer.get_buffer())
+            if nbytes == 0:
+                return None
+            self.frame_buffer.buffer_updated(nbytes)
+            frame = self.frame_buffer.next_frame()
+        return frame
+
+
+class FrameWriter:
+    """
+    The FrameWriter class queues frames for a blocking socket and sends everything queued with as few sendmsg
+    calls as the socket allows, continuing where a partial send stopped.
+    """
+    def __init__(self, sock):
+        """
+        Initializes a new instance of the FrameWriter class.
+
+        Args:
+            sock (socket): The socket to write to.
+        """
+        self.sock = sock
+        # Header and message buffers waiting to be sent, oldest first
+        self.pending = []
+
+    def queue(self, message):
+        """
+        Queues a message to be sent by the next flush.
+
+        Args:
+            message (str or bytes): The message, bytes if it is already encoded.
+        """
+        self.pending.extend(frame_parts(message))
+
+    def flush(self):
+        """
+        Sends every queued frame.
+        """
+        if not hasattr(self.sock, 'sendmsg'):
+            # Windows sockets have no sendmsg
+            self.sock.sendall(b''.join(self.pending))
+            self.pending = []
+        while self.pending:
+            buffers = self.pending[:MAX_BUFFERS_PER_SEND]
+            sent = self.sock.sendmsg(buffers)
+            # Drop the buffers that went out in full and keep the unsent end of a partly sent one
+            sent_buffers = 0
+            for buffer in buffers:
+                if sent < len(buffer):
+                    break
+                sent -= len(buffer)
+                sent_buffers += 1
+            del self.pending[:sent_buffers]
+            if sent:
+                self.pending[0] = memoryview(self.pending[0])[sent:]
+
+    def send(self, message):
+        """
+        Sends a message straight away, along with anything already queued.
+
+        Args:
+            message (str or bytes): The message, bytes if it is already encoded.
+        """
+        self.queue(message)
+        self.flush()
+
+
+class FrameConnection(asyncio.BufferedProtocol):
+    """
+    The FrameConnection class is an asyncio protocol for one client connection. The event loop receives straight
+    into the connection's FrameBuffer, and the connection handler awaits whole frames with read_frame.
+
+    Frames written with queue_frame are held until the end of the current event loop iteration and then handed
+    to the transport together with writelines, so frames queued for a client by several tasks in the same
+    iteration leave in one write. drain flushes at once and waits for the transport to catch up.
+    """
+    def __init__(self, on_connect, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Initializes a new instance of the FrameConnection class.
+
+        Args:
+            on_connect (callable): A coroutine function run as a task with the connection once it is made.
+            buffer_size (int): The initial size of the read buffer.
+        """
+        self.on_connect = on_connect
+        self.frame_buffer = FrameBuffer(buffer_size)
+        # Complete frames waiting to be read by the handler
+        self.received = collections.deque()
+        self.transport = None
+        self.handler = None
+        self.closed = False
+        self.reading_paused = False
+        # Futures of the handler waiting for a frame, or for the transport's write buffer to drain
+        self.read_waiter = None
+        self.drain_waiter = None
+        self.writing_paused = False
+        # Header and message buffers queued since the last flush
+        self.outgoing = []
+        self.flush_scheduled = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.handler = asyncio.get_running_loop().create_task(self.on_connect(self))
+
+    def get_buffer(self, sizehint):
+        return self.frame_buffer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self.frame_buffer.buffer_updated(nbytes)
+        try:
+            self.received.extend(self.frame_buffer.frames())
+        except ValueError as e:
+            logging.error(f"Closing connection from {self.get_extra_info('peername')}: {str(e)}")
+            self.transport.close()
+            return
+        if len(self.received) >= MAX_PENDING_FRAMES and not self.reading_paused:
+            # The handler is not keeping up, leave the rest in the socket's receive buffer for now
+            self.reading_paused = True
+            self.transport.pause_reading()
+        self.wake(self.read_waiter)
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self.wake(self.read_waiter)
+        self.wake(self.drain_waiter)
+
+    def pause_writing(self):
+        self.writing_paused = True
+
+    def resume_writing(self):
+        self.writing_paused = False
+        self.wake(self.drain_waiter)
+
+    def wake(self, waiter):
+        """
+        Wakes the handler if it is waiting on the given future.
+
+        Args:
+            waiter (asyncio.Future): The future the handler may be waiting on.
+        """
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def read_frame(self):
+        """
+        Returns the next frame, waiting for one to arrive if none is buffered.
+
+        Returns:
+            bytes: The message in the frame.
+
+        Raises:
+            ConnectionResetError: If the connection closed before another frame arrived.
+        """
+        while not self.received:
+            if self.closed:
+                raise ConnectionResetError("Connection closed by the client")
+            self.read_waiter = asyncio.get_running_loop().create_future()
+            await self.read_waiter
+        frame = self.received.popleft()
+        if self.reading_paused and len(self.received) < MAX_PENDING_FRAMES // 2:
+            self.reading_paused = False
+            self.transport.resume_reading()
+        return frame
+
+    def queue_frame(self, frame):
+        """
+        Queues a frame to be sent at the end of the current event loop iteration.
+
+        Args:
+            frame (tuple): The header and message buffers made by frame_parts.
+        """
+        self.outgoing.extend(frame)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        """
+        Hands every queued frame to the transport in one writelines call.
+        """
+        self.flush_scheduled = False
+        if not self.outgoing:
+            return
+        if not self.closed:
+            self.transport.writelines(self.outgoing)
+        self.outgoing = []
+
+    async def drain(self):
+        """
+        Flushes the queued frames and waits until the transport's write buffer is below its high water mark.
+
+        Raises:
+            ConnectionResetError: If the connection is closed.
+        """
+        if self.closed:
+            raise ConnectionResetError("Connection closed by the client")
+        self.flush()
+        while self.writing_paused and not self.closed:
+            self.drain_waiter = asyncio.get_running_loop().create_future()
+            await self.drain_waiter
+
+    def close(self):
+        """
+        Closes the connection once any queued frames are sent.
+        """
+        self.flush()
+        self.transport.close()
+
+    def get_extra_info(self, name, default=None):
+        """
+        Returns information about the transport, such as 'peername'.
+
+        Args:
+            name (str): The name of the information.
+            default: The value returned if the information is not available.
+
+        Returns:
+            The information.
+        """
+        return self.transport.get_extra_info(name, default)
@@ -1,9 +1,63 @@
-from deck import Deck
-import random
+from deck import Deck, CARD_CATALOG, SUIT_MASKS, SPECIAL_MASK, card_ids_to_mask
+from game_random import GameRandom
+from phase import Phase
 import copy
 import time
-import asyncio
+import logging
 
+# Every value Game.leading_suit can take, in the order they index TRICK_DOMINANCE
+LEADING_SUITS = ('', 'Parrot', 'Pirate Map', 'Treasure Chest', 'Jolly Roger', 'None Pirate', 'None Escape')
+LEADING_SUIT_INDEX = {leading_suit: index for index, leading_suit in enumerate(LEADING_SUITS)}
+NUM_CARDS = len(CARD_CATALOG)
+
+def build_trick_dominance():
+    """
+    Build the table of which card takes a trick from which, for every leading suit.
+
+    A card takes the trick from the card currently winning it when it has a higher priority, or the same
+    priority, the leading suit and a higher number. Cards are compared in the order they were played.
+
+    Returns:
+        bytes: Flat table where byte [(leading_suit_index * NUM_CARDS + challenger) * NUM_CARDS + winning_card]
+            is 1 if challenger takes the trick from winning_card.
+    """
+    table = bytearray(len(LEADING_SUITS) * NUM_CARDS * NUM_CARDS)
+    for leading_suit_index, leading_suit in enumerate(LEADING_SUITS):
+        for challenger in CARD_CATALOG:
+            row = (leading_suit_index * NUM_CARDS + challenger.card_id) * NUM_CARDS
+            for winning_card in CARD_CATALOG:
+                if challenger.priority > winning_card.priority:
+                    table[row + winning_card.card_id] = 1
+                elif (challenger.priority == winning_card.priority and challenger.suit == leading_suit
+                      and challenger.number > winning_card.number):
+                    table[row + winning_card.card_id] = 1
+    return bytes(table)
+
+TRICK_DOMINANCE = build_trick_dominance()
+
+def trick_bonus(card_ids):
+    """
+    Adds up the bonus points in a trick for whoever wins it. Standard cards always count their bonus, a
+    pirate only counts when the skull king was played before it.
+
+    Args:
+        card_ids (list): The ids of the cards in the trick, in the order they were played.
+
+    Returns:
+        int: The bonus points in the trick.
+    """
+    total_bonus = 0
+    skull_king = False
+    for card_id in card_ids:
+        card = CARD_CATALOG[card_id]
+        if card.suit is not None:
+            total_bonus += card.bonus
+        else:
+            if card.type == 'Skull King':
+                skull_king = True
+            elif card.type == 'Pirate' and skull_king:
+                total_bonus += card.bonus
+    return total_bonus
 
 # Define the Game class to manage the Pirate King card game
 class Game:
@@ -14,7 +68,8 @@ class Game:
     """
     MAX_ROUNDS = 10
 
-    def __init__(self, players, game_id, action_translator, game_state_dict, action_queue):
+    def __init__(self, players, game_id, action_translator=None, game_state_dict=None, action_queue=None, rng=None,
+                 event_log=None):
         """
         Initialize a new game of Pirate King.
 
@@ -22,10 +77,15 @@ class Game:
             players (list): The list of players in the game.
             game_id (str): The unique identifier for the game.
             action_translator (ActionTranslator): The object that translates actions between the game and the network.
-            game_state_dict (dict): The dictionary that holds the current game state.
-            action_queue (Queue): The queue that holds the actions to be processed.
-        """
-        self.players = players
+                Only needed when the game is driven by game_loop.
+            game_state_dict (dict): The dictionary that holds the current game state. Only needed by game_loop.
+            action_queue (ActionBarrier): The barrier that collects each player's action or acknowledgement.
+                Only needed by game_loop.
+            rng (GameRandom): The random number generator for shuffles and the first dealer. Defaults to a
+                new GameRandom with a fresh seed.
+            event_log (GameEventLog): The log every state change of the game is appended to. Optional.
+        """
+        self.set_players(players)
         self.game_id = game_id
         self.action_translator = action_translator
         self.game_state_dict = game_state_dict
@@ -34,27 +94,36 @@ class Game:
         self.deck = None
         # List of cards representing a single trick
         self.trick = {}
-        self.tricks = {}
+        # Running count of tricks and bonus points each player has won this round, keyed by player ID
+        self.tricks_won = {}
+        self.round_bonus = {}
         self.bids = {}
         self.hands = {}
         self.trick_winner = {}
         self.score_sheet = {}
-        self.dealer = random.choice(self.players)
+        self.rng = rng if rng is not None else GameRandom()
+        self.dealer = self.rng.choice(self.players)
         # Index that keeps track of whose turn it is
         self.current_player = self.who_goes_first()
         self.previous_player = 0
         self.phase = ""
         self.round_is_over = False
         self.leading_suit = ''
+        self.event_log = event_log
+        if self.event_log is not None:
+            self.event_log.start(self)
 
     def set_players(self, players):
         """
-        Set the players for the game.
+        Set the players for the game and rebuild the seat registry.
 
         Args:
-            players (list): The list of players.
+            players (list): The list of players, in seating order.
         """
         self.players = players
+        # Seat registry mapping each player_id to its index in players. The players never change seats during
+        # a game, so reducer copies share it and it is only rebuilt here.
+        self.seats = {player.get('player_id'): seat for seat, player in enumerate(players)}
 
     def get_players(self):
         """
@@ -89,6 +158,15 @@ class Game:
         """
         self.round += 1
     
+    def get_rng(self):
+        """
+        Get the random number generator of the game.
+
+        Returns:
+            GameRandom: The random number generator.
+        """
+        return self.rng
+
     def get_round(self):
         """
         Get the current round number.
@@ -161,14 +239,23 @@ class Game:
         """
         return self.trick
     
-    def get_tricks(self):
+    def get_tricks_won(self):
         """
-        Get all the tricks played in the game.
+        Get the number of tricks each player has won this round.
 
         Returns:
-            dict: The tricks played in the game.
+            dict: The number of tricks won, keyed by player ID.
         """
-        return self.tricks
+        return self.tricks_won
+
+    def get_round_bonus(self):
+        """
+        Get the bonus points each player has captured in the tricks they won this round.
+
+        Returns:
+            dict: The bonus points, keyed by player ID.
+        """
+        return self.round_bonus
     
     def get_phase(self):
         """
@@ -224,6 +311,18 @@ class Game:
         """
         return len(self.trick) == len(self.players)
     
+    def get_seat(self, player_id):
+        """
+        Get the seat of a player from their ID.
+
+        Args:
+            player_id (str): The ID of the player.
+
+        Returns:
+            int: The index of the player in the players list, or None if no player has the ID.
+        """
+        return self.seats.get(player_id)
+
     def get_player_from_id(self, player_id):
         """
         Get a player from their ID.
@@ -232,11 +331,11 @@ class Game:
             player_id (str): The ID of the player.
 
         Returns:
-            Player: The player with the given ID.
+            Player: The player with the given ID, or None if no player has the ID.
         """
-        for player in self.players:
-            if player_id in player.values():
-                return player
+        seat = self.seats.get(player_id)
+        if seat is not None:
+            return self.players[seat]
             
     def update_state(self, new_state):
         """
@@ -254,9 +353,130 @@ class Game:
         """
         state_to_send = self.action_translator.game_state_to_network(self)
         self.game_state_dict['game_state'] = state_to_send
+        # Encoded once here, every player's connection sends the frame made for them
+        private_states = self.action_translator.private_states_to_network(self)
+        self.game_state_dict['frames'] = self.action_translator.encode_state_frames(state_to_send, private_states,
+                                                                                 list(self.seats))
         self.action_translator.get_send_game_state_flag().set()
 
     
+    def apply_event(self, event):
+        """
+        Apply one state change to the game. Every change the reducer makes goes through here, so replaying
+        the recorded events on a snapshot rebuilds the game.
+
+        Args:
+            event (dict): The event, with a 'type' key and the fields that type needs.
+        """
+        event_type = event['type']
+        if event_type == 'PHASE':
+            self.phase = Phase(event['phase'])
+        elif event_type == 'NEW_DEALER':
+            self.choose_next_dealer()
+            self.current_player = self.who_goes_first()
+        elif event_type == 'INIT_ROUND':
+            self.init_round_variables()
+        elif event_type == 'DEAL':
+            self.deal_cards()
+        elif event_type == 'BID':
+            self.make_bid(event['player_id'], event['bid'])
+        elif event_type == 'PLAY_CARD':
+            self.leading_suit = event['leading_suit']
+            self.take_turn(event['player_id'], event['card_index'])
+        elif event_type == 'RESOLVE':
+            self.finish_trick()
+        elif event_type == 'SCORE':
+            self.calculate_round_scores()
+        elif event_type == 'NEXT_ROUND':
+            self.round += 1
+        else:
+            raise ValueError(f"Unknown game event: {event_type}")
+
+    def record_event(self, event):
+        """
+        Apply an event to the game and append it to the game's event log, if it has one.
+
+        Args:
+            event (dict): The event to apply, see apply_event.
+        """
+        self.apply_event(event)
+        if self.event_log is not None:
+            self.event_log.append(event, self)
+
+    def to_snapshot(self):
+        """
+        Capture everything needed to rebuild the game, in a form that can be written as JSON.
+
+        Returns:
+            dict: The snapshot.
+        """
+        rng_state = self.rng.capture()
+        return {'game_id': self.game_id,
+                'players': self.players,
+                'round': self.round,
+                'phase': self.phase,
+                'deck': self.deck.cards if self.deck is not None else None,
+                'trick': self.trick,
+                'tricks_won': self.tricks_won,
+                'round_bonus': self.round_bonus,
+                'bids': self.bids,
+                'hands': self.hands,
+                'trick_winner': self.trick_winner.get('player_id') if self.trick_winner else None,
+                'score_sheet': self.score_sheet,
+                'dealer': self.seats[self.dealer.get('player_id')],
+                'current_player': self.current_player,
+                'previous_player': self.previous_player,
+                'round_is_over': self.round_is_over,
+                'leading_suit': self.leading_suit,
+                'rng_seed': self.rng.get_seed(),
+                'rng_state': [rng_state[0], list(rng_state[1]), rng_state[2]]}
+
+    def load_snapshot(self, snapshot):
+        """
+        Restore the game to a snapshot taken with to_snapshot.
+
+        Args:
+            snapshot (dict): The snapshot.
+        """
+        self.set_players(snapshot['players'])
+        self.round = snapshot['round']
+        self.phase = Phase(snapshot['phase']) if snapshot['phase'] else ""
+        self.deck = None
+        if snapshot['deck'] is not None:
+            self.deck = Deck(self.rng)
+            self.deck.cards = snapshot['deck']
+        self.trick = snapshot['trick']
+        self.tricks_won = snapshot['tricks_won']
+        self.round_bonus = snapshot['round_bonus']
+        self.bids = snapshot['bids']
+        self.hands = snapshot['hands']
+        self.trick_winner = self.get_player_from_id(snapshot['trick_winner']) if snapshot['trick_winner'] else {}
+        self.score_sheet = snapshot['score_sheet']
+        self.dealer = self.players[snapshot['dealer']]
+        self.current_player = snapshot['current_player']
+        self.previous_player = snapshot['previous_player']
+        self.round_is_over = snapshot['round_is_over']
+        self.leading_suit = snapshot['leading_suit']
+        self.rng = GameRandom(snapshot['rng_seed'])
+        rng_state = snapshot['rng_state']
+        self.rng.restore((rng_state[0], tuple(rng_state[1]), rng_state[2]))
+        if self.deck is not None:
+            self.deck.rng = self.rng
+
+    def copy_state(self):
+        """
+        Create a structurally shared copy of the game for a reducer step.
+
+        Only the top level attribute dict is copied. Containers such as hands, bids and tricks_won are shared
+        with the previous state, so every method that changes one of them must rebind the attribute to a
+        new container instead of mutating it in place. The random number generator is shared as well, draws
+        only ever move it forward.
+
+        Returns:
+            Game: The new game state.
+        """
+        return copy.copy(self)
+
     def __deepcopy__(self, memo):
         """
         Create a deep copy of the game.
@@ -270,11 +490,13 @@ class Game:
 
         new_instance = copy.copy(self)
         new_instance.players = copy.deepcopy(self.players, memo)
+        new_instance.seats = copy.deepcopy(self.seats, memo)
         new_instance.game_id = copy.deepcopy(self.game_id, memo)
         new_instance.round = copy.deepcopy(self.round, memo)
         new_instance.deck = copy.deepcopy(self.deck, memo)
         new_instance.trick = copy.deepcopy(self.trick, memo)
-        new_instance.tricks = copy.deepcopy(self.tricks, memo)
+        new_instance.tricks_won = copy.deepcopy(self.tricks_won, memo)
+        new_instance.round_bonus = copy.deepcopy(self.round_bonus, memo)
         new_instance.bids = copy.deepcopy(self.bids, memo)
         new_instance.hands = copy.deepcopy(self.hands, memo)
         new_instance.trick_winner = copy.deepcopy(self.trick_winner, memo)
@@ -291,29 +513,23 @@ class Game:
         return new_instance
 
 
-    def deal_hand(self):
-        """
-        Deal a hand of cards from the deck.
-
-        Returns:
-            list: A list of cards representing a hand.
-        """
-        hand = []
-        for _ in range(self.round):
-            card = self.deck.deal()
-            card_dict = card.to_dict()
-            hand.append(card_dict)
-        return hand
-
     def deal_cards(self):
         """
         Deal cards to all players.
+
+        Raises:
+            ValueError: If the deck is too small for every player to get a card per round, from 7 players in the
+                last rounds.
         """
-        print(f"Dealing cards...")
-        for player in self.players:
-            player_id = player.get('player_id')
-            hand = self.deal_hand()
-            self.hands[player_id] = hand
+        logging.debug("Dealing cards...")
+        if len(self.players) * self.round > len(self.deck.cards):
+            raise ValueError(f"{len(self.players)} players cannot be dealt {self.round} cards each "
+                             f"from a deck of {len(self.deck.cards)} cards")
+        # Dealing removes cards from the deck, so work on a copy the previous state does not share
+        self.set_deck(self.deck.copy())
+        # The deck is already one shuffled permutation, so every hand is a slice of it
+        dealt_hands = self.deck.deal_hands(len(self.players), self.round)
+        self.hands = {player.get('player_id'): card_ids_to_mask(hand) for player, hand in zip(self.players, dealt_hands)}
 
     async def game_reducer(self, action=None):
         """
@@ -329,88 +545,142 @@ class Game:
         #     if not self.validate_action(action):
         #         return False
 
-        new_state = copy.deepcopy(self)
-
-        if new_state.phase == "STARTING":
-            print(f"In the starting phase...")
-            new_state.init_round_variables()
-            new_state.send_state()
-            print("State is sent")
-            # new_state.game_state_dict.put(state_to_send)
-            # print(self.game_state_dict.get('game_state'))
-            if await new_state.can_advance_game_state():
-                new_state.phase = "DEALING"
-
-        elif new_state.phase == "DEALING":
-            print("In the dealing state")
-            new_state.deal_cards()
-            new_state.send_state()
-            # new_state.game_state_dict.put(state_to_send)
-            if await new_state.can_advance_game_state():
-                new_state.phase = "START_BIDDING" 
-       
-        elif new_state.phase == "START_BIDDING":
-            new_state.send_state()
-            new_state.phase = "BIDDING"
-
-        elif new_state.phase == "BIDDING":
-            if action['type'] == 'BID' and new_state.validate_bid(action['player_id']):
-                new_state.make_bid(action['player_id'], action['bid'])
-            # Check if bidding is over and move to the next phase
-            if len(new_state.get_bids()) == len(new_state.get_players()):
-                new_state.send_state()
-                if await new_state.can_advance_game_state():
-                    new_state.phase = "START_PLAYING"
-
-        elif new_state.phase == "START_PLAYING":
-            # print("We are in the start playing phase...")
-            new_state.send_state()
-            new_state.phase = "PLAYING"
-
-        elif new_state.phase == "PLAYING":
-            print("We are in the playing phase...")
-            if action['type'] == 'PLAY_CARD' and new_state.validate_play_card(action['player_id'], action['card_index']):
-                new_state.play_card(action['player_id'], action['card_index'])
-                new_state.previous_player = self.current_player
-                if len(new_state.trick) < len(new_state.players):
-                    new_state.advance_turn()
-                    print(f"Advancing turn to {new_state.get_current_player().get('username')}")
-            if new_state.action_queue.empty():
-                new_state.send_state()
-
-            # Check if the trick is complete and move to resolving phase
-            if new_state.trick_complete() and await self.can_advance_game_state():
-                new_state.phase = "RESOLVING"
-
-        elif new_state.phase == "RESOLVING":
-            print("We are in the resolving phase...")
-            winner_id = new_state.resolve_trick()
-            # print(f"This is the winner_id: {winner_id}")
-            winner = new_state.get_player_from_id(winner_id)
-            print(f"This is the winning player: {winner}")
-            new_state.current_player = new_state.players.index(winner) 
-            new_state.leading_suit = ''
-            new_state.trick = {}
-            new_state.send_state()
-            new_state.round_is_over = new_state.check_round_over()
-            print(f"Round is over: {new_state.round_is_over}")
-
-            # Check if the round is over and move to the next phase or round
-            if new_state.round_is_over and await new_state.can_advance_game_state():
-                new_state.phase = "CALCULATE_SCORES"
-            elif not new_state.round_is_over and await new_state.can_advance_game_state():
-                new_state.phase = "START_PLAYING"
-        elif new_state.phase == "CALCULATE_SCORES":
-            new_state.calculate_round_scores()
-            new_state.send_state()
-
-            if await new_state.can_advance_game_state():
-                new_state.round += 1
-                new_state.phase = "STARTING"
-
-        # new_state.action_translator.get_send_game_state_flag().clear()
+        new_state = self.copy_state()
+        # One lookup picks the handler of the current phase, a phase without one leaves the state as it is
+        reducer = self.PHASE_REDUCERS.get(new_state.phase)
+        if reducer is not None:
+            await reducer(new_state, action)
         return new_state
 
+    async def reduce_starting(self, action):
+        """
+        Sets up a new round and tells the players it is starting.
+
+        Args:
+            action (dict): Unused, the phase advances on acknowledgements.
+        """
+        print(f"In the starting phase...")
+        self.record_event({'type': 'INIT_ROUND'})
+        self.send_state()
+        print("State is sent")
+        if await self.can_advance_game_state():
+            self.record_event({'type': 'PHASE', 'phase': Phase.DEALING})
+
+    async def reduce_dealing(self, action):
+        """
+        Deals the round's hands and sends them out.
+
+        Args:
+            action (dict): Unused, the phase advances on acknowledgements.
+        """
+        print("In the dealing state")
+        self.record_event({'type': 'DEAL'})
+        self.send_state()
+        if await self.can_advance_game_state():
+            self.record_event({'type': 'PHASE', 'phase': Phase.START_BIDDING})
+
+    async def reduce_start_bidding(self, action):
+        """
+        Asks the players for their bids.
+
+        Args:
+            action (dict): Unused.
+        """
+        self.send_state()
+        self.record_event({'type': 'PHASE', 'phase': Phase.BIDDING})
+
+    async def reduce_bidding(self, action):
+        """
+        Records a player's bid and moves on to playing once everyone has bid.
+
+        Args:
+            action (dict): The BID action.
+        """
+        if action['type'] == 'BID' and self.validate_bid(action['player_id']):
+            self.record_event({'type': 'BID', 'player_id': action['player_id'], 'bid': action['bid']})
+        # Check if bidding is over and move to the next phase
+        if len(self.get_bids()) == len(self.get_players()):
+            self.send_state()
+            if await self.can_advance_game_state():
+                self.record_event({'type': 'PHASE', 'phase': Phase.START_PLAYING})
+
+    async def reduce_start_playing(self, action):
+        """
+        Tells the players who leads the next trick.
+
+        Args:
+            action (dict): Unused.
+        """
+        self.send_state()
+        self.record_event({'type': 'PHASE', 'phase': Phase.PLAYING})
+
+    async def reduce_playing(self, action):
+        """
+        Plays a player's card and moves on to resolving once the trick is complete.
+
+        Args:
+            action (dict): The PLAY_CARD action.
+        """
+        print("We are in the playing phase...")
+        if action['type'] == 'PLAY_CARD' and self.validate_play_card(action['player_id'], action['card_index']):
+            # Validation may have set the leading suit, record it so the play replays the same way
+            self.record_event({'type': 'PLAY_CARD', 'player_id': action['player_id'],
+                               'card_index': action['card_index'], 'leading_suit': self.leading_suit})
+            if not self.trick_complete():
+                print(f"Advancing turn to {self.get_current_player().get('username')}")
+        if self.action_queue.empty():
+            self.send_state()
+
+        # Check if the trick is complete and move to resolving phase
+        if self.trick_complete() and await self.can_advance_game_state():
+            self.record_event({'type': 'PHASE', 'phase': Phase.RESOLVING})
+
+    async def reduce_resolving(self, action):
+        """
+        Resolves the trick and moves on to the next trick or to scoring.
+
+        Args:
+            action (dict): Unused, the phase advances on acknowledgements.
+        """
+        print("We are in the resolving phase...")
+        self.record_event({'type': 'RESOLVE'})
+        print(f"This is the winning player: {self.get_trick_winner()}")
+        self.send_state()
+        print(f"Round is over: {self.round_is_over}")
+
+        # Check if the round is over and move to the next phase or round
+        if self.round_is_over and await self.can_advance_game_state():
+            self.record_event({'type': 'PHASE', 'phase': Phase.CALCULATE_SCORES})
+        elif not self.round_is_over and await self.can_advance_game_state():
+            self.record_event({'type': 'PHASE', 'phase': Phase.START_PLAYING})
+
+    async def reduce_calculate_scores(self, action):
+        """
+        Scores the round and moves on to the next one.
+
+        Args:
+            action (dict): Unused, the phase advances on acknowledgements.
+        """
+        self.record_event({'type': 'SCORE'})
+        self.send_state()
+
+        if await self.can_advance_game_state():
+            self.record_event({'type': 'NEXT_ROUND'})
+            self.record_event({'type': 'PHASE', 'phase': Phase.STARTING})
+
+    # The reducer step of each phase. A new phase, or an expansion rule replacing a step, registers its
+    # handler here.
+    PHASE_REDUCERS = {
+        Phase.STARTING: reduce_starting,
+        Phase.DEALING: reduce_dealing,
+        Phase.START_BIDDING: reduce_start_bidding,
+        Phase.BIDDING: reduce_bidding,
+        Phase.START_PLAYING: reduce_start_playing,
+        Phase.PLAYING: reduce_playing,
+        Phase.RESOLVING: reduce_resolving,
+        Phase.CALCULATE_SCORES: reduce_calculate_scores,
+    }
+
     async def can_advance_game_state(self):
         """
         Check if the game state can be advanced.
@@ -418,9 +688,11 @@ class Game:
         Returns:
             bool: True if all actions in the queue have been acknowledged, False otherwise.
         """
-        while not self.action_queue.full():
-            await asyncio.sleep(0)  # yield control to the event loop
-        
+        # Waiting on players is the quiet moment to write out buffered events
+        if self.event_log is not None:
+            self.event_log.flush()
+        await self.action_queue.wait_full()
+
         acks_list = []
         while not self.action_queue.empty():
             game_action_ack = await self.action_queue.get() 
@@ -434,13 +706,9 @@ class Game:
         Check if the round is over.
 
         Returns:
-            bool: True if the sum of all tricks equals the round number, False otherwise.
+            bool: True if the sum of all tricks won equals the round number, False otherwise.
         """
-        trick_sum = 0
-        for trick_dict in self.tricks.values():
-            trick_sum += len(trick_dict)
-
-        return trick_sum == self.round
+        return sum(self.tricks_won.values()) == self.round
     
     def make_bid(self, player_id, bid):
         """
@@ -450,7 +718,7 @@ class Game:
             player_id (str): The ID of the player.
             bid (int): The bid amount.
         """
-        self.bids[player_id] = bid
+        self.bids = {**self.bids, player_id: bid}
     
     def has_bid(self, player_id):
         """
@@ -484,6 +752,46 @@ class Game:
             validate_bid = True
         return validate_bid
     
+    def get_card_from_hand(self, player_id, card_index):
+        """
+        Get a card from a player's hand by its position. Hands are shown to players ordered by card id.
+
+        Args:
+            player_id (str): The ID of the player.
+            card_index (int): The index of the card in the player's hand.
+
+        Returns:
+            int: The card id, or None if the hand has no card at that index.
+        """
+        remaining_cards = self.hands.get(player_id)
+        if card_index < 0:
+            return None
+        # Walk the set bits from the lowest card id up
+        while remaining_cards:
+            lowest_card = remaining_cards & -remaining_cards
+            if card_index == 0:
+                return lowest_card.bit_length() - 1
+            remaining_cards ^= lowest_card
+            card_index -= 1
+        return None
+
+    def legal_moves(self, player_id):
+        """
+        Get the cards a player may play given the current leading suit.
+
+        Args:
+            player_id (str): The ID of the player.
+
+        Returns:
+            int: The mask of playable card ids, see deck.mask_to_card_ids.
+        """
+        player_hand = self.hands.get(player_id)
+        suit_mask = SUIT_MASKS.get(self.leading_suit)
+        # Anything goes when no suit leads or the player cannot follow it
+        if suit_mask is None or not player_hand & suit_mask:
+            return player_hand
+        return player_hand & (suit_mask | SPECIAL_MASK)
+
     def suit_not_in_hand(self, player_id):
         """
         Check if a player's hand does not contain the leading suit.
@@ -494,12 +802,7 @@ class Game:
         Returns:
             bool: True if the player's hand does not contain the leading suit, False otherwise.
         """
-        player_hand = self.hands.get(player_id)
-        for card in player_hand:
-            suit = card.get('suit')
-            if suit == self.leading_suit:
-                return False
-        return True
+        return not self.hands.get(player_id) & SUIT_MASKS.get(self.leading_suit, 0)
        
     def validate_play_card(self, player_id, card_index):
         """
@@ -514,18 +817,18 @@ class Game:
         """
         if not self.is_player_turn(player_id):
             valid_play = False
-            print("It is not your turn...")
+            logging.debug("It is not your turn...")
         else:
-            player_hand = self.hands.get(player_id)
-            card = player_hand[card_index]
-            if card in player_hand:
+            card_id = self.get_card_from_hand(player_id, card_index)
+            if card_id is not None:
+                card = CARD_CATALOG[card_id]
                 if not self.leading_suit:
                     valid_play = True
-                    if 'suit' in card:
-                        self.leading_suit = card.get('suit')
+                    if card.suit is not None:
+                        self.leading_suit = card.suit
                     else:
                         # Made with the assumption that type "Tigress" will never be used because her type will be set to either escape or pirate in the client
-                        if card.get('type') in ['Pirate', 'Skull King', 'Kraken', 'White Whale', 'Mermaid']:
+                        if card.type in ['Pirate', 'Skull King', 'Kraken', 'White Whale', 'Mermaid']:
                             self.leading_suit = "None Pirate"
                         else:
                             self.leading_suit = "None Escape"
@@ -534,28 +837,19 @@ class Game:
                         valid_play = True
                     elif self.leading_suit == "None Escape":
                         valid_play = True
-                        if 'suit' in card:
-                            self.leading_suit = card.get('suit')
+                        if card.suit is not None:
+                            self.leading_suit = card.suit
                         else:
                             # Made with the assumption that type "Tigress" will never be used because her type will be set to either escape or pirate in the client
-                            if card.get('type') in ['Pirate', 'Skull King', 'Kraken', 'White Whale', 'Mermaid']:
+                            if card.type in ['Pirate', 'Skull King', 'Kraken', 'White Whale', 'Mermaid']:
                                 self.leading_suit = "None Pirate"
                             else:
                                 self.leading_suit = "None Escape"
                     else:
-                        if 'suit' in card:
-                            if card.get('suit') == self.leading_suit:
-                                valid_play = True
-                            else:
-                                if self.suit_not_in_hand(player_id):
-                                    valid_play = True
-                                else:
-                                    valid_play = False
-                        else:
-                            valid_play = True
+                        valid_play = bool(self.legal_moves(player_id) & (1 << card_id))
             else:
                 valid_play = False
-                print("That card is not in your hand...")            
+                logging.debug("That card is not in your hand...")
 
         return valid_play
 
@@ -568,10 +862,49 @@ class Game:
             player_id (str): The ID of the player.
             card_index (int): The index of the card in the player's hand.
         """
-        player_hand = self.hands.get(player_id)
-        card = player_hand[card_index]
-        player_hand.remove(card)
-        self.trick[player_id] = card
+        card_id = self.get_card_from_hand(player_id, card_index)
+        self.hands = {**self.hands, player_id: self.hands.get(player_id) & ~(1 << card_id)}
+        self.trick = {**self.trick, player_id: card_id}
+
+    def take_turn(self, player_id, card_index):
+        """
+        Plays a validated card for the current player and passes the turn on unless the trick is complete.
+
+        Args:
+            player_id (str): The ID of the player.
+            card_index (int): The index of the card in the player's hand.
+        """
+        self.play_card(player_id, card_index)
+        self.previous_player = self.current_player
+        if not self.trick_complete():
+            self.advance_turn()
+
+    def finish_trick(self):
+        """
+        Resolves the complete trick, hands the lead to its winner and clears the table for the next trick.
+
+        Returns:
+            str: The ID of the winner.
+        """
+        winner_id = self.resolve_trick()
+        self.current_player = self.seats[winner_id]
+        self.leading_suit = ''
+        self.trick = {}
+        self.round_is_over = self.check_round_over()
+        return winner_id
+
+    def get_card_index(self, player_id, card_id):
+        """
+        Gets the position of a card in a player's hand, the inverse of get_card_from_hand.
+
+        Args:
+            player_id (str): The ID of the player.
+            card_id (int): The id of a card in the player's hand.
+
+        Returns:
+            int: The index of the card in the player's hand.
+        """
+        return (self.hands.get(player_id) & ((1 << card_id) - 1)).bit_count()
 
     def choose_next_dealer(self):
         """
@@ -580,17 +913,9 @@ class Game:
         Returns:
             Player: The next dealer.
         """
-        current_dealer_index = self.players.index(self.dealer)
-        # If the current dealer is not the last player in the list,
-        # add 1 to the index to find the next one.
-        if current_dealer_index < (len(self.players) - 1):
-            dealer = self.players[current_dealer_index + 1]
-        # If the current dealer is the last player,
-        # loop back around to the first person
-        elif current_dealer_index == (len(self.players) - 1):
-            dealer = self.players[0]
-
-        self.dealer = dealer
+        current_dealer_index = self.seats[self.dealer.get('player_id')]
+        # The seat after the current dealer, looping back around to the first person
+        self.dealer = self.players[(current_dealer_index + 1) % len(self.players)]
         return self.dealer
 
     def who_goes_first(self):
@@ -600,17 +925,9 @@ class Game:
         Returns:
             int: The index of the first player.
         """
-        dealer_index = self.players.index(self.dealer)
-        # If the current dealer is not the last player in the list,
-        # add 1 to the index to find the next one.
-        if dealer_index < (len(self.players) - 1):
-            first_player = self.players[dealer_index + 1]
-        # If the current dealer is the last player,
-        # loop back around to the first person
-        elif dealer_index == (len(self.players) - 1):
-            first_player = self.players[0]
-
-        return self.players.index(first_player)
+        dealer_index = self.seats[self.dealer.get('player_id')]
+        # The seat after the dealer, looping back around to the first person
+        return (dealer_index + 1) % len(self.players)
 
     def is_player_turn(self, player_id):
         """
@@ -635,12 +952,13 @@ class Game:
         Initializes the variables for a round.
         """
         self.leading_suit = ''
-        self.tricks = {}
+        self.tricks_won = {}
+        self.round_bonus = {}
         self.trick_winner = {}
         self.trick = {}
         self.bids = {}
         self.round_is_over = False
-        self.set_deck(Deck())
+        self.set_deck(Deck(self.rng))
         self.deck.shuffle()
         # self.update_state()
     
@@ -648,7 +966,7 @@ class Game:
         """
         Starts a round.
         """
-        self.phase = "STARTING"
+        self.record_event({'type': 'PHASE', 'phase': Phase.STARTING})
         new_state = await self.game_reducer()
         self.update_state(new_state)
 
@@ -667,8 +985,7 @@ class Game:
         # print(f"Started bidding phase...")
         new_state = await self.game_reducer()
 
-        while not self.action_queue.full():
-            await asyncio.sleep(0)
+        await self.action_queue.wait_full()
 
         self.update_state(new_state)
 
@@ -702,8 +1019,7 @@ class Game:
         while not self.round_is_over:
             new_state = None
 
-            while not self.action_queue.full():
-                await asyncio.sleep(0)
+            await self.action_queue.wait_full()
 
             while not self.action_queue.empty():
                 action = await self.action_queue.get()
@@ -711,9 +1027,9 @@ class Game:
                 new_state = await self.game_reducer(action)
                 self.update_state(new_state)
             print("Out of action loop...")
-            if self.phase == "RESOLVING":
+            if self.phase == Phase.RESOLVING:
                 new_state = await self.game_reducer()
-                if new_state.phase == "START_PLAYING":
+                if new_state.phase == Phase.START_PLAYING:
                     await new_state.start_playing_phase()
 
             self.update_state(new_state)
@@ -725,24 +1041,14 @@ class Game:
         Returns:
             str: The ID of the winner.
         """
-        highest_priority = -1
-        highest_number = -1
-        for player_id, card in self.trick.items():
-            priority = card.get('priority')
-            number = card.get('number')
-            # print(number)
-            if priority > highest_priority:
-                highest_priority = priority
-                highest_number = number
+        # Slice of the dominance table for the current leading suit. Anything that is not a suit compares
+        # like no leading suit at all.
+        table_offset = LEADING_SUIT_INDEX.get(self.leading_suit, 0) * NUM_CARDS * NUM_CARDS
+        winner = None
+        for player_id, card_id in self.trick.items():
+            if winner is None or TRICK_DOMINANCE[table_offset + card_id * NUM_CARDS + winning_card]:
+                winning_card = card_id
                 winner = player_id
-                # print(winner)
-            elif priority == highest_priority:
-                suit = card.get('suit')
-                number = card.get('number')
-                if suit == self.leading_suit and number > highest_number:
-                    highest_number = number
-                    winner = player_id
-                    # print(winner)
         # Trick winner is a dict that holds the trick (array of the cards) that was won at the player_id of the winning player
         self.trick_winner = self.get_player_from_id(winner) 
         
@@ -752,51 +1058,40 @@ class Game:
 
     def determine_tricks(self, winner, trick):
         """
-        Determines the tricks won by a player.
+        Adds a trick to the running count and bonus of the player who won it.
 
         Args:
             winner (str): The ID of the winner.
-            trick (list): The trick won.
+            trick (list): The ids of the cards in the trick won, in the order they were played.
         """
-        if winner not in self.tricks:
-            self.tricks[winner] = {}
-        
-        # Dictionary of all tricks won for that player in a round
-        trick_dict = self.tricks.get(winner)
-        # Find the number of tricks already in the dictionary to determine the nth number of the trick we're currently adding
-        trick_number = len(trick_dict)
-        # Determine trick_string name based on previously found trick_number
-        trick_string = "trick" + str(trick_number + 1)
-        # Add the new trick array with trick_string as its key
-        trick_dict[trick_string] = trick
+        self.tricks_won = {**self.tricks_won, winner: self.tricks_won.get(winner, 0) + 1}
+        self.round_bonus = {**self.round_bonus, winner: self.round_bonus.get(winner, 0) + trick_bonus(trick)}
 
     def calculate_round_scores(self):
         """
         Calculates the scores for a round.
         """
+        score_sheet = dict(self.score_sheet)
         for player_id, bid in self.bids.items():
-            print(f"Player id: {player_id}")
             player = self.get_player_from_id(player_id)
             username = player.get('username')
-            print(f"Username: {username}")
-            if not self.score_sheet.get(username):
-                self.score_sheet[username] = 0
+            logging.debug(f"Scoring player {username} with id: {player_id}")
+            if not score_sheet.get(username):
+                score_sheet[username] = 0
+            num_tricks = self.tricks_won.get(player_id, 0)
             if bid == 0:
-                if not self.tricks.get(player_id):
-                    self.score_sheet[username] += (self.round * 10)
+                if num_tricks == 0:
+                    score_sheet[username] += (self.round * 10)
                 else:
-                    self.score_sheet[username] += (self.round * -10)
+                    score_sheet[username] += (self.round * -10)
             else:
-                if self.tricks.get(player_id):
-                    if len(self.tricks.get(player_id)) == bid:
-                        self.score_sheet[username] += (bid * 20)
-                        total_bonus = self.calculate_bonuses(player_id)
-                        self.score_sheet[username] += total_bonus
-                    else:
-                        num_tricks = len(self.tricks.get(player_id))
-                        self.score_sheet[username] += (abs(bid - num_tricks) * -10)
+                if num_tricks == bid:
+                    score_sheet[username] += (bid * 20)
+                    total_bonus = self.calculate_bonuses(player_id)
+                    score_sheet[username] += total_bonus
                 else:
-                    self.score_sheet[username] += (bid * -10)
+                    score_sheet[username] += (abs(bid - num_tricks) * -10)
+        self.score_sheet = score_sheet
     
     def calculate_bonuses(self, player_id):
         """
@@ -806,22 +1101,9 @@ class Game:
             player_id (str): The ID of the player.
 
         Returns:
-            int: The total bonus.
+            int: The total bonus captured in the tricks the player won this round.
         """
-        tricks_won = self.tricks.get(player_id)
-        total_bonus = 0
-        for trick in tricks_won.values():
-            skull_king = False
-            for card in trick:
-                if 'suit' in card:
-                    total_bonus += card.get('bonus')
-                else:
-                    if card.get('type') == 'Skull King':
-                        skull_king = True
-                    elif card.get('type') == 'Pirate' and skull_king:
-                        total_bonus += card.get('bonus')
-
-        return total_bonus
+        return self.round_bonus.get(player_id, 0)
         
     async def game_loop(self):
         """
@@ -829,10 +1111,8 @@ class Game:
         """
         while self.round < self.MAX_ROUNDS:
             if self.round > 1:
-                print("Choosing next dealer...")
-                self.choose_next_dealer()
-                print("Choosing who goes first this round...")
-                self.current_player = self.who_goes_first()
+                print("Choosing next dealer and who goes first this round...")
+                self.record_event({'type': 'NEW_DEALER'})
             
             await self.start_round()
             await self.start_dealing_phase()
@@ -0,0 +1,48 @@
+import random
+
+
+class GameRandom(random.Random):
+    """
+    The GameRandom class is the random number generator owned by a single game. Every shuffle and dealer
+    choice in the game draws from it, so a game can be replayed from its seed alone, or resumed from a
+    captured state.
+    """
+    def __init__(self, seed=None):
+        """
+        Initializes a new instance of the GameRandom class.
+
+        Args:
+            seed (int): The seed of the generator. Defaults to a fresh 64 bit seed from the operating system,
+                which is remembered so the game can still be replayed.
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed_value = seed
+        super().__init__(seed)
+
+    def get_seed(self):
+        """
+        Returns the seed the generator was created with.
+
+        Returns:
+            int: The seed.
+        """
+        return self.seed_value
+
+    def capture(self):
+        """
+        Captures the current position of the generator.
+
+        Returns:
+            tuple: The internal state, which can be passed to restore.
+        """
+        return self.getstate()
+
+    def restore(self, state):
+        """
+        Moves the generator back to a captured position.
+
+        Args:
+            state (tuple): A state returned by capture.
+        """
+        self.setstate(state)
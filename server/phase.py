@@ -0,0 +1,19 @@
+from enum import Enum
+
+
+class Phase(str, Enum):
+    """
+    The phases a round of Pirate King moves through. Phases are also strings, so they compare equal to
+    and serialize as their names, which is what the clients and the event log see.
+    """
+    STARTING = "STARTING"
+    DEALING = "DEALING"
+    START_BIDDING = "START_BIDDING"
+    BIDDING = "BIDDING"
+    START_PLAYING = "START_PLAYING"
+    PLAYING = "PLAYING"
+    RESOLVING = "RESOLVING"
+    CALCULATE_SCORES = "CALCULATE_SCORES"
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,205 @@
+from deck import CARD_DICTS, CATALOG_VERSION, mask_to_card_ids
+from phase import Phase
+
+
+def hand_to_network(hand):
+    """
+    Converts a hand mask into the ids of its cards. Clients look the cards up in the catalog they were sent
+    when they connected.
+
+    Args:
+        hand (int): The card mask of the hand.
+
+    Returns:
+        list: The card ids in the hand, lowest first.
+    """
+    return mask_to_card_ids(hand)
+
+def trick_to_network(trick):
+    """
+    Copies the cards played in a trick for the network.
+
+    Args:
+        trick (dict): The card id played by each player, keyed by player ID.
+
+    Returns:
+        dict: The card id played by each player, keyed by player ID.
+    """
+    return dict(trick)
+
+def catalog_to_network():
+    """
+    Builds the card catalog message content sent once to every client when it connects.
+
+    Returns:
+        dict: The catalog version and the card dict of every card id.
+    """
+    return {'version': CATALOG_VERSION, 'cards': CARD_DICTS}
+
+def project_starting(game_state):
+    """
+    Projects the state clients are sent when a round starts.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The round, the tricks won so far and the phase.
+    """
+    return {'round': game_state.get_round(),
+            'tricks_won': game_state.get_tricks_won(),
+            'phase': game_state.get_phase()}
+
+def project_dealing(game_state):
+    """
+    Projects the state clients are sent while the cards are dealt. Hands are private, see project_hand.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The dealer, the round and the phase.
+    """
+    return {'dealer': game_state.get_dealer(),
+            'round': game_state.get_round(),
+            'phase': game_state.get_phase()}
+
+def project_start_bidding(game_state):
+    """
+    Projects the state clients are sent when bidding opens.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The phase.
+    """
+    return {'phase': game_state.get_phase()}
+
+def project_bidding(game_state):
+    """
+    Projects the state clients are sent after each bid.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The bids so far, keyed by player ID, and the phase.
+    """
+    return {'bids': game_state.get_bids(),
+            'phase': game_state.get_phase()}
+
+def project_start_playing(game_state):
+    """
+    Projects the state clients are sent before the first card of a trick.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The phase and the player who leads.
+    """
+    return {'phase': game_state.get_phase(),
+            'first_player': game_state.get_current_player()}
+
+def project_playing(game_state):
+    """
+    Projects the state clients are sent after each card played.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The phase, the previous and current player, the trick so far and the number of players.
+    """
+    return {'phase': game_state.get_phase(),
+            'previous_player': game_state.get_previous_player(),
+            'current_player': game_state.get_current_player(),
+            'trick': trick_to_network(game_state.get_trick()),
+            'player_num': len(game_state.get_players())}
+
+def project_resolving(game_state):
+    """
+    Projects the state clients are sent once a trick is won.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The winner of the trick and the phase.
+    """
+    return {'trick_winner': game_state.get_trick_winner(),
+            'phase': game_state.get_phase()}
+
+def project_calculate_scores(game_state):
+    """
+    Projects the state clients are sent when a round is scored.
+
+    Args:
+        game_state (Game): The game state to project.
+
+    Returns:
+        dict: The score sheet and the phase.
+    """
+    return {'score_sheet': game_state.get_score_sheet(),
+            'phase': game_state.get_phase()}
+
+def project_hand(game_state, player_id):
+    """
+    Projects the hand of one player, which only that player is sent.
+
+    Args:
+        game_state (Game): The game state to project.
+        player_id (str): The ID of the player.
+
+    Returns:
+        dict: The card ids in the player's hand.
+    """
+    return {'hand': hand_to_network(game_state.get_hands().get(player_id, 0))}
+
+# What every client is sent in each phase. A new phase registers its projection here.
+PHASE_PROJECTIONS = {
+    Phase.STARTING: project_starting,
+    Phase.DEALING: project_dealing,
+    Phase.START_BIDDING: project_start_bidding,
+    Phase.BIDDING: project_bidding,
+    Phase.START_PLAYING: project_start_playing,
+    Phase.PLAYING: project_playing,
+    Phase.RESOLVING: project_resolving,
+    Phase.CALCULATE_SCORES: project_calculate_scores,
+}
+
+def project_game_state(game_state):
+    """
+    Translates a game state into the network action sent to every client in its phase.
+
+    Args:
+        game_state (Game): The game state to translate.
+
+    Returns:
+        dict: The translated network action.
+    """
+    return PHASE_PROJECTIONS[game_state.get_phase()](game_state)
+
+# What only one player is sent in each phase, on top of the public projection. Phases that are missing
+# send nothing private.
+PRIVATE_PROJECTIONS = {
+    Phase.DEALING: project_hand,
+    Phase.RESOLVING: project_hand,
+}
+
+def project_private_states(game_state):
+    """
+    Builds the part of the game state each player may see but the others may not.
+
+    Args:
+        game_state (Game): The game state to translate.
+
+    Returns:
+        dict: The private view of each player keyed by player ID, empty if the phase has none.
+    """
+    projection = PRIVATE_PROJECTIONS.get(game_state.get_phase())
+    if projection is None:
+        return {}
+    return {player.get('player_id'): projection(game_state, player.get('player_id'))
+            for player in game_state.get_players()}
@@ -1,16 +1,28 @@
 import socket
-import threading
-from threading import Lock
-from threading import Event
+from asyncio import Lock
 from game import Game
-from deck import Deck
+from projections import project_game_state, project_private_states, catalog_to_network
+from broadcast import StateFrames, EncodeStats
+from timer_wheel import TimerWheel
+from fan_out import fan_out, AckTracker
+from state_delta import StateHistory
+import codec
+import framing
+from framing import FrameConnection
+from action_barrier import ActionBarrier
+from event_log import GameEventLog
 import time
 import json
 import logging
 from datetime import datetime
-from queue import Queue
 import uuid
-import select
+import asyncio
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the open file limit does not need raising
+    resource = None
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -30,10 +42,21 @@ class WaitingRoom:
         self.max_players = 8
         # List of player objects containing all relevant info about each player
         self.players = []
-        self.players_lock = Lock()
+        # Connections of the players, used to send them messages
         self.player_sockets = []
         self.timer_duration = 90
         self.game_started = False
+        # Set once the game starts, wakes the connections waiting in the room
+        self.game_started_event = asyncio.Event()
+        # True once the countdown to the game is running, so only one is ever started
+        self.countdown_started = False
+        # The start of the game on the server's timer wheel, and when it is due on the server's clock
+        self.countdown = None
+        self.starts_at = None
+        # Matches the players' acknowledgements to the INIT broadcasts that asked for them
+        self.ack_tracker = AckTracker()
+        # Seconds a broadcast waits for every player before giving up on the slow ones
+        self.broadcast_deadline = 5
         self.room_name = room_name
         self.server = server
         self.room_id = self.server.generate_unique_id()
@@ -91,6 +114,14 @@ class WaitingRoom:
             game_started (bool): The value to set the game_started flag to.
         """
         self.game_started = game_started
+        if game_started:
+            self.game_started_event.set()
+
+    async def wait_game_started(self):
+        """
+        Waits until the game in this room has started.
+        """
+        await self.game_started_event.wait()
 
     def is_available(self):
         """
@@ -106,105 +137,182 @@ class WaitingRoom:
 
     def add_player(self, player, client_socket):
         """
-        Adds a player to the waiting room if the room is available. This method is thread safe.
+        Adds a player to the waiting room if the room is available. Every connection runs on the server's
+        event loop, so no lock is needed.
         
         Args:
             player (Player): The player to add to the waiting room.
-            client_socket (socket): The socket of the client to add to the waiting room.
+            client_socket (FrameConnection): The connection of the client to add to the waiting room.
         
         Returns:
             bool: True if the player was added, False otherwise.
         """
-        with self.players_lock:
-            room_available = self.is_available()
-            if room_available:
-                self.players.append(player)
-                self.player_sockets.append(client_socket)
-                return room_available
-            return room_available
+        room_available = self.is_available()
+        if room_available:
+            self.players.append(player)
+            self.player_sockets.append(client_socket)
+        return room_available
 
-    def broadcast_timer(self, timer):
+    def remove_player(self, client_socket):
         """
-        Broadcasts the current timer value to all players in the waiting room. This method is thread safe.
+        Removes a player who left the waiting room. If that leaves too few players, the countdown stops until
+        enough players join again.
+        
+        Args:
+            client_socket (FrameConnection): The connection of the client that left.
+        """
+        if client_socket not in self.player_sockets:
+            return
+        index = self.player_sockets.index(client_socket)
+        del self.players[index]
+        del self.player_sockets[index]
+        counting_down = self.countdown is not None and not self.countdown.cancelled()
+        if counting_down and self.get_player_num() < self.get_min_players():
+            self.countdown_started = False
+            self.set_deadline(None)
+
+    async def broadcast_timer(self, timer):
+        """
+        Broadcasts the current timer value to all players in the waiting room.
         
         Args:
             timer (str): The current timer value to broadcast.
         """
-        with self.players_lock:
-            for player_socket in self.player_sockets:
-                try:
-                    self.server.send_with_length(player_socket, timer)
-                except socket.error as e:
-                     print(str(e))
+        await self.broadcast(timer)
 
-    def broadcast(self, message):
+    async def broadcast(self, message, wait_ack=False):
         """
-        Broadcasts a message to all players in the waiting room. This method is thread safe.
+        Broadcasts a message to all players in the waiting room at once, so a slow player only delays
+        themselves. Acknowledgements are read by each player's own connection handler while it waits in the
+        room and handed over through acknowledge.
         
         Args:
             message (str): The message to broadcast.
+            wait_ack (bool): Whether to wait, up to the broadcast deadline, for every player to acknowledge it.
+
+        Returns:
+            FanOutReport: The latency of every player, and the players that missed the deadline.
+        """
+        # Encode once, every socket sends the same bytes
+        frame = self.server.make_frame(message)
+        player_sockets = list(self.player_sockets)
+        acks = {}
+        if wait_ack:
+            acks = {player_socket: self.ack_tracker.expect(player_socket) for player_socket in player_sockets}
+
+        async def send(player_socket):
+            await self.server.send_frame(player_socket, frame)
+
+        async def ack(player_socket):
+            await acks[player_socket]
+
+        report = await fan_out(player_sockets, send, ack if wait_ack else None, self.broadcast_deadline)
+        for player_socket, latency in report.latencies().items():
+            logging.debug(f"Broadcast to {player_socket.get_extra_info('peername')} took {latency * 1000:.1f}ms")
+        return report
+
+    def acknowledge(self, player_socket, ack):
+        """
+        Hands over a player's acknowledgement of a broadcast.
+
+        Args:
+            player_socket (FrameConnection): The connection of the player.
+            ack (bytes): The acknowledgement.
         """
-        with self.players_lock:
-            for player_socket in self.player_sockets:
-                try:
-                    self.server.send_with_length(player_socket, message)
-                    if 'INIT' in message:
-                        ack = self.server.receive_with_length(player_socket)
-                        with self.server.ack_lock:
-                            self.server.ack_queue.put(ack)
-                except socket.error as e:
-                    print(f"Socket error in broadcast: {e}")
+        self.ack_tracker.acknowledge(player_socket, ack)
 
     def start_timer(self, t):
         """
-        Starts a countdown timer for the specified duration. Once the timer reaches zero, the game starts.
+        Starts a countdown timer for the specified duration on the server's timer wheel, which runs the countdown
+        of every room. Once the timer reaches zero, the game starts.
         
         Args:
             t (int): The duration of the timer in seconds.
         """
-        while t >= 0:
-            mins, secs = divmod(t, 60)
-            timer = '{:02d}:{:02d}'.format(mins, secs)
-            serialized_timer = self.server.make_message('countdown', timer)
-            self.broadcast_timer(serialized_timer)
-            time.sleep(1)
-            t -= 1
-        self.start_game()
+        self.countdown_started = True
+        self.set_deadline(t)
 
-    def start_game(self):
+    def set_deadline(self, seconds):
+        """
+        Moves the start of the game to the given number of seconds from now, or calls it off, and tells every
+        player. Clients count down to the deadline themselves, so this is the only countdown message they get
+        until it changes again.
+        
+        Args:
+            seconds (float): The seconds until the game starts, None to stop the countdown.
+        """
+        if self.countdown is not None:
+            self.countdown.cancel()
+        if seconds is None:
+            self.countdown = None
+            self.starts_at = None
+        else:
+            self.countdown = self.server.timer_wheel.call_later(seconds, self.countdown_finished)
+            self.starts_at = time.time() + seconds
+        self.server.spawn(self.broadcast_timer(self.countdown_message()))
+
+    def countdown_message(self):
+        """
+        Creates the countdown message: when the game starts on the server's clock, or None if no countdown is
+        running, and the server's time when the message was made, so clients can count down on their own clock.
+        
+        Returns:
+            str: The serialized countdown message.
+        """
+        return self.server.make_message('countdown', {'starts_at': self.starts_at, 'server_time': time.time()})
+
+    def countdown_finished(self):
+        """
+        Starts the game once the countdown is over.
+        """
+        self.server.spawn(self.start_game())
+
+    def is_ready(self):
+        """
+        Returns a boolean indicating whether the room has enough players to start counting down.
+        
+        Returns:
+            bool: True if the countdown should start, False otherwise.
+        """
+        return self.get_player_num() >= self.get_min_players() and not self.countdown_started
+
+    async def start_game(self):
         """
         Starts the game with the current players in the waiting room.
         """
         logging.info(f"Game starting with players...\n")
-        with self.players_lock:
-            for player_socket in self.player_sockets:
-                try:
-                    print(player_socket.getpeername())
-                except socket.error as e:
-                    logging.error(f"Socket error, possibly bad file descripter: {e}")
-                    player_socket.close()
+        for player_socket in self.player_sockets:
+            print(player_socket.get_extra_info('peername'))
 
         # Notify the server to start the game with the players
-        self.server.start_game(self, self.players, self.player_sockets)
+        await self.server.start_game(self, self.players, self.player_sockets)
 
 class ActionTranslator:
     """
     The ActionTranslator class is responsible for translating network commands into game actions and game states into network actions.
     """
-    def __init__(self):
+    def __init__(self, player_codecs=None):
         """
         Initializes a new instance of the ActionTranslator class.
-        """
-        self.accept_commands_flag = threading.Event()
-        self.send_game_state_flag = threading.Event()
-        self.advance_game_state_flag = threading.Event()
+
+        Args:
+            player_codecs (dict): The codec negotiated with each player, keyed by player ID.
+        """
+        self.player_codecs = player_codecs or {}
+        self.accept_commands_flag = asyncio.Event()
+        self.send_game_state_flag = asyncio.Event()
+        self.advance_game_state_flag = asyncio.Event()
+        # Number of times game states were encoded, one frame per state change is the target
+        self.encode_stats = EncodeStats()
+        # States sent to the players, so each update can be a patch against what a player already has
+        self.state_history = StateHistory()
     
     def get_accept_commands_flag(self):
         """
         Returns the flag indicating whether the game is accepting commands.
         
         Returns:
-            threading.Event: The flag indicating whether the game is accepting commands.
+            asyncio.Event: The flag indicating whether the game is accepting commands.
         """
         return self.accept_commands_flag
     
@@ -213,7 +321,7 @@ class ActionTranslator:
         Returns the flag indicating whether the game state should be sent.
         
         Returns:
-            threading.Event: The flag indicating whether the game state should be sent.
+            asyncio.Event: The flag indicating whether the game state should be sent.
         """
         return self.send_game_state_flag
     
@@ -222,7 +330,7 @@ class ActionTranslator:
         Returns the flag indicating whether the game state should be advanced.
         
         Returns:
-            threading.Event: The flag indicating whether the game state should be advanced.
+            asyncio.Event: The flag indicating whether the game state should be advanced.
         """
         return self.advance_game_state_flag
 
@@ -260,46 +368,52 @@ class ActionTranslator:
         Returns:
             dict: The translated network action.
         """
+        return project_game_state(game_state)
+
+    def private_states_to_network(self, game_state):
+        """
+        Translates the parts of a game state only one player may see, such as their hand.
+        
+        Args:
+            game_state (GameState): The game state to translate.
+        
+        Returns:
+            dict: The private network state of each player, keyed by player ID.
+        """
+        return project_private_states(game_state)
+
+    def encode_state_frames(self, network_state, private_states, player_ids):
+        """
+        Numbers a state change and encodes its frames once, to be shared by every player's connection.
+        
+        Args:
+            network_state (dict): The translated public state.
+            private_states (dict): The translated private state of each player, keyed by player ID.
+            player_ids (list): The IDs of the players to encode frames for.
+        
+        Returns:
+            StateFrames: The encoded frames of every player.
+        """
+        self.state_history.push(network_state, private_states)
+        frames = StateFrames(self.state_history, player_ids, self.player_codecs)
+        self.encode_stats.record(frames)
+        return frames
 
-        if game_state.get_phase() == "STARTING":
-            network_action = {'round': game_state.get_round(),
-                              'tricks': game_state.get_tricks(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "DEALING":
-            network_action = {'dealer': game_state.get_dealer(),
-                              'round': game_state.get_round(),
-                              'hands': game_state.get_hands(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "START_BIDDING":
-            network_action = {'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "BIDDING":
-            network_action = {'bids': game_state.get_bids(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "START_PLAYING":
-            network_action = {'phase': game_state.get_phase(),
-                              'first_player': game_state.get_current_player()}
-        elif game_state.get_phase() == "PLAYING":
-            network_action = {'phase': game_state.get_phase(),
-                              'previous_player': game_state.get_previous_player(),
-                              'current_player': game_state.get_current_player(),
-                              'trick': game_state.get_trick(),
-                              'player_num': len(game_state.get_players())}
-        elif game_state.get_phase() == "RESOLVING":
-            network_action = {'trick_winner': game_state.get_trick_winner(),
-                              'phase': game_state.get_phase(),
-                              'hands': game_state.get_hands()}
-        elif game_state.get_phase() == "CALCULATE_SCORES":
-            network_action = {'score_sheet': game_state.get_score_sheet(),
-                              'phase': game_state.get_phase()}
- 
-        # self.set_send_game_state_flag(True)
-
-        # self.get_send_game_state_flag().set()
-        return network_action
+    def acknowledge_state(self, player_id, seq):
+        """
+        Records the last state a player has, which the player sends back with every response.
+        
+        Args:
+            player_id (str): The ID of the player.
+            seq (int): The sequence number of the player's state, None if the player needs the full state.
+        """
+        self.state_history.acknowledge(player_id, seq)
 
 class Server:
     """
-    The Server class represents the server that manages the game.
+    The Server class represents the server that manages the game. Every connection, waiting room and game runs
+    as a task on a single asyncio event loop, so an idle connection costs a small protocol object rather
+    than an OS thread.
     """
 
     servers = {'Laptop': "172.28.5.101",
@@ -307,27 +421,24 @@ class Server:
     laptop = servers.get('Laptop')
     desktop = servers.get('Desktop')
 
-    def __init__(self):
+    def __init__(self, server_address=None):
         """
         Initializes a new instance of the Server class.
+
+        Args:
+            server_address (tuple): The (host, port) to listen on, the desktop address on port 5555 by default.
         """
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         # server address and port number
-        self.server_address = (self.desktop, 5555)
-        # list of all clients connected to the server
-        self.clients = []
-        # Lock for accessing shared list of clients
-        self.client_lock = Lock()
+        self.server_address = server_address or (self.desktop, 5555)
         # maps each client to game id to keep track of which game they're in
         self.client_game_map = {}
-        # lock for the client to game mapping dict
-        self.client_game_map_lock = Lock()
         # maps each game id to it's respective, active game
         self.active_games = {}
         # Lock for game instances
         self.active_games_lock = Lock()
-        # Dict that holds action queues for each game, which contain actions the game can understand
+        # Dict that holds action barriers for each game, which collect actions the game can understand
         self.game_actions = {}
         # Lock for game_commands dict
         self.game_actions_lock = Lock()
@@ -337,12 +448,14 @@ class Server:
         self.game_states_lock = Lock()
         # List of waiting rooms
         self.waiting_rooms = []
-        # Room lock to keep accessing of waiting rooms by multiple clients thread safe
+        # Room lock to keep joining waiting rooms consistent across connections
         self.room_lock = Lock()
+        # Codec negotiated with each player when they connected, keyed by player ID
+        self.player_codecs = {}
+        # Card catalog sent to every client when it connects, encoded once
+        self.catalog_frame = self.make_frame(self.make_message('catalog', catalog_to_network()))
         # Acknowledgement Queue
-        self.ack_queue = Queue()
-        # Acknowledgement Lock
-        self.ack_lock = Lock()
+        self.ack_queue = asyncio.Queue()
         # Dict that holds queues for each game id that contains acks that clients have received game state.
         self.game_state_acks = {}
         # Lock for game_state_acks dict
@@ -351,6 +464,14 @@ class Server:
         self.action_translators = {}
         # Lock for action_translators dict 
         self.action_translators_lock = Lock()
+        # Directory the event log and snapshots of every game are written to
+        self.event_log_directory = "game_logs"
+        # Seconds a room counts down once it has enough players
+        self.countdown_seconds = 10
+        # Tasks nothing awaits, such as broadcasts and game starts, kept so they are not garbage collected
+        self.background_tasks = set()
+        # Runs the countdown of every waiting room, and any other timer the server needs
+        self.timer_wheel = TimerWheel()
         # trying to bind the socket to the server and throw error if it doesn't bind
         try:
             self.server_socket.bind(self.server_address)
@@ -358,103 +479,130 @@ class Server:
 
         except socket.error as e:
             logging.error(f"Socket error: {str(e)}")
-        # listen for client connections from players    
-        self.server_socket.listen(2)
+        # listen for client connections from players, with room for a burst of players joining at once
+        self.server_socket.listen(socket.SOMAXCONN)
         print("Waiting for players to join...")
 
-    def threaded_client(self, client_socket, player):
+    async def handle_client(self, connection):
         """
-        Handles a client in a separate thread.
+        Handles a client connection on the event loop.
 
         Args:
-            client_socket (socket): The client's socket.
-            player (Player): The player object.
+            connection (FrameConnection): The connection to the client, frames are read from and written to it.
         """
-        # client_socket.settimeout(5)  # Set timeout to 5 seconds
+        logging.info(f"New client connected from {connection.get_extra_info('peername')}")
         client_state = "INIT"
+        player = None
+        username = None
+        room = None
+        # Read started while waiting in a room, the next message from the client completes it
+        pending_read = None
         try:
             while True:
                 if client_state == "INIT":
                     # logging.info(f"Receiving username...")
-                    player = self.decode_message(self.receive_with_length(client_socket))
-                    # player['player_socket'] = client_socket
+                    player = self.decode_message(await self.receive_with_length(connection))
+                    # Clients list the codecs they support, older clients only speak JSON
+                    self.player_codecs[player.get('player_id')] = codec.negotiate_codec(player.pop('codecs', None))
                     username = player.get('username')
                     logging.info(f"Received username...")
+                    # Game states only carry card ids from here on, the catalog and the greeting leave in one write
                     find_room = self.make_message('INIT', "Finding a room for you...")
-                    # logging.info(f"Sending message...")
-                    self.send_with_length(client_socket, find_room)
-                    logging.debug(f"Sent message to {client_socket.getpeername()}")
+                    await self.send_frames(connection, [self.catalog_frame, self.make_frame(find_room)])
+                    logging.debug(f"Sent message to {connection.get_extra_info('peername')}")
 
-                    ack = self.receive_with_length(client_socket)
-                    with self.ack_lock:
-                        self.ack_queue.put(ack)
+                    ack = await self.receive_with_length(connection)
+                    await self.ack_queue.put(ack)
 
-                    room = self.find_available_room(player, client_socket)
+                    room = await self.find_available_room(player, connection)
                     logging.info(f"Room found for player {player}")
-                    room.broadcast(self.make_message('INIT', username + " is connected to: " + room.get_room_name()))
+                    # This handler reads its own player's acknowledgement, so the broadcast cannot be awaited here
+                    connected = self.make_message('INIT', username + " is connected to: " + room.get_room_name())
+                    self.spawn(room.broadcast(connected, wait_ack=True))
+                    if room.is_ready():
+                        logging.info(f"Timer started...")
+                        room.start_timer(self.countdown_seconds)
+                    elif room.starts_at is not None:
+                        # The deadline has not changed, only the player who just joined needs it
+                        await self.send_with_length(connection, room.countdown_message())
                     if room.has_game_started():
                         client_state = "GAMEPLAY"
                     else:
                         client_state = "WAITING"
                 elif client_state == "GAMEPLAY":
                     # Fetch the game_id
-                    # logging.info("In Game...")
-                    game_id = self.client_game_map.get(client_socket)
+                    game_id = self.client_game_map.get(connection)
                     player_id = player.get('player_id')
                     action_translator = self.action_translators.get(game_id)
     
-                    action_translator.get_send_game_state_flag().wait()
-                    # while not self.game_states.get(game_id).empty():
-                    with self.game_states_lock:
-                        game_state = self.game_states.get(game_id).get('game_state')
-                    print(f"Here is the game state right now: {game_state.get('phase')}")
-                    message = self.make_message('gameplay_data', game_state)
-                    # logging.info(f"Sending message: {message}")
-                    self.send_with_length(client_socket, message)
+                    await action_translator.get_send_game_state_flag().wait()
+                    game_state_dict = self.game_states.get(game_id)
+                    message = game_state_dict.get('frames').frame_for(player_id)
+                    print(f"Here is the game state right now: {game_state_dict.get('game_state').get('phase')}")
+                    await self.send_with_length(connection, message)
                     print("Sending state...")
                    
                     # Client responds to the game state update with either an acknowledgement, or an action
-                    client_response = self.decode_message(self.receive_with_length(client_socket))
+                    if pending_read is None:
+                        pending_read = asyncio.ensure_future(self.receive_with_length(connection))
+                    client_response = self.decode_message(await pending_read)
+                    pending_read = None
                     client_response_type = client_response.get('type')
-                    # logging.info(f"Received client response: {client_response.get('payload')}")
+                    # Every response carries the last state the client has, the next update is a patch against it
+                    action_translator.acknowledge_state(player_id, client_response.get('seq'))
                     if client_response_type == 'ack':
-                        with self.game_actions_lock:
-                            action_queue = self.game_actions.get(game_id)
-                        action_queue.put(client_response)
+                        action_queue = self.game_actions.get(game_id)
+                        await action_queue.put(player_id, client_response)
                     elif client_response_type == 'action':
-                        with self.game_actions_lock:
-                            action_queue = self.game_actions.get(game_id)
+                        action_queue = self.game_actions.get(game_id)
                         client_command = client_response.get('payload')
                         game_action = action_translator.network_to_game_action(client_command, player_id)
-                        action_queue.put(game_action)
-                    # action_translator.set_send_game_state_flag(False)
+                        await action_queue.put(player_id, game_action)
                     if action_translator.get_send_game_state_flag().is_set():
                         action_translator.get_send_game_state_flag().clear()
 
                 elif client_state == "WAITING":
-                    # logging.info("Waiting for game to start...")
-                    # self.print_blinking_dots(message, client_state)
+                    # Collect the client's acknowledgements of the room's INIT broadcasts until the game starts.
+                    # A read that is still pending when it does becomes the read of the first game state response.
+                    if pending_read is None:
+                        pending_read = asyncio.ensure_future(self.receive_with_length(connection))
+                    game_started = asyncio.ensure_future(room.wait_game_started())
+                    await asyncio.wait({pending_read, game_started}, return_when=asyncio.FIRST_COMPLETED)
+                    game_started.cancel()
+                    if pending_read.done():
+                        ack = pending_read.result()
+                        room.acknowledge(connection, ack)
+                        await self.ack_queue.put(ack)
+                        pending_read = None
                     if room.has_game_started():
                         client_state = "GAMEPLAY"
              
+        except ConnectionError as e:
+            logging.info(f"Client {username} disconnected: {str(e)}")
         except Exception as e:
-            logging.error(f"Exception in threaded_client for player {username}: {str(e)}")
+            logging.error(f"Exception in handle_client for player {username}: {str(e)}")
         finally:
             print(f"Lost connection for player {player}")
-            client_socket.close()
+            if pending_read is not None:
+                pending_read.cancel()
+            if room is not None:
+                room.ack_tracker.forget(connection)
+                if not room.has_game_started():
+                    room.remove_player(connection)
+            connection.close()
 
-    def find_available_room(self, player, client_socket):
+    async def find_available_room(self, player, client_socket):
         """
         Finds an available room for a player to join. If no room is available, a new room is created.
         
         Args:
             player (dict): The player to add to a room.
-            client_socket (socket): The socket of the player.
+            client_socket (FrameConnection): The connection of the player.
 
         Returns:
             WaitingRoom: The room the player was added to.
         """
-        with self.room_lock:
+        async with self.room_lock:
             unavailable_count = 0
             for room in self.waiting_rooms:
                 if room.add_player(player, client_socket):
@@ -494,52 +642,75 @@ class Server:
 
     def decode_message(self, message):
         """
-        Decodes a JSON message.
+        Decodes a message sent with any of the codecs in codec.py.
 
         Args:
-            message (str): The JSON message to decode.
+            message (str or bytes): The message to decode.
 
         Returns:
             dict: The decoded message.
         """
-        return json.loads(message)
+        return codec.decode_message(message)
 
-    def send_with_length(self, client_socket, message):
+    async def send_with_length(self, client_socket, message):
         """
         Sends a message with its length as a prefix.
 
         Args:
-            client_socket (socket): The socket to send the message to.
-            message (str): The message to send.
-        """
-        message_length = str(len(message))
-        # Pad with zeros to make it a 4-byte length prefix
-        message_length = message_length.zfill(4)
-        # Concatenate the length prefix and the actual message
-        full_message = message_length + message
+            client_socket (FrameConnection): The connection to send the message to.
+            message (str or bytes): The message to send, bytes if it is already encoded.
+        """
+        await self.send_frame(client_socket, self.make_frame(message))
+
+    def make_frame(self, message):
+        """
+        Encodes a message and makes its length header, ready to be sent to any number of sockets.
+
+        Args:
+            message (str or bytes): The message, bytes if it is already encoded.
+
+        Returns:
+            tuple: The header and message buffers, see framing.py.
+        """
+        return framing.frame_parts(message)
+
+    async def send_frame(self, client_socket, frame):
+        """
+        Sends a frame made by make_frame, waiting only if the client is not keeping up with what it was sent.
+
+        Args:
+            client_socket (FrameConnection): The connection to send the frame to.
+            frame (tuple): The header and message buffers.
+        """
+        await self.send_frames(client_socket, [frame])
+
+    async def send_frames(self, client_socket, frames):
+        """
+        Sends several frames made by make_frame in a single write.
+
+        Args:
+            client_socket (FrameConnection): The connection to send the frames to.
+            frames (list): The frames, in the order the client should receive them.
+        """
         try:
-            client_socket.send(full_message.encode())
-        except BrokenPipeError as e:
+            for frame in frames:
+                client_socket.queue_frame(frame)
+            await client_socket.drain()
+        except ConnectionError as e:
             logging.error(f"Client disconnected because: {str(e)}")
             client_socket.close()
-        except socket.error as e:
-            logging.error(f"Socket error, possibly bad file descriptor")
-            client_socket.close()
 
-    def receive_with_length(self, client_socket):
+    async def receive_with_length(self, connection):
         """
         Receives a message with its length as a prefix.
 
         Args:
-            client_socket (socket): The socket to receive the message from.
+            connection (FrameConnection): The connection to receive the message from.
 
         Returns:
-            str: The received message.
+            bytes: The received message, JSON or binary, see decode_message.
         """
-        message_length = int(client_socket.recv(4).decode())
-        # print(message_length)
-        message = client_socket.recv(message_length).decode()
-        return message
+        return await connection.read_frame()
 
     def print_blinking_dots(self, message, gameplay_state, max_dots=6, interval=0.5):
         """
@@ -558,60 +729,52 @@ class Server:
             num_dots = (num_dots + 1) % (max_dots + 1)
             time.sleep(interval)
 
-    def deal_players(self, game):
+    async def accept_connections(self):
         """
-        Deals hands to all players in the game.
-
-        Args:
-            game (Game): The game to deal hands for.
-        """
-        i = 0
-        for player in game.get_players():
-                # logging.info(f"These are the players: {game.get_players()} in room: {game.get_room()}")
-                player_socket = player.get('player_socket')
-                hand = game.deal_hand()
-                player['hand'] = hand
-                logging.info(f"Hand has been made... for player: {i}")
-                serialized_hand = self.make_message('gameplay_data', hand)
-                self.send_with_length(player_socket, serialized_hand)
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                logging.info(f"Sent hand: {hand} to player: {i} at: {current_time}")
-                i += 1
-
-    def accept_connections(self):
-        """
-        Accepts new connections from clients.
-        """
-        current_player = 0
-        while True:
-            client_socket, addr = self.server_socket.accept()
-            logging.info(f"New client connected from {addr}")
-            client_thread = threading.Thread(target=self.threaded_client, args=(client_socket, current_player))
-            logging.info(f"Thread started for client {current_player}")
-            client_thread.start()
-            current_player += 1
-
-    # Switch waiting rooms to being placed in a queue at some point
-    def monitor_rooms(self):
+        Accepts new connections from clients, each handled by its own task on the event loop.
         """
-        Monitors the waiting rooms for players.
-        """
-        while True:
-            for room in self.waiting_rooms:
-                if room.get_player_num() >= room.get_min_players() and not room.has_game_started():
-                    logging.info(f"Timer started...")
-                    room.start_timer(10)
-            time.sleep(1)
+        loop = asyncio.get_running_loop()
+        tcp_server = await loop.create_server(lambda: FrameConnection(self.handle_client), sock=self.server_socket,
+                                              backlog=socket.SOMAXCONN)
+        async with tcp_server:
+            await tcp_server.serve_forever()
 
-    def process_acks(self):
+    async def process_acks(self):
         """
         Processes acknowledgments from clients.
         """
         while True:
-            ack = self.ack_queue.get()  # Dequeue an acknowledgment
+            ack = await self.ack_queue.get()  # Dequeue an acknowledgment
             if ack:  # Perform your acknowledgment logic here
                 logging.debug(f"Acknowledgement received: {ack}")
 
+    def spawn(self, coroutine):
+        """
+        Runs a coroutine as a task that nothing awaits, holding on to it until it is done. The event loop only
+        keeps weak references to tasks, and nothing else would report the task's exception.
+
+        Args:
+            coroutine (coroutine): The coroutine to run.
+
+        Returns:
+            asyncio.Task: The task.
+        """
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.task_done)
+        return task
+
+    def task_done(self, task):
+        """
+        Lets go of a task started with spawn once it is done, logging the exception it failed with.
+
+        Args:
+            task (asyncio.Task): The task.
+        """
+        self.background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Background task {task.get_coro().__qualname__} failed", exc_info=task.exception())
+
     def generate_unique_id(self):
         """
         Generates a unique ID.
@@ -636,41 +799,69 @@ class Server:
             time.sleep(1)
             t -= 1
 
-    def start_game(self, room, players, player_sockets):
+    async def start_game(self, room, players, player_sockets):
         """
         Starts a new game.
 
         Args:
             room (Room): The room where the game will be started.
             players (list): The list of players in the game.
-            player_sockets (list): The list of player sockets.
+            player_sockets (list): The list of player connections.
         """
         game_id = self.generate_unique_id()
-        with self.game_actions_lock:
-            self.game_actions[game_id] = Queue(maxsize=len(players))
-        with self.game_states_lock:
+        player_codecs = {player.get('player_id'): self.player_codecs.get(player.get('player_id'), codec.JSON_CODEC)
+                         for player in players}
+        async with self.game_actions_lock:
+            self.game_actions[game_id] = ActionBarrier(len(players))
+        async with self.game_states_lock:
             self.game_states[game_id] = {}
-        with self.action_translators_lock:
-            self.action_translators[game_id] = ActionTranslator()
-        with self.game_state_acks_lock:
-            self.game_state_acks[game_id] = Queue(maxsize=len(players))
-        game = Game(players, game_id, self.action_translators.get(game_id), self.game_states.get(game_id), self.game_actions.get(game_id))
-        with self.active_games_lock:
+        async with self.action_translators_lock:
+            self.action_translators[game_id] = ActionTranslator(player_codecs)
+        async with self.game_state_acks_lock:
+            self.game_state_acks[game_id] = asyncio.Queue(maxsize=len(players))
+        event_log = GameEventLog(self.event_log_directory, game_id)
+        game = Game(players, game_id, self.action_translators.get(game_id), self.game_states.get(game_id), self.game_actions.get(game_id),
+                    event_log=event_log)
+        logging.info(f"Game {game_id} created with seed {game.get_rng().get_seed()}")
+        async with self.active_games_lock:
             self.active_games[game_id] = game
         for player_socket in player_sockets:
             self.client_game_map[player_socket] = game.get_game_id()
         room.set_game_started(True)
-        game_thread = threading.Thread(target=self.run_game, args=(game,))
-        game_thread.start()
+        self.spawn(self.run_game(game))
 
-    def run_game(self, game):
+    async def run_game(self, game):
         """
         Runs the game loop.
 
         Args:
             game (Game): The game to run.
         """
-        game.game_loop()
+        await game.game_loop()
+
+    async def serve(self):
+        """
+        Runs the server: accepting connections, driving the timer wheel and processing acknowledgements.
+        """
+        self.spawn(self.timer_wheel.run())
+        self.spawn(self.process_acks())
+        await self.accept_connections()
+
+
+def raise_open_file_limit():
+    """
+    Raises the soft limit on open files to the hard limit, as every idle connection holds a file descriptor.
+    """
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            logging.info(f"Open file limit raised from {soft} to {hard}")
+        except (ValueError, OSError) as e:
+            logging.warning(f"Could not raise the open file limit of {soft}: {e}")
+
      
 class ServerDriver:
     """
@@ -680,17 +871,14 @@ class ServerDriver:
         """
         Initializes a new instance of the ServerDriver class.
         """
+        raise_open_file_limit()
         self.server = Server()
-        monitor_thread = threading.Thread(target=self.server.monitor_rooms)
-        ack_processing_thread = threading.Thread(target=self.server.process_acks)
-        monitor_thread.start()
-        ack_processing_thread.start()
     
     def main(self):
         """
-        Starts accepting connections on the server.
+        Runs the server on the event loop.
         """
-        self.server.accept_connections()
+        asyncio.run(self.server.serve())
 
 
 if __name__ == "__main__":
@@ -698,4 +886,4 @@ if __name__ == "__main__":
     Entry point of the script. Creates an instance of ServerDriver and starts the server.
     """
     server_driver = ServerDriver()
-    server_driver.main()
\ No newline at end of file
+    server_driver.main()
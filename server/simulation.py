@@ -0,0 +1,164 @@
+import random
+import time
+import argparse
+from game import Game
+from game_random import GameRandom
+from deck import CARD_CATALOG, mask_to_card_ids
+
+
+class RandomPolicy:
+    """
+    The RandomPolicy class bids a random number of tricks and plays a random legal card.
+    """
+    def __init__(self, rng=None):
+        """
+        Initializes a new instance of the RandomPolicy class.
+
+        Args:
+            rng (random.Random): The random number generator to draw from. Defaults to a new unseeded one.
+        """
+        self.rng = rng if rng is not None else random.Random()
+
+    def bid(self, game, player_id):
+        """
+        Chooses a bid for a player.
+
+        Args:
+            game (Game): The game being played.
+            player_id (str): The ID of the player bidding.
+
+        Returns:
+            int: The bid.
+        """
+        return self.rng.randint(0, game.get_round())
+
+    def play(self, game, player_id):
+        """
+        Chooses a card for a player to play.
+
+        Args:
+            game (Game): The game being played.
+            player_id (str): The ID of the player whose turn it is.
+
+        Returns:
+            int: The id of a card from game.legal_moves(player_id).
+        """
+        return self.rng.choice(mask_to_card_ids(game.legal_moves(player_id)))
+
+
+class Simulator:
+    """
+    The Simulator class plays complete games without any network, action queue or event loop. It drives the
+    rules in Game directly and asks a policy per seat for every bid and card.
+    """
+    def __init__(self, num_players=4, policies=None, rounds=Game.MAX_ROUNDS, observer=None, rng=None):
+        """
+        Initializes a new instance of the Simulator class.
+
+        Args:
+            num_players (int): The number of players at the table.
+            policies (list): One policy per seat with bid(game, player_id) and play(game, player_id) methods.
+                Defaults to a RandomPolicy for every seat.
+            rounds (int): The number of rounds in a game.
+            observer (object): Optional object told about every trick, round and game, with
+                trick_resolved(game, trick, winner_id), round_scored(game) and game_finished(game) methods.
+            rng (random.Random): The generator the seed of every game is drawn from. Defaults to a new
+                unseeded one.
+        """
+        if num_players < 2:
+            raise ValueError("A game needs at least 2 players")
+        if num_players * rounds > len(CARD_CATALOG):
+            raise ValueError(f"{num_players} players cannot be dealt {rounds} rounds from {len(CARD_CATALOG)} cards")
+        if policies is None:
+            policies = [RandomPolicy() for _ in range(num_players)]
+        if len(policies) != num_players:
+            raise ValueError("Expected one policy per player")
+        self.num_players = num_players
+        self.policies = policies
+        self.rounds = rounds
+        self.observer = observer
+        self.rng = rng if rng is not None else random.Random()
+        self.players = [{'player_id': 'player' + str(seat), 'username': 'player' + str(seat)} for seat in range(num_players)]
+        # Policy of each player, keyed by player ID
+        self.policy_by_id = {player['player_id']: policy for player, policy in zip(self.players, policies)}
+
+    def play_round(self, game):
+        """
+        Plays one round: deal, bid, play every trick and score.
+
+        Args:
+            game (Game): The game to play the round in. Its round number must already be set.
+        """
+        game.init_round_variables()
+        game.deal_cards()
+        for player in self.players:
+            player_id = player['player_id']
+            game.make_bid(player_id, self.policy_by_id[player_id].bid(game, player_id))
+
+        while not game.round_is_over:
+            for _ in range(self.num_players):
+                player_id = game.get_current_player()['player_id']
+                card_id = self.policy_by_id[player_id].play(game, player_id)
+                card_index = game.get_card_index(player_id, card_id)
+                if not game.validate_play_card(player_id, card_index):
+                    raise RuntimeError(f"Policy for {player_id} played an illegal card: {CARD_CATALOG[card_id]}")
+                game.take_turn(player_id, card_index)
+            trick = game.get_trick()
+            winner_id = game.finish_trick()
+            if self.observer is not None:
+                self.observer.trick_resolved(game, trick, winner_id)
+
+        game.calculate_round_scores()
+        if self.observer is not None:
+            self.observer.round_scored(game)
+
+    def play_game(self, game_id=None, seed=None):
+        """
+        Plays a complete game.
+
+        Args:
+            game_id (str): The ID to give the game.
+            seed (int): The seed of the game's GameRandom. Defaults to one drawn from the simulator's
+                generator. Replaying a seed with the same policies replays the same deals.
+
+        Returns:
+            Game: The finished game, see Game.get_score_sheet for the result.
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        game = Game(self.players, game_id, rng=GameRandom(seed))
+        for round_number in range(1, self.rounds + 1):
+            game.round = round_number
+            if round_number > 1:
+                game.choose_next_dealer()
+                game.current_player = game.who_goes_first()
+            self.play_round(game)
+        if self.observer is not None:
+            self.observer.game_finished(game)
+        return game
+
+    def run(self, num_games):
+        """
+        Plays a number of games back to back.
+
+        Args:
+            num_games (int): The number of games to play.
+
+        Returns:
+            dict: The number of games, the elapsed seconds and the games played per second.
+        """
+        start = time.perf_counter()
+        for game_number in range(num_games):
+            self.play_game(game_number)
+        seconds = time.perf_counter() - start
+        return {'games': num_games, 'seconds': seconds, 'games_per_second': num_games / seconds if seconds else 0.0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Pirate King games between random policies.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=4)
+    args = parser.parse_args()
+
+    result = Simulator(args.players).run(args.games)
+    print(f"Played {result['games']} games in {result['seconds']:.2f}s ({result['games_per_second']:.0f} games/s)")
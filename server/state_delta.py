@@ -0,0 +1,152 @@
+def diff_state(old, new):
+    """
+    Builds a JSON merge patch (RFC 7386) that turns one network state into another. Nested dicts are
+    diffed key by key, any other changed value is sent whole and a removed key is sent as None.
+
+    Args:
+        old (dict): The state the receiver already has.
+        new (dict): The state the receiver should end up with.
+
+    Returns:
+        dict: The patch, empty if the states are equal.
+    """
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                patch[key] = diff_state(old[key], value)
+            else:
+                patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+def apply_patch(document, patch):
+    """
+    Applies a JSON merge patch made by diff_state without changing the document.
+
+    Args:
+        document (dict): The state to patch.
+        patch (dict): The patch.
+
+    Returns:
+        dict: The patched state.
+    """
+    result = dict(document)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class StateHistory:
+    """
+    The StateHistory class numbers the states sent to a game's players and keeps the most recent ones, so
+    each update can be sent as a patch against the last state the player acknowledged. A player whose last
+    acknowledged state is no longer kept, or who never acknowledged one, gets the full state instead.
+
+    Each phase only projects the fields it is about, so the state kept for a phase is the previous state
+    updated with that projection. A field then only travels again when its value changes, not every time
+    the phase moves on, and clients read the fields of the current phase from it as before.
+
+    The states are kept by reference. Projections build new containers for every state and the game
+    rebinds rather than mutates its containers, so a kept state never changes.
+    """
+    def __init__(self, history_size=8):
+        """
+        Initializes a new instance of the StateHistory class.
+
+        Args:
+            history_size (int): The number of states to keep.
+        """
+        self.history_size = history_size
+        # Sequence number of the latest state, 0 before the first one
+        self.seq = 0
+        # (public state, private states) keyed by sequence number, oldest first
+        self.versions = {}
+        # Last sequence number each player acknowledged, keyed by player ID
+        self.acked = {}
+
+    def push(self, public_state, private_states):
+        """
+        Records a new state, forgetting the oldest one if the history is full.
+
+        Args:
+            public_state (dict): The network state sent to every player.
+            private_states (dict): The private network state of each player, keyed by player ID.
+
+        Returns:
+            int: The sequence number of the new state.
+        """
+        if self.versions:
+            previous_public, previous_private = self.versions[self.seq]
+            public_state = {**previous_public, **public_state}
+            private_states = {player_id: {**previous_private.get(player_id, {}), **private_states.get(player_id, {})}
+                              for player_id in previous_private.keys() | private_states.keys()}
+        self.seq += 1
+        self.versions[self.seq] = (public_state, private_states)
+        if len(self.versions) > self.history_size:
+            del self.versions[next(iter(self.versions))]
+        return self.seq
+
+    def acknowledge(self, player_id, seq):
+        """
+        Records that a player has the state with the given sequence number.
+
+        Args:
+            player_id (str): The ID of the player.
+            seq (int): The sequence number the player acknowledged, None if the player has no usable state.
+        """
+        if seq is None:
+            self.acked.pop(player_id, None)
+        else:
+            self.acked[player_id] = seq
+
+    def base_for(self, player_id):
+        """
+        Returns the state the next update to a player is a patch against.
+
+        Args:
+            player_id (str): The ID of the player.
+
+        Returns:
+            int: The sequence number of the base state, or None if the player needs the full state.
+        """
+        seq = self.acked.get(player_id)
+        if seq in self.versions:
+            return seq
+        return None
+
+    def public_patch(self, base):
+        """
+        Builds the patch of the public state from a base state to the latest one.
+
+        Args:
+            base (int): The sequence number of the base state, or None for the full state.
+
+        Returns:
+            dict: The patch.
+        """
+        old = self.versions[base][0] if base is not None else {}
+        return diff_state(old, self.versions[self.seq][0])
+
+    def private_patch(self, base, player_id):
+        """
+        Builds the patch of a player's private state from a base state to the latest one.
+
+        Args:
+            base (int): The sequence number of the base state, or None for the full state.
+            player_id (str): The ID of the player.
+
+        Returns:
+            dict: The patch.
+        """
+        old = self.versions[base][1].get(player_id, {}) if base is not None else {}
+        return diff_state(old, self.versions[self.seq][1].get(player_id, {}))
@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+from action_barrier import ActionBarrier
+
+class TestActionBarrier(unittest.TestCase):
+
+    def test_wait_full_returns_once_every_player_responded(self):
+        async def scenario():
+            barrier = ActionBarrier(3)
+            waiter = asyncio.create_task(barrier.wait_full())
+            await barrier.put('player1', {'type': 'ack'})
+            await barrier.put('player2', {'type': 'ack'})
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+            await barrier.put('player3', {'type': 'ack'})
+            await asyncio.wait_for(waiter, timeout=1)
+            return barrier
+
+        barrier = asyncio.run(scenario())
+        self.assertTrue(barrier.full())
+
+    def test_repeat_response_replaces_earlier_one(self):
+        barrier = ActionBarrier(2)
+        barrier.put_nowait('player1', {'type': 'ack'})
+        barrier.put_nowait('player2', {'type': 'ack'})
+        barrier.put_nowait('player1', {'type': 'BID', 'bid': 1})
+        self.assertTrue(barrier.full())
+        self.assertEqual(barrier.get_nowait(), {'type': 'ack'})
+        self.assertEqual(barrier.get_nowait(), {'type': 'BID', 'bid': 1})
+        self.assertTrue(barrier.empty())
+
+if __name__ == '__main__':
+    unittest.main()
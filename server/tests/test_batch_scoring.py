@@ -0,0 +1,62 @@
+import random
+import unittest
+from simulation import Simulator, RandomPolicy
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class RoundRecorder:
+    """
+    Records every simulated round in the shape batch_scoring expects, next to what Game worked out.
+    """
+    def __init__(self):
+        self.rounds = {}
+        self.tricks = []
+        self.previous_scores = {}
+
+    def trick_resolved(self, game, trick, winner_id):
+        seats = [int(player_id[len('player'):]) for player_id in trick]
+        self.tricks.append((list(trick.values()), seats[0], int(winner_id[len('player'):])))
+
+    def round_scored(self, game):
+        seat_ids = [player['player_id'] for player in game.get_players()]
+        scores = game.get_score_sheet()
+        deltas = [scores[player_id] - self.previous_scores.get(player_id, 0) for player_id in seat_ids]
+        bonuses = [game.calculate_bonuses(player_id) for player_id in seat_ids]
+        tricks_won = [game.get_tricks_won().get(player_id, 0) for player_id in seat_ids]
+        bids = [game.get_bids()[player_id] for player_id in seat_ids]
+        self.rounds.setdefault(game.get_round(), []).append((self.tricks, bids, deltas, bonuses, tricks_won))
+        self.previous_scores = dict(scores)
+        self.tricks = []
+
+    def game_finished(self, game):
+        self.previous_scores = {}
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatchScoring(unittest.TestCase):
+
+    def test_matches_game_scoring(self):
+        from batch_scoring import score_rounds
+
+        recorder = RoundRecorder()
+        policies = [RandomPolicy(random.Random(seat)) for seat in range(4)]
+        simulator = Simulator(4, policies, observer=recorder, rng=random.Random(1))
+        for game_number in range(30):
+            simulator.play_game(game_number)
+
+        for round_number, rounds in recorder.rounds.items():
+            cards = numpy.array([[trick[0] for trick in tricks] for tricks, *_ in rounds])
+            first_seats = numpy.array([[trick[1] for trick in tricks] for tricks, *_ in rounds])
+            bids = numpy.array([bids for _, bids, *_ in rounds])
+            result = score_rounds(cards, first_seats, bids)
+
+            expected_winners = [[trick[2] for trick in tricks] for tricks, *_ in rounds]
+            self.assertEqual(result['winners'].tolist(), expected_winners)
+            self.assertEqual(result['tricks_won'].tolist(), [tricks_won for *_, tricks_won in rounds])
+            self.assertEqual(result['bonuses'].tolist(), [bonuses for *_, bonuses, _ in rounds])
+            self.assertEqual(result['round_scores'].tolist(), [deltas for _, _, deltas, _, _ in rounds])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from batch_simulation import run_batch, SimulationStats
+
+class TestBatchSimulation(unittest.TestCase):
+
+    def test_same_seed_gives_same_results_for_any_worker_count(self):
+        in_process = run_batch(12, num_players=3, workers=1, master_seed=7, shards=4)
+        pooled = run_batch(12, num_players=3, workers=2, master_seed=7, shards=4)
+        self.assertEqual(in_process.games, 12)
+        self.assertEqual(in_process.final_scores, pooled.final_scores)
+        self.assertEqual(in_process.bids_made, pooled.bids_made)
+        self.assertEqual(in_process.card_wins, pooled.card_wins)
+
+    def test_aggregates_are_consistent(self):
+        stats = run_batch(5, num_players=4, master_seed=1, shards=2)
+        # 4 players bid in each of 10 rounds, and every trick has one winning card
+        self.assertEqual(sum(stats.bids_made.values()), 5 * 4 * 10)
+        self.assertEqual(sum(stats.card_wins), 5 * sum(range(1, 11)))
+        self.assertEqual(sum(stats.card_plays), 5 * 4 * sum(range(1, 11)))
+        self.assertEqual(sum(stats.final_scores.values()), 5 * 4)
+
+    def test_merge_adds_counts(self):
+        first = SimulationStats()
+        first.games = 1
+        first.card_plays[3] = 2
+        second = SimulationStats()
+        second.games = 2
+        second.card_plays[3] = 5
+        first.merge(second)
+        self.assertEqual(first.games, 3)
+        self.assertEqual(first.card_plays[3], 7)
+
+if __name__ == '__main__':
+    unittest.main()
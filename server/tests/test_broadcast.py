@@ -0,0 +1,62 @@
+import json
+import unittest
+from unittest.mock import Mock
+from game import Game
+from phase import Phase
+from projections import project_game_state, project_private_states
+from broadcast import StateFrames, EncodeStats, encode_frame
+from state_delta import StateHistory
+from deck import find_card_id, card_ids_to_mask
+
+class TestBroadcast(unittest.TestCase):
+
+    def setUp(self):
+        players = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 4)]
+        self.player_ids = [player['player_id'] for player in players]
+        self.game_instance = Game(players, Mock(), Mock(), {}, Mock())
+        self.game_instance.hands = {'player1': card_ids_to_mask([find_card_id('Parrot', 5)]), 'player2': 0, 'player3': 0}
+        self.history = StateHistory()
+
+    def make_frames(self, phase):
+        self.game_instance.phase = phase
+        self.history.push(project_game_state(self.game_instance), project_private_states(self.game_instance))
+        return StateFrames(self.history, self.player_ids)
+
+    def test_public_state_is_encoded_once_and_shared(self):
+        frames = self.make_frames(Phase.BIDDING)
+        self.assertEqual(frames.encodes, 1)
+        self.assertIs(frames.frame_for('player1'), frames.frame_for('player3'))
+        self.assertEqual(json.loads(frames.frame_for('player2')),
+                         {'type': 'gameplay_data',
+                          'content': {'seq': 1, 'base': None, 'patch': {'bids': {}, 'phase': 'BIDDING'}}})
+
+    def test_private_state_is_added_to_the_public_frame(self):
+        frames = self.make_frames(Phase.DEALING)
+        self.assertEqual(frames.encodes, 4)
+        patch = json.loads(frames.frame_for('player1'))['content']['patch']
+        self.assertEqual(patch['hand'], [find_card_id('Parrot', 5)])
+        self.assertEqual(patch['phase'], 'DEALING')
+        self.assertEqual(json.loads(frames.frame_for('player2'))['content']['patch']['hand'], [])
+
+    def test_private_patch_is_added_to_an_empty_public_patch(self):
+        self.make_frames(Phase.DEALING)
+        for player_id in self.player_ids:
+            self.history.acknowledge(player_id, 1)
+        self.game_instance.hands = {'player1': 0, 'player2': 0, 'player3': 0}
+        frames = self.make_frames(Phase.DEALING)
+        self.assertEqual(json.loads(frames.frame_for('player1'))['content'], {'seq': 2, 'base': 1, 'patch': {'hand': []}})
+        self.assertEqual(json.loads(frames.frame_for('player2'))['content']['patch'], {})
+
+    def test_encode_stats_count_encodes_per_state_change(self):
+        stats = EncodeStats()
+        stats.record(self.make_frames(Phase.BIDDING))
+        stats.record(self.make_frames(Phase.RESOLVING))
+        self.assertEqual(stats.state_changes, 2)
+        self.assertEqual(stats.max_encodes, 4)
+        self.assertEqual(stats.encodes_per_state(), 2.5)
+
+    def test_encode_frame_matches_server_messages(self):
+        self.assertEqual(encode_frame('countdown', '00:05'), json.dumps({'type': 'countdown', 'content': '00:05'}).encode())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import importlib.util
+import json
+import os
+import unittest
+import codec
+from deck import CARD_DICTS, CATALOG_VERSION, find_card_id
+from phase import Phase
+
+CLIENT_CODEC_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'client', 'CLI', 'codec.py')
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.message = {'type': 'gameplay_data',
+                        'content': {'seq': 7, 'base': 6,
+                                    'patch': {'phase': Phase.PLAYING,
+                                              'trick': {'player1': find_card_id('Parrot', 14),
+                                                        'player2': find_card_id(type='Pirate'),
+                                                        'player3': None},
+                                              'current_player': {'player_id': 'a1b2', 'username': 'Mädchen'},
+                                              'score_sheet': {'user1': -40, 'user2': 130},
+                                              'bids': {}, 'hand': []}}}
+
+    def test_binary_round_trip(self):
+        encoded = codec.encode_message(self.message, codec.BINARY_CODEC)
+        self.assertEqual(codec.decode_message(encoded), json.loads(json.dumps(self.message)))
+        self.assertLess(len(encoded), len(codec.encode_message(self.message)) // 2)
+
+    def test_card_ids_and_phases_take_two_bytes(self):
+        card_id = find_card_id('Jolly Roger', 3)
+        encoded = codec.encode_message({'type': 'message', 'content': [card_id, 'RESOLVING']}, codec.BINARY_CODEC)
+        # Opcode, dict tag, 'content' key, list tag, card id, phase, list end, dict end
+        self.assertEqual(len(encoded), 1 + 1 + 2 + 1 + 2 + 2 + 1 + 1)
+
+    def test_catalog_round_trips(self):
+        message = {'type': 'catalog', 'content': {'version': CATALOG_VERSION, 'cards': CARD_DICTS}}
+        for message_codec in codec.SUPPORTED_CODECS:
+            decoded = codec.decode_message(codec.encode_message(message, message_codec))
+            self.assertEqual(decoded['content'], {'version': CATALOG_VERSION, 'cards': list(CARD_DICTS)})
+
+    def test_json_messages_still_decode(self):
+        self.assertEqual(codec.decode_message('{"type": "ack", "payload": "ok"}'), {'type': 'ack', 'payload': 'ok'})
+        self.assertEqual(codec.decode_message(b'{"type": "ack", "seq": 3}'), {'type': 'ack', 'seq': 3})
+
+    def test_private_items_are_added_without_reencoding(self):
+        hand = {'hand': [0, 67]}
+        for message_codec in codec.SUPPORTED_CODECS:
+            frame = codec.encode_message(self.message, message_codec)
+            decoded = codec.decode_message(codec.add_private_items(frame, hand, False, message_codec))
+            self.assertEqual(decoded['content']['patch']['hand'], hand['hand'])
+            self.assertEqual(decoded['content']['patch']['score_sheet'], {'user1': -40, 'user2': 130})
+
+    def test_negotiation_prefers_binary_and_falls_back_to_json(self):
+        self.assertEqual(codec.negotiate_codec(['json', codec.BINARY_CODEC]), codec.BINARY_CODEC)
+        self.assertEqual(codec.negotiate_codec(['json']), codec.JSON_CODEC)
+        self.assertEqual(codec.negotiate_codec(None), codec.JSON_CODEC)
+        self.assertEqual(codec.negotiate_codec(['binary/0']), codec.JSON_CODEC)
+
+    def test_client_codec_mirrors_server_tables(self):
+        spec = importlib.util.spec_from_file_location('client_codec', CLIENT_CODEC_PATH)
+        client_codec = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(client_codec)
+        self.assertEqual(client_codec.BINARY_CODEC, codec.BINARY_CODEC)
+        self.assertEqual(client_codec.MESSAGE_TYPES, codec.MESSAGE_TYPES)
+        self.assertEqual(client_codec.KNOWN_STRINGS, codec.KNOWN_STRINGS)
+        encoded = codec.encode_message(self.message, codec.BINARY_CODEC)
+        self.assertEqual(client_codec.decode_message(encoded), codec.decode_message(encoded))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import random
+from deck import Deck, CARD_CATALOG, CARD_DICTS, get_card, find_card_id
+
+class TestDeck(unittest.TestCase):
+
+    def test_catalog_is_indexed_by_card_id(self):
+        self.assertEqual(len(CARD_CATALOG), 68)
+        for card_id, card in enumerate(CARD_CATALOG):
+            self.assertEqual(card.card_id, card_id)
+            self.assertEqual(CARD_DICTS[card_id], card.to_dict())
+
+    def test_cards_are_slotted(self):
+        self.assertFalse(hasattr(get_card(0), '__dict__'))
+        self.assertFalse(hasattr(get_card(find_card_id(type='Skull King')), '__dict__'))
+
+    def test_card_values(self):
+        self.assertEqual(get_card(find_card_id('Parrot', 14)).to_dict(),
+                         {'suit': 'Parrot', 'number': 14, 'bonus': 10, 'priority': 1})
+        self.assertEqual(get_card(find_card_id('Jolly Roger', 14)).bonus, 20)
+        self.assertEqual(get_card(find_card_id(type='Pirate')).to_dict(), {'type': 'Pirate', 'priority': 3, 'bonus': 30})
+        self.assertEqual(get_card(find_card_id(type='Tigress')).priority, 0)
+
+    def test_deck_deals_every_card_id_once(self):
+        deck = Deck()
+        deck.shuffle()
+        dealt = []
+        card_id = deck.deal()
+        while card_id is not None:
+            dealt.append(card_id)
+            card_id = deck.deal()
+        self.assertEqual(sorted(dealt), list(range(len(CARD_CATALOG))))
+
+    def test_deal_hands_slices_one_permutation(self):
+        deck = Deck(random.Random(5))
+        deck.shuffle()
+        hands = deck.deal_hands(4, 10)
+        self.assertEqual([len(hand) for hand in hands], [10, 10, 10, 10])
+        dealt = [card_id for hand in hands for card_id in hand]
+        self.assertEqual(len(set(dealt + deck.cards)), len(CARD_CATALOG))
+        self.assertEqual(len(deck.cards), len(CARD_CATALOG) - 40)
+        with self.assertRaises(ValueError):
+            deck.deal_hands(3, 10)
+
+if __name__ == '__main__':
+    unittest.main()
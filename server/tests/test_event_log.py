@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from game import Game
+from game_random import GameRandom
+from event_log import GameEventLog, recover_game, list_segments
+from deck import mask_to_card_ids
+
+def make_players():
+    return [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 4)]
+
+def play_round(game):
+    """
+    Records one round of events the way the reducer does, always playing the lowest legal card.
+    """
+    game.record_event({'type': 'PHASE', 'phase': "STARTING"})
+    game.record_event({'type': 'INIT_ROUND'})
+    game.record_event({'type': 'DEAL'})
+    for player in game.get_players():
+        game.record_event({'type': 'BID', 'player_id': player['player_id'], 'bid': 1})
+    while not game.get_round_is_over():
+        for _ in game.get_players():
+            player_id = game.get_current_player()['player_id']
+            card_id = mask_to_card_ids(game.legal_moves(player_id))[0]
+            card_index = game.get_card_index(player_id, card_id)
+            game.validate_play_card(player_id, card_index)
+            game.record_event({'type': 'PLAY_CARD', 'player_id': player_id, 'card_index': card_index,
+                               'leading_suit': game.leading_suit})
+        game.record_event({'type': 'RESOLVE'})
+    game.record_event({'type': 'SCORE'})
+    game.record_event({'type': 'NEXT_ROUND'})
+    game.record_event({'type': 'NEW_DEALER'})
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_recovered_game_matches_live_game(self):
+        event_log = GameEventLog(self.directory.name, 'game1', batch_size=4, snapshot_interval=25)
+        game = Game(make_players(), 'game1', rng=GameRandom(9), event_log=event_log)
+        for _ in range(4):
+            play_round(game)
+        game.record_event({'type': 'PHASE', 'phase': "STARTING"})
+        game.record_event({'type': 'INIT_ROUND'})
+        event_log.flush()
+
+        recovered, seq = recover_game(self.directory.name, 'game1')
+        self.assertEqual(seq, event_log.seq)
+        self.assertEqual(recovered.to_snapshot(), game.to_snapshot())
+        # The rebuilt random generator carries on exactly where the live one is
+        self.assertEqual(recovered.get_rng().random(), game.get_rng().random())
+
+    def test_recovery_replays_at_most_one_snapshot_interval(self):
+        event_log = GameEventLog(self.directory.name, 'game2', batch_size=8, snapshot_interval=10)
+        game = Game(make_players(), 'game2', rng=GameRandom(1), event_log=event_log)
+        for _ in range(5):
+            play_round(game)
+        event_log.flush()
+
+        segments = list_segments(os.path.join(self.directory.name, 'game2'))
+        self.assertEqual(len(segments), 1)
+        with open(segments[0][1]) as segment:
+            self.assertLess(len(segment.readlines()), 10)
+
+    def test_torn_last_line_is_ignored(self):
+        event_log = GameEventLog(self.directory.name, 'game3', batch_size=1, snapshot_interval=1000)
+        game = Game(make_players(), 'game3', rng=GameRandom(2), event_log=event_log)
+        game.record_event({'type': 'PHASE', 'phase': "STARTING"})
+        game.record_event({'type': 'INIT_ROUND'})
+        with open(event_log.segment_path, 'a') as segment:
+            segment.write('{"seq": 3, "ty')
+
+        recovered, seq = recover_game(self.directory.name, 'game3')
+        self.assertEqual(seq, 2)
+        self.assertEqual(recovered.to_snapshot(), game.to_snapshot())
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), "Needs /proc to name the synced files")
+    def test_batches_and_snapshots_are_fsynced(self):
+        synced = []
+        fsync = os.fsync
+
+        def record_fsync(fd):
+            synced.append(os.path.basename(os.readlink(f'/proc/self/fd/{fd}')))
+            fsync(fd)
+
+        with patch('os.fsync', record_fsync):
+            event_log = GameEventLog(self.directory.name, 'game4', batch_size=2, snapshot_interval=1000)
+            game = Game(make_players(), 'game4', rng=GameRandom(3), event_log=event_log)
+            game.record_event({'type': 'PHASE', 'phase': "STARTING"})
+            self.assertEqual(synced, ['snapshot.json.tmp', 'game4'])
+            game.record_event({'type': 'INIT_ROUND'})
+        # The snapshot before it replaces the old one, the new segment, and the directory after each
+        self.assertEqual(synced, ['snapshot.json.tmp', 'game4', 'events-1.jsonl', 'game4'])
+
+if __name__ == '__main__':
+    unittest.main()
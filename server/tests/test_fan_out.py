@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from fan_out import fan_out, AckTracker
+
+class TestFanOut(unittest.TestCase):
+
+    def test_slow_recipient_only_delays_itself(self):
+        sent = []
+
+        async def send(recipient):
+            if recipient == 'slow':
+                await asyncio.sleep(5)
+            sent.append(recipient)
+
+        report = asyncio.run(fan_out(['player1', 'slow', 'player2'], send, deadline=0.2))
+        self.assertEqual(sent, ['player1', 'player2'])
+        self.assertEqual(report.completed(), ['player1', 'player2'])
+        self.assertEqual(report.late(), ['slow'])
+        self.assertLess(report.elapsed, 1)
+        self.assertEqual(set(report.latencies()), {'player1', 'player2'})
+
+    def test_acks_are_collected_with_a_deadline(self):
+        async def scenario():
+            tracker = AckTracker()
+            recipients = ['player1', 'player2', 'silent']
+            acks = {recipient: tracker.expect(recipient) for recipient in recipients}
+
+            async def send(recipient):
+                pass
+
+            async def wait_ack(recipient):
+                await acks[recipient]
+
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, tracker.acknowledge, 'player2', 'ack')
+            loop.call_later(0.1, tracker.acknowledge, 'player1', 'ack')
+            return await fan_out(recipients, send, wait_ack, deadline=0.3)
+
+        report = asyncio.run(scenario())
+        self.assertEqual(report.completed(), ['player1', 'player2'])
+        self.assertEqual(report.late(), ['silent'])
+        latencies = report.latencies()
+        self.assertLess(latencies['player2'], latencies['player1'])
+        silent = report.deliveries[2]
+        self.assertIsNotNone(silent.sent_after)
+        self.assertIsNone(silent.acked_after)
+
+    def test_send_errors_are_reported(self):
+        async def send(recipient):
+            if recipient == 'gone':
+                raise ConnectionResetError("Connection closed by the client")
+
+        report = asyncio.run(fan_out(['player1', 'gone'], send))
+        self.assertEqual(report.late(), ['gone'])
+        self.assertIsInstance(report.deliveries[1].error, ConnectionResetError)
+
+    def test_late_ack_is_matched_to_the_message_that_timed_out(self):
+        async def scenario():
+            tracker = AckTracker()
+            first = tracker.expect('player1')
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(first, timeout=0.01)
+            second = tracker.expect('player1')
+            # The late acknowledgement of the first message must not complete the second one
+            self.assertTrue(tracker.acknowledge('player1', 'first ack'))
+            self.assertFalse(second.done())
+            tracker.acknowledge('player1', 'second ack')
+            self.assertFalse(tracker.acknowledge('player1', 'unexpected'))
+            return await second
+
+        self.assertEqual(asyncio.run(scenario()), 'second ack')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import threading
+import unittest
+from framing import FrameBuffer, FrameReader, FrameWriter, FrameConnection, frame_parts, make_frame, HEADER, DEFAULT_BUFFER_SIZE
+
+CLIENT_FRAMING_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'client', 'CLI', 'framing.py')
+
+class TrickleSocket:
+    """
+    A socket that takes at most a few bytes per sendmsg call, like one whose send buffer is nearly full.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.sent = bytearray()
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        data = b''.join(bytes(buffer) for buffer in buffers)[:self.limit]
+        self.sent += data
+        return len(data)
+
+class RecordingTransport:
+    """
+    Records what a FrameConnection hands to its transport.
+    """
+    def __init__(self):
+        self.writes = []
+
+    def writelines(self, buffers):
+        self.writes.append(list(buffers))
+
+class TestFraming(unittest.TestCase):
+
+    def feed(self, frame_buffer, data, chunk_size):
+        """
+        Receives data into the buffer chunk_size bytes at a time, the way a socket under load hands it over.
+        """
+        frames = []
+        offset = 0
+        while offset < len(data):
+            free = frame_buffer.get_buffer()
+            chunk = data[offset:offset + min(chunk_size, len(free))]
+            free[:len(chunk)] = chunk
+            frame_buffer.buffer_updated(len(chunk))
+            frames.extend(frame_buffer.frames())
+            offset += len(chunk)
+        return frames
+
+    def test_partial_reads_reassemble_frames(self):
+        messages = [b'{"type": "ack"}', b'', bytes(range(256)) * 3, b'x' * 5000]
+        stream = b''.join(make_frame(message) for message in messages)
+        for chunk_size in (1, 3, 7, 1024, len(stream)):
+            self.assertEqual(self.feed(FrameBuffer(), stream, chunk_size), messages)
+
+    def test_several_frames_are_decoded_from_one_read(self):
+        frame_buffer = FrameBuffer()
+        stream = b''.join(make_frame(str(number)) for number in range(50))
+        free = frame_buffer.get_buffer()
+        free[:len(stream)] = stream
+        frame_buffer.buffer_updated(len(stream))
+        self.assertEqual(frame_buffer.frames(), [str(number).encode() for number in range(50)])
+
+    def test_frames_are_not_capped_at_four_digits(self):
+        frame_buffer = FrameBuffer()
+        message = b'y' * 200000
+        self.assertEqual(self.feed(frame_buffer, make_frame(message), 65536), [message])
+        # The buffer grew to fit the frame and drops back to its initial size afterwards
+        frame_buffer.get_buffer()
+        self.assertEqual(len(frame_buffer.buffer), DEFAULT_BUFFER_SIZE)
+
+    def test_oversized_frames_are_rejected(self):
+        frame_buffer = FrameBuffer(max_frame_size=1024)
+        with self.assertRaises(ValueError):
+            self.feed(frame_buffer, HEADER.pack(1025) + b'z' * 10, 16)
+
+    def test_reader_reads_frames_from_a_socket(self):
+        server_end, client_end = socket.socketpair()
+        messages = [b'a' * length for length in (0, 1, 9999, 10000, 70000)]
+        sender = threading.Thread(target=lambda: (server_end.sendall(b''.join(map(make_frame, messages))),
+                                                  server_end.close()))
+        sender.start()
+        reader = FrameReader(client_end)
+        self.assertEqual([reader.read_frame() for _ in messages], messages)
+        self.assertIsNone(reader.read_frame())
+        sender.join()
+        client_end.close()
+
+    def test_writer_resumes_partial_sends(self):
+        messages = ['countdown', b'', b'state' * 40, 'prompt']
+        for limit in (1, 5, 64, 10000):
+            sock = TrickleSocket(limit)
+            writer = FrameWriter(sock)
+            for message in messages:
+                writer.queue(message)
+            writer.flush()
+            self.assertEqual(bytes(sock.sent), b''.join(map(make_frame, messages)))
+            self.assertEqual(writer.pending, [])
+        # Nothing holds the socket back, so the whole burst is a single call
+        self.assertEqual(sock.calls, 1)
+
+    def test_writer_sends_a_burst_over_a_socket(self):
+        server_end, client_end = socket.socketpair()
+        messages = [b'b' * length for length in (10, 100000, 3)]
+        writer = FrameWriter(server_end)
+        for message in messages:
+            writer.queue(message)
+        sender = threading.Thread(target=writer.flush)
+        sender.start()
+        reader = FrameReader(client_end)
+        self.assertEqual([reader.read_frame() for _ in messages], messages)
+        sender.join()
+        server_end.close()
+        client_end.close()
+
+    def test_connection_coalesces_frames_queued_in_one_iteration(self):
+        async def scenario():
+            connection = FrameConnection(None)
+            connection.transport = RecordingTransport()
+            frames = [frame_parts(message) for message in ('countdown', 'state', 'prompt')]
+            for frame in frames:
+                connection.queue_frame(frame)
+            await asyncio.sleep(0)
+            connection.queue_frame(frames[0])
+            await connection.drain()
+            return connection.transport.writes, frames
+
+        writes, frames = asyncio.run(scenario())
+        self.assertEqual(writes, [[part for frame in frames for part in frame], list(frames[0])])
+
+    def test_client_framing_reads_server_frames(self):
+        spec = importlib.util.spec_from_file_location('client_framing', CLIENT_FRAMING_PATH)
+        client_framing = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(client_framing)
+        self.assertEqual(client_framing.HEADER.format, HEADER.format)
+        messages = [b'{"type": "INIT"}', b'\x03' * 12000]
+        self.assertEqual(self.feed(client_framing.FrameBuffer(), b''.join(map(make_frame, messages)), 100), messages)
+        self.assertEqual(client_framing.make_frame('ack'), make_frame('ack'))
+        self.assertEqual(client_framing.frame_parts('ack'), frame_parts('ack'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+from game import Game
+from game_random import GameRandom
+from simulation import Simulator, RandomPolicy
+
+def make_players():
+    return [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 5)]
+
+class TestGameRandom(unittest.TestCase):
+
+    def test_same_seed_gives_same_deal(self):
+        games = [Game(make_players(), 'game', rng=GameRandom(42)) for _ in range(2)]
+        for game in games:
+            game.init_round_variables()
+            game.deal_cards()
+        self.assertEqual(games[0].get_dealer(), games[1].get_dealer())
+        self.assertEqual(games[0].get_hands(), games[1].get_hands())
+
+    def test_restore_replays_draws(self):
+        rng = GameRandom(3)
+        self.assertEqual(rng.get_seed(), 3)
+        state = rng.capture()
+        first = [rng.random() for _ in range(5)]
+        rng.restore(state)
+        self.assertEqual([rng.random() for _ in range(5)], first)
+
+    def test_unseeded_generator_remembers_its_seed(self):
+        rng = GameRandom()
+        replay = GameRandom(rng.get_seed())
+        self.assertEqual(rng.random(), replay.random())
+
+    def test_simulated_game_replays_from_seed(self):
+        def play(seed):
+            policies = [RandomPolicy(random.Random(seat)) for seat in range(3)]
+            return Simulator(3, policies).play_game(seed=seed).get_score_sheet()
+        self.assertEqual(play(11), play(11))
+
+if __name__ == '__main__':
+    unittest.main()
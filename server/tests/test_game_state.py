@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+from game import Game
+from deck import find_card_id, card_ids_to_mask, mask_to_card_ids
+
+class TestGameState(unittest.TestCase):
+
+    def setUp(self):
+        players = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 4)]
+        self.game_instance = Game(players, Mock(), Mock(), {}, Mock())
+        self.game_instance.hands = {
+            'player1': card_ids_to_mask([find_card_id('Parrot', 5), find_card_id('Parrot', 9)]),
+            'player2': card_ids_to_mask([find_card_id('Parrot', 2), find_card_id('Pirate Map', 4), find_card_id(type='Pirate')]),
+            'player3': card_ids_to_mask([find_card_id('Pirate Map', 3), find_card_id(type='Escape')])
+        }
+
+    def test_dealing_more_cards_than_the_deck_holds_fails_clearly(self):
+        players = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 9)]
+        game = Game(players, Mock(), Mock(), {}, Mock())
+        game.round = 9
+        game.init_round_variables()
+        with self.assertRaisesRegex(ValueError, "8 players cannot be dealt 9 cards each from a deck of 68 cards"):
+            game.deal_cards()
+
+    def test_bid_does_not_change_previous_state(self):
+        self.game_instance.phase = "BIDDING"
+        action = {'type': 'BID', 'player_id': 'player1', 'bid': 2}
+        new_state = asyncio.run(self.game_instance.game_reducer(action))
+
+        self.assertEqual(new_state.get_bids(), {'player1': 2})
+        self.assertEqual(self.game_instance.get_bids(), {})
+        # Fields the bid did not touch are shared with the previous state
+        self.assertIs(new_state.get_hands(), self.game_instance.get_hands())
+
+    def test_play_card_does_not_change_previous_state(self):
+        self.game_instance.phase = "PLAYING"
+        self.game_instance.current_player = 0
+        action = {'type': 'PLAY_CARD', 'player_id': 'player1', 'card_index': 1}
+        new_state = asyncio.run(self.game_instance.game_reducer(action))
+
+        self.assertEqual(new_state.get_trick(), {'player1': find_card_id('Parrot', 9)})
+        self.assertEqual(mask_to_card_ids(new_state.get_hands().get('player1')), [find_card_id('Parrot', 5)])
+        self.assertEqual(self.game_instance.get_trick(), {})
+        self.assertEqual(len(mask_to_card_ids(self.game_instance.get_hands().get('player1'))), 2)
+        self.assertIs(new_state.get_hands().get('player2'), self.game_instance.get_hands().get('player2'))
+
+    def test_phase_without_reducer_leaves_state_unchanged(self):
+        self.game_instance.phase = ""
+        new_state = asyncio.run(self.game_instance.game_reducer({'type': 'BID', 'player_id': 'player1', 'bid': 1}))
+        self.assertEqual(new_state.get_bids(), {})
+
+    def test_seat_registry_follows_seating_order(self):
+        self.assertEqual(self.game_instance.get_seat('player2'), 1)
+        self.assertIs(self.game_instance.get_player_from_id('player3'), self.game_instance.get_players()[2])
+        self.assertIsNone(self.game_instance.get_player_from_id('user1'))
+
+    def test_dealer_rotation_wraps_around(self):
+        players = self.game_instance.get_players()
+        self.game_instance.dealer = players[2]
+        self.assertEqual(self.game_instance.who_goes_first(), 0)
+        self.assertIs(self.game_instance.choose_next_dealer(), players[0])
+        self.assertEqual(self.game_instance.who_goes_first(), 1)
+
+    def test_legal_moves_follow_leading_suit(self):
+        self.game_instance.leading_suit = 'Parrot'
+        self.assertEqual(mask_to_card_ids(self.game_instance.legal_moves('player2')),
+                         [find_card_id('Parrot', 2), find_card_id(type='Pirate')])
+        # A player who cannot follow suit may play anything
+        self.assertEqual(self.game_instance.legal_moves('player3'), self.game_instance.get_hands().get('player3'))
+
+    def test_legal_moves_without_leading_suit(self):
+        for leading_suit in ['', 'None Pirate', 'None Escape']:
+            self.game_instance.leading_suit = leading_suit
+            self.assertEqual(self.game_instance.legal_moves('player2'), self.game_instance.get_hands().get('player2'))
+
+    def test_validate_play_card_must_follow_suit(self):
+        self.game_instance.leading_suit = 'Parrot'
+        self.game_instance.current_player = 1
+        hand = mask_to_card_ids(self.game_instance.get_hands().get('player2'))
+        self.assertTrue(self.game_instance.validate_play_card('player2', hand.index(find_card_id('Parrot', 2))))
+        self.assertFalse(self.game_instance.validate_play_card('player2', hand.index(find_card_id('Pirate Map', 4))))
+        self.assertTrue(self.game_instance.validate_play_card('player2', hand.index(find_card_id(type='Pirate'))))
+        self.assertFalse(self.game_instance.validate_play_card('player2', 3))
+
+if __name__ == '__main__':
+    unittest.main()
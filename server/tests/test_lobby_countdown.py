@@ -0,0 +1,123 @@
+import asyncio
+import importlib.util
+import json
+import os
+import unittest
+from server import Server, WaitingRoom
+from timer_wheel import TimerWheel
+
+CLIENT_COUNTDOWN_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'client', 'CLI', 'countdown.py')
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class RecordingConnection:
+    """
+    Records the messages a player is sent.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.messages = []
+
+    def queue_frame(self, frame):
+        self.messages.append(json.loads(frame[1]))
+
+    async def drain(self):
+        pass
+
+    def get_extra_info(self, name):
+        return self.name
+
+class TestLobbyCountdown(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0))
+        self.clock = FakeClock()
+        self.server.timer_wheel = TimerWheel(clock=self.clock)
+        self.started = []
+
+        async def start_game(room, players, player_sockets):
+            self.started.append((self.clock.now, [connection.name for connection in player_sockets]))
+
+        self.server.start_game = start_game
+
+    def tearDown(self):
+        self.server.server_socket.close()
+
+    async def join(self, room, name):
+        connection = RecordingConnection(name)
+        room.add_player({'player_id': name}, connection)
+        if room.is_ready():
+            room.start_timer(10)
+        await asyncio.sleep(0)
+        return connection
+
+    async def run_seconds(self, seconds):
+        for _ in range(int(seconds * 10)):
+            self.clock.now = round(self.clock.now + 0.1, 6)
+            self.server.timer_wheel.advance()
+            await asyncio.sleep(0)
+
+    def countdowns(self, connection):
+        return [message['content'] for message in connection.messages if message['type'] == 'countdown']
+
+    def test_one_countdown_message_per_deadline(self):
+        async def scenario():
+            room = WaitingRoom(self.server, 'Room 1')
+            connections = [await self.join(room, 'player' + str(number)) for number in range(3)]
+            await self.run_seconds(12)
+            return connections
+
+        connections = asyncio.run(scenario())
+        for connection in connections:
+            countdowns = self.countdowns(connection)
+            self.assertEqual(len(countdowns), 1)
+            self.assertAlmostEqual(countdowns[0]['starts_at'] - countdowns[0]['server_time'], 10, places=1)
+        self.assertEqual(len(self.started), 1)
+        self.assertAlmostEqual(self.started[0][0], 10)
+
+    def test_countdown_stops_when_a_player_leaves_and_restarts_when_one_joins(self):
+        async def scenario():
+            room = WaitingRoom(self.server, 'Room 1')
+            connections = [await self.join(room, 'player' + str(number)) for number in range(3)]
+            await self.run_seconds(4)
+            room.remove_player(connections[1])
+            await asyncio.sleep(0)
+            await self.run_seconds(10)
+            self.assertEqual(self.started, [])
+            connections.append(await self.join(room, 'player3'))
+            await self.run_seconds(11)
+            return connections
+
+        first, left, _, joined = asyncio.run(scenario())
+        self.assertEqual([countdown['starts_at'] is None for countdown in self.countdowns(first)], [False, True, False])
+        self.assertEqual(len(self.countdowns(left)), 1)
+        self.assertEqual(len(self.countdowns(joined)), 1)
+        self.assertEqual(self.started, [(24.0, ['player0', 'player2', 'player3'])])
+
+    def test_client_counts_down_on_its_own_clock(self):
+        spec = importlib.util.spec_from_file_location('client_countdown', CLIENT_COUNTDOWN_PATH)
+        client_countdown = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(client_countdown)
+        # The client's clock is nowhere near the server's, only the seconds left matter
+        clock = FakeClock()
+        clock.now = 500.0
+        countdown = client_countdown.Countdown(clock)
+        self.assertIsNone(countdown.render())
+        countdown.update({'starts_at': 1010.0, 'server_time': 1000.4})
+        self.assertEqual(countdown.render(), "Game starting in: 00:10")
+        self.assertAlmostEqual(countdown.next_wait(), 0.6)
+        clock.now = 509.0
+        self.assertEqual(countdown.render(), "Game starting in: 00:01")
+        clock.now = 511.0
+        self.assertEqual(countdown.render(), "Game starting in: 00:00")
+        countdown.update({'starts_at': None, 'server_time': 1011.0})
+        self.assertIsNone(countdown.seconds_left())
+
+if __name__ == '__main__':
+    unittest.main()
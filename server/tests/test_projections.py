@@ -0,0 +1,46 @@
+import json
+import unittest
+from unittest.mock import Mock
+from game import Game
+from phase import Phase
+from projections import PHASE_PROJECTIONS, project_game_state, project_private_states
+from deck import find_card_id, card_ids_to_mask
+
+class TestProjections(unittest.TestCase):
+
+    def setUp(self):
+        players = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 4)]
+        self.game_instance = Game(players, Mock(), Mock(), {}, Mock())
+        self.game_instance.hands = {'player1': card_ids_to_mask([find_card_id('Parrot', 5)]), 'player2': 0, 'player3': 0}
+        self.game_instance.trick = {'player2': find_card_id('Parrot', 9)}
+
+    def test_every_phase_has_a_projection(self):
+        self.assertEqual(set(PHASE_PROJECTIONS), set(Phase))
+
+    def test_projection_names_its_phase(self):
+        for phase in Phase:
+            self.game_instance.phase = phase
+            network_action = project_game_state(self.game_instance)
+            # Phases go over the wire as their plain names
+            self.assertEqual(json.loads(json.dumps(network_action))['phase'], phase.value)
+
+    def test_playing_projection_sends_card_ids(self):
+        self.game_instance.phase = Phase.PLAYING
+        network_action = project_game_state(self.game_instance)
+        self.assertEqual(network_action['trick'], {'player2': find_card_id('Parrot', 9)})
+        self.assertEqual(network_action['player_num'], 3)
+
+    def test_hands_are_only_sent_to_their_owner(self):
+        for phase in (Phase.DEALING, Phase.RESOLVING):
+            self.game_instance.phase = phase
+            self.assertNotIn('hands', project_game_state(self.game_instance))
+            private_states = project_private_states(self.game_instance)
+            self.assertEqual(private_states['player1'], {'hand': [find_card_id('Parrot', 5)]})
+            self.assertEqual(private_states['player2'], {'hand': []})
+
+    def test_public_phases_have_no_private_state(self):
+        self.game_instance.phase = Phase.BIDDING
+        self.assertEqual(project_private_states(self.game_instance), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,13 @@
+import random
 import unittest
 from unittest.mock import Mock
-from game import Game
+from game import Game, LEADING_SUITS
+from deck import find_card_id, CARD_CATALOG
 
 class TestResolveTrick(unittest.TestCase):
     
     def setUp(self):
-        arg1 = Mock()
+        arg1 = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(1, 5)]
         arg2 = Mock()
         arg3 = Mock()
         arg4 = Mock()
@@ -14,10 +16,10 @@ class TestResolveTrick(unittest.TestCase):
     
     def test_highest_priority_wins(self):
         self.game_instance.trick = {
-            'player1': {'priority': 1, 'number': 5, 'suit': 'Parrot'},
-            'player2': {'priority': 1, 'number': 2, 'suit': 'Pirate Map'},
-            'player3': {'priority': 1, 'number': 3, 'suit': 'Treasure Chest'},
-            'player4': {'priority': 2, 'number': 3, 'suit': 'Jolly Roger'}
+            'player1': find_card_id('Parrot', 5),
+            'player2': find_card_id('Pirate Map', 2),
+            'player3': find_card_id('Treasure Chest', 3),
+            'player4': find_card_id('Jolly Roger', 3)
         }
         self.game_instance.leading_suit = 'Parrot'
         
@@ -26,9 +28,9 @@ class TestResolveTrick(unittest.TestCase):
     
     def test_same_priority_different_suits(self):
         self.game_instance.trick = {
-            'player1': {'priority': 1, 'number': 5, 'suit': 'Treasure Chest'},
-            'player2': {'priority': 1, 'number': 2, 'suit': 'Parrot'},
-            'player3': {'priority': 1, 'number': 2, 'suit': 'Pirate Map'}
+            'player1': find_card_id('Treasure Chest', 5),
+            'player2': find_card_id('Parrot', 2),
+            'player3': find_card_id('Pirate Map', 2)
         }
         self.game_instance.leading_suit = 'Treasure Chest'
         
@@ -37,8 +39,8 @@ class TestResolveTrick(unittest.TestCase):
         
     def test_same_priority_same_suit_higher_number(self):
         self.game_instance.trick = {
-            'player1': {'priority': 1, 'number': 5, 'suit': 'Pirate Map'},
-            'player2': {'priority': 1, 'number': 7, 'suit': 'Pirate Map'}
+            'player1': find_card_id('Pirate Map', 5),
+            'player2': find_card_id('Pirate Map', 7)
         }
         self.game_instance.leading_suit = 'Pirate Map'
         
@@ -47,38 +49,67 @@ class TestResolveTrick(unittest.TestCase):
     
     def test_skull_king_win(self):
         self.game_instance.trick = {
-            'player1': {'priority': 0, 'bonus': 0, 'type': 'Escape'},
-            'player2': {'priority': 4, 'bonus': 0, 'type': 'Skull King'},
-            'player3': {'priority': 0, 'bonus': 0, 'type': 'Tigress'}
+            'player1': find_card_id(type='Escape'),
+            'player2': find_card_id(type='Skull King'),
+            'player3': find_card_id(type='Tigress')
         }
         self.game_instance.leading_suit = 'Escape'
         winner = self.game_instance.resolve_trick()
         self.assertEqual(winner, 'player2')
     
-    def test_check_round_over(self):
-        self.game_instance.tricks = {
-            'player1': {'trick1': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick2': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}]},
-            'player2': {'trick1': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick2': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}]},
-            'player3': {'trick1': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick2': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick3': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick4': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}],
-                        'trick5': [{'priority': 4, 'bonus': 0, 'type': 'Skull King'}, 
-                                   {'priority': 0, 'bonus': 0, 'type': 'Escape'}, {'priority': 0, 'bonus': 0, 'type': 'Tigress'}]}
+    def test_later_trump_does_not_beat_earlier_trump_off_lead(self):
+        self.game_instance.trick = {
+            'player1': find_card_id('Parrot', 2),
+            'player2': find_card_id('Jolly Roger', 3),
+            'player3': find_card_id('Jolly Roger', 9)
         }
+        self.game_instance.leading_suit = 'Parrot'
+        winner = self.game_instance.resolve_trick()
+        self.assertEqual(winner, 'player2')
+
+    def test_dominance_table_matches_card_comparison(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            card_ids = rng.sample(range(len(CARD_CATALOG)), 4)
+            leading_suit = rng.choice(LEADING_SUITS)
+            self.game_instance.trick = {'player' + str(i + 1): card_id for i, card_id in enumerate(card_ids)}
+            self.game_instance.leading_suit = leading_suit
+            self.game_instance.tricks_won = {}
+
+            highest_priority = -1
+            highest_number = -1
+            for player_id, card_id in self.game_instance.trick.items():
+                card = CARD_CATALOG[card_id]
+                if card.priority > highest_priority:
+                    highest_priority = card.priority
+                    highest_number = card.number
+                    expected = player_id
+                elif card.priority == highest_priority and card.suit == leading_suit and card.number > highest_number:
+                    highest_number = card.number
+                    expected = player_id
+
+            self.assertEqual(self.game_instance.resolve_trick(), expected)
+
+    def test_check_round_over(self):
+        self.game_instance.tricks_won = {'player1': 2, 'player2': 2, 'player3': 5}
         
         self.game_instance.round = 9
         is_round_over = self.game_instance.check_round_over()
         self.assertEqual(is_round_over, True)
+
+    def test_winner_collects_trick_bonus(self):
+        self.game_instance.trick = {
+            'player1': find_card_id(type='Pirate'),
+            'player2': find_card_id(type='Skull King'),
+            'player3': find_card_id(type='Pirate'),
+            'player4': find_card_id('Parrot', 14)
+        }
+        self.game_instance.leading_suit = 'None Pirate'
+        self.game_instance.resolve_trick()
+        # Only the pirate played after the skull king is captured
+        self.assertEqual(self.game_instance.get_tricks_won(), {'player2': 1})
+        self.assertEqual(self.game_instance.calculate_bonuses('player2'), 40)
+        self.assertEqual(self.game_instance.calculate_bonuses('player1'), 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
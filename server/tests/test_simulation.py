@@ -0,0 +1,42 @@
+import random
+import unittest
+from simulation import Simulator, RandomPolicy
+from deck import mask_to_card_ids
+
+class LowestCardPolicy:
+    def bid(self, game, player_id):
+        return 0
+
+    def play(self, game, player_id):
+        return mask_to_card_ids(game.legal_moves(player_id))[0]
+
+class TestSimulation(unittest.TestCase):
+
+    def test_plays_every_round(self):
+        simulator = Simulator(4, [RandomPolicy(random.Random(seat)) for seat in range(4)])
+        game = simulator.play_game()
+        self.assertEqual(game.get_round(), 10)
+        self.assertEqual(sorted(game.get_score_sheet()), ['player0', 'player1', 'player2', 'player3'])
+        for score in game.get_score_sheet().values():
+            self.assertEqual(score % 10, 0)
+
+    def test_round_tricks_add_up(self):
+        simulator = Simulator(3, [LowestCardPolicy() for _ in range(3)], rounds=4)
+        game = simulator.play_game()
+        tricks_won = sum(game.get_tricks_won().values())
+        self.assertEqual(tricks_won, 4)
+        self.assertEqual(game.get_hands(), {'player0': 0, 'player1': 0, 'player2': 0})
+
+    def test_rejects_tables_the_deck_cannot_deal(self):
+        with self.assertRaises(ValueError):
+            Simulator(7)
+        with self.assertRaises(ValueError):
+            Simulator(3, [RandomPolicy()])
+
+    def test_run_reports_throughput(self):
+        result = Simulator(4).run(3)
+        self.assertEqual(result['games'], 3)
+        self.assertGreater(result['games_per_second'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import random
+import unittest
+from state_delta import diff_state, apply_patch, StateHistory
+from broadcast import StateFrames
+
+class TestStateDelta(unittest.TestCase):
+
+    def test_patch_turns_old_state_into_new_state(self):
+        old = {'phase': 'PLAYING', 'trick': {'player1': {'suit': 'Parrot', 'number': 3}}, 'player_num': 3}
+        new = {'phase': 'PLAYING', 'trick': {'player1': {'suit': 'Parrot', 'number': 3}, 'player2': {'type': 'Pirate'}},
+               'current_player': {'username': 'user3'}}
+        patch = diff_state(old, new)
+        self.assertEqual(patch, {'trick': {'player2': {'type': 'Pirate'}}, 'current_player': {'username': 'user3'},
+                                 'player_num': None})
+        self.assertEqual(apply_patch(old, patch), new)
+        self.assertEqual(old['trick'], {'player1': {'suit': 'Parrot', 'number': 3}})
+
+    def test_unknown_base_gets_full_state(self):
+        history = StateHistory(history_size=2)
+        history.push({'phase': 'STARTING'}, {})
+        history.acknowledge('player1', 1)
+        history.push({'phase': 'DEALING'}, {})
+        self.assertEqual(history.base_for('player1'), 1)
+        history.push({'phase': 'START_BIDDING'}, {})
+        # State 1 has been forgotten
+        self.assertIsNone(history.base_for('player1'))
+        self.assertIsNone(history.base_for('player2'))
+        self.assertEqual(history.public_patch(None), {'phase': 'START_BIDDING'})
+
+    def test_client_rebuilds_every_state_from_patches(self):
+        rng = random.Random(3)
+        player_ids = ['player1', 'player2']
+        history = StateHistory(history_size=3)
+        client_states = {player_id: {} for player_id in player_ids}
+        for step in range(200):
+            public_state = {'phase': rng.choice(['PLAYING', 'RESOLVING']),
+                            'trick': {player_id: rng.randrange(5) for player_id in player_ids if rng.random() < 0.5},
+                            'round': step // 20}
+            private_states = {player_id: {'hand': sorted(rng.sample(range(10), 3))} for player_id in player_ids}
+            history.push(public_state, private_states)
+            frames = StateFrames(history, player_ids)
+            for player_id in player_ids:
+                update = json.loads(frames.frame_for(player_id))['content']
+                base = update['base']
+                client_states[player_id] = apply_patch(client_states[player_id] if base is not None else {}, update['patch'])
+                self.assertEqual(client_states[player_id], {**public_state, **private_states[player_id]})
+                # Players sometimes miss an acknowledgement and fall behind
+                if rng.random() < 0.8:
+                    history.acknowledge(player_id, update['seq'])
+                else:
+                    client_states[player_id] = {}
+                    history.acknowledge(player_id, None)
+
+if __name__ == '__main__':
+    unittest.main()
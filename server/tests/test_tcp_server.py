@@ -0,0 +1,84 @@
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+from server import Server
+from framing import HEADER, make_frame
+
+class TestTcpServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0))
+        self.server.countdown_seconds = 0
+        self.log_directory = tempfile.TemporaryDirectory()
+        self.server.event_log_directory = self.log_directory.name
+
+    def tearDown(self):
+        self.server.server_socket.close()
+        self.log_directory.cleanup()
+
+    async def receive(self, reader):
+        (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+        return json.loads(await reader.readexactly(length))
+
+    async def send(self, writer, message):
+        writer.write(make_frame(json.dumps(message)))
+        await writer.drain()
+
+    async def play_until_first_state(self, number, port):
+        """
+        Joins a room over the length prefixed protocol the CLI client speaks and returns the message types it
+        was sent up to its first game state.
+        """
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        await self.send(writer, {'username': 'user' + str(number), 'player_id': 'player' + str(number), 'score': 0})
+        received = []
+        while True:
+            message = await self.receive(reader)
+            received.append(message['type'])
+            if message['type'] == 'INIT':
+                await self.send(writer, "Message received")
+            elif message['type'] == 'gameplay_data':
+                writer.close()
+                return received, message['content']
+
+    def test_players_reach_a_game_without_a_thread_each(self):
+        async def scenario():
+            serve = asyncio.create_task(self.server.serve())
+            port = self.server.server_socket.getsockname()[1]
+            threads = threading.active_count()
+            players = [asyncio.create_task(self.play_until_first_state(number, port)) for number in range(3)]
+            results = await asyncio.wait_for(asyncio.gather(*players), timeout=10)
+            self.assertEqual(threading.active_count(), threads)
+            # Every INIT broadcast was acknowledged by every player in the room
+            for room in self.server.waiting_rooms:
+                self.assertEqual(dict(room.ack_tracker.waiting), {})
+            # The running game is held by the server, not only weakly by the event loop
+            running = [task.get_coro().__qualname__ for task in self.server.background_tasks]
+            self.assertIn('Server.run_game', running)
+            serve.cancel()
+            return results
+
+        for received, content in asyncio.run(scenario()):
+            self.assertEqual(received[:2], ['catalog', 'INIT'])
+            self.assertIn('countdown', received)
+            self.assertEqual(content['seq'], 1)
+            self.assertEqual(content['patch']['phase'], 'STARTING')
+
+    def test_failed_background_task_is_logged_and_released(self):
+        async def fail():
+            raise ValueError("Game loop failed")
+
+        async def scenario():
+            task = self.server.spawn(fail())
+            await asyncio.wait({task})
+            await asyncio.sleep(0)
+
+        with self.assertLogs(level='ERROR') as logs:
+            asyncio.run(scenario())
+        self.assertIn('failed', logs.output[0])
+        self.assertEqual(self.server.background_tasks, set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import random
+import unittest
+from timer_wheel import TimerWheel
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.ticks = 0
+
+    def __call__(self):
+        return self.now
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.fired = []
+
+    def run_ticks(self, wheel, ticks):
+        for _ in range(ticks):
+            self.clock.ticks += 1
+            self.clock.now = self.clock.ticks * wheel.tick
+            wheel.advance()
+
+    def record(self, name):
+        self.fired.append((name, round(self.clock.now / 0.1)))
+
+    def test_timers_fire_on_their_tick_across_levels(self):
+        wheel = TimerWheel(tick=0.1, clock=self.clock)
+        rng = random.Random(0)
+        expected = []
+        for number in range(2000):
+            ticks = rng.choice([rng.randint(1, 63), rng.randint(64, 4095), rng.randint(4096, 20000)])
+            wheel.call_later(ticks * 0.1, self.record, number)
+            expected.append((number, ticks))
+        self.run_ticks(wheel, 20001)
+        self.assertEqual(sorted(self.fired), expected)
+        self.assertEqual(len(wheel), 0)
+
+    def test_timers_beyond_the_span_still_fire_on_time(self):
+        # 2 levels of 4 slots only reach 16 ticks ahead
+        wheel = TimerWheel(tick=0.1, slot_bits=2, levels=2, clock=self.clock)
+        for ticks in (15, 16, 17, 100, 257):
+            wheel.call_later(ticks * 0.1, self.record, ticks)
+        self.run_ticks(wheel, 300)
+        self.assertEqual(self.fired, [(ticks, ticks) for ticks in (15, 16, 17, 100, 257)])
+
+    def test_cancelled_timers_do_not_fire(self):
+        wheel = TimerWheel(tick=0.1, clock=self.clock)
+        kept = wheel.call_later(1, self.record, 'kept')
+        dropped = [wheel.call_later(delay, self.record, 'dropped') for delay in (0.5, 1, 30)]
+        for timer in dropped:
+            timer.cancel()
+        self.assertEqual(len(wheel), 1)
+        self.run_ticks(wheel, 400)
+        self.assertEqual(self.fired, [('kept', 10)])
+        self.assertTrue(kept.cancelled())
+
+    def test_callbacks_can_schedule_the_next_tick(self):
+        wheel = TimerWheel(tick=0.1, clock=self.clock)
+
+        def countdown(t):
+            self.record(t)
+            if t > 0:
+                wheel.call_later(1, countdown, t - 1)
+
+        wheel.call_later(1, countdown, 3)
+        self.run_ticks(wheel, 100)
+        self.assertEqual(self.fired, [(3, 10), (2, 20), (1, 30), (0, 40)])
+
+    def test_late_advance_catches_up(self):
+        wheel = TimerWheel(tick=0.1, clock=self.clock)
+        wheel.call_later(0.3, self.record, 'first')
+        wheel.call_later(0.7, self.record, 'second')
+        self.clock.ticks = 10
+        self.clock.now = 1.0
+        # Timers scheduled while the wheel lags still count from the clock
+        wheel.call_later(0.5, self.record, 'third')
+        self.assertEqual(wheel.advance(), 2)
+        self.run_ticks(wheel, 5)
+        self.assertEqual([name for name, _ in self.fired], ['first', 'second', 'third'])
+        self.assertEqual(self.fired[-1][1], 15)
+
+    def test_run_drives_the_wheel_from_the_event_loop(self):
+        async def scenario():
+            wheel = TimerWheel(tick=0.01)
+            driver = asyncio.create_task(wheel.run())
+            done = asyncio.get_running_loop().create_future()
+            wheel.call_later(0.05, done.set_result, 'fired')
+            result = await asyncio.wait_for(done, timeout=1)
+            driver.cancel()
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), 'fired')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest.mock import Mock
+import websockets
+from web_socket_server import WebSocketServer, WaitingRoom
+from broadcast import StateFrames
+from game import Game
+from phase import Phase
+from projections import project_game_state, project_private_states
+from state_delta import StateHistory
+import codec
+
+class RecordingWebSocket:
+    """
+    Records what each send is handed, and whether it goes out as a text frame.
+    """
+    def __init__(self, number):
+        self.remote_address = ('127.0.0.1', number)
+        self.sent = []
+
+    async def send(self, message, text=None):
+        self.sent.append((message, text))
+
+class TestWebSocketLobby(unittest.TestCase):
+
+    def setUp(self):
+        self.server = WebSocketServer()
+        self.server.countdown_seconds = 1
+        self.log_directory = tempfile.TemporaryDirectory()
+        self.server.event_log_directory = self.log_directory.name
+
+    def tearDown(self):
+        self.log_directory.cleanup()
+
+    async def join_until_first_state(self, number, port):
+        """
+        Joins a room the way the GUI does and returns the frames it was sent up to its first game state.
+        """
+        async with websockets.connect(f"ws://127.0.0.1:{port}") as websocket:
+            await websocket.send(json.dumps({'username': 'user' + str(number), 'player_id': 'player' + str(number)}))
+            frames = []
+            while True:
+                frame = await websocket.recv()
+                frames.append(frame)
+                if json.loads(frame)['type'] == 'gameplay_data':
+                    return frames
+
+    def test_gui_lobby_gets_text_frames_and_one_countdown(self):
+        async def scenario():
+            async with websockets.serve(self.server.handle_client, '127.0.0.1', 0) as websocket_server:
+                port = websocket_server.sockets[0].getsockname()[1]
+                wheel = asyncio.create_task(self.server.timer_wheel.run())
+                players = [asyncio.create_task(self.join_until_first_state(number, port)) for number in range(3)]
+                results = await asyncio.wait_for(asyncio.gather(*players), timeout=10)
+                wheel.cancel()
+                return results
+
+        for frames in asyncio.run(scenario()):
+            # Browsers get bytes as a Blob that JSON.parse cannot read
+            self.assertTrue(all(isinstance(frame, str) for frame in frames))
+            countdowns = [json.loads(frame)['content'] for frame in frames if json.loads(frame)['type'] == 'countdown']
+            self.assertEqual(len(countdowns), 1)
+            self.assertAlmostEqual(countdowns[0]['starts_at'] - countdowns[0]['server_time'], 1, places=2)
+
+    def test_room_broadcast_hands_every_websocket_the_same_bytes(self):
+        room = WaitingRoom(self.server, 'Room 1')
+        websockets_in_room = [RecordingWebSocket(number) for number in range(3)]
+        for number, websocket in enumerate(websockets_in_room):
+            room.add_player({'player_id': 'player' + str(number)}, websocket)
+        asyncio.run(room.broadcast(self.server.make_message('INIT', room.players)))
+
+        frame, text = websockets_in_room[0].sent[0]
+        self.assertIsInstance(frame, bytes)
+        self.assertTrue(text)
+        for websocket in websockets_in_room:
+            self.assertIs(websocket.sent[0][0], frame)
+
+    def test_game_states_are_sent_without_decoding(self):
+        players = [{'player_id': 'player' + str(i), 'username': 'user' + str(i)} for i in range(3)]
+        player_codecs = {'player0': codec.JSON_CODEC, 'player1': codec.JSON_CODEC, 'player2': codec.BINARY_CODEC}
+        game = Game(players, Mock(), Mock(), {}, Mock())
+        game.phase = Phase.BIDDING
+        history = StateHistory()
+        history.push(project_game_state(game), project_private_states(game))
+        frames = StateFrames(history, list(player_codecs), player_codecs)
+        websockets_in_game = {player_id: RecordingWebSocket(0) for player_id in player_codecs}
+
+        async def send_states():
+            for player_id, websocket in websockets_in_game.items():
+                await self.server.send_frame(websocket, frames.frame_for(player_id), player_codecs[player_id])
+
+        asyncio.run(send_states())
+        json_frame, text = websockets_in_game['player0'].sent[0]
+        self.assertTrue(text)
+        self.assertIs(websockets_in_game['player1'].sent[0][0], json_frame)
+        binary_frame, text = websockets_in_game['player2'].sent[0]
+        self.assertFalse(text)
+        self.assertIs(binary_frame, frames.frame_for('player2'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import math
+import time
+
+
+class Timer:
+    """
+    The Timer class is a callback scheduled on a TimerWheel. Cancelling it removes it from its slot at once.
+    """
+    __slots__ = ('expires', 'callback', 'args', 'slot')
+
+    def __init__(self, expires, callback, args):
+        """
+        Initializes a new instance of the Timer class.
+
+        Args:
+            expires (int): The wheel tick the timer fires on.
+            callback (callable): The function to call.
+            args (tuple): The arguments to call it with.
+        """
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        # The slot holding the timer, None once it has fired or been cancelled
+        self.slot = None
+
+    def cancel(self):
+        """
+        Cancels the timer if it has not fired yet.
+        """
+        if self.slot is not None:
+            self.slot.discard(self)
+            self.slot = None
+
+    def cancelled(self):
+        """
+        Returns a boolean indicating whether the timer is no longer scheduled.
+
+        Returns:
+            bool: True if the timer has fired or been cancelled, False otherwise.
+        """
+        return self.slot is None
+
+
+class TimerWheel:
+    """
+    The TimerWheel class is a hierarchical timing wheel running every timer of the process, such as the
+    countdown of every waiting room, from one task. Scheduling and cancelling are O(1) however many timers are
+    pending: a timer goes into the slot of the tick it expires on, in the finest level whose span reaches it,
+    and timers of coarser levels move down a level each time the finer level wraps around.
+
+    With the default 0.1 second tick and 4 levels of 64 slots, timers up to 19 days ahead are exact to the tick.
+    """
+    def __init__(self, tick=0.1, slot_bits=6, levels=4, clock=time.monotonic):
+        """
+        Initializes a new instance of the TimerWheel class.
+
+        Args:
+            tick (float): The seconds between two ticks, the resolution of every timer.
+            slot_bits (int): The log2 of the number of slots per level.
+            levels (int): The number of levels.
+            clock (callable): The function returning the current time in seconds.
+        """
+        self.tick = tick
+        self.slot_bits = slot_bits
+        self.slot_mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.clock = clock
+        self.wheels = [[set() for _ in range(1 << slot_bits)] for _ in range(levels)]
+        # The last tick processed and the time tick 0 happened at
+        self.current = 0
+        self.started = clock()
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedules a callback to run after a delay. The delay is counted in whole ticks from the current tick, so
+        the callback runs within a tick of it, and a timer that schedules the next one from its callback, like
+        a countdown, does not drift.
+
+        Args:
+            delay (float): The seconds to wait.
+            callback (callable): The function to call. It runs on the wheel's task, so it should be quick and
+                start a task for anything that needs to await.
+            *args: The arguments to call it with.
+
+        Returns:
+            Timer: The timer, which can be cancelled.
+        """
+        # Whole ticks the wheel is behind the clock, normally none
+        lag = max(0, int(round((self.clock() - self.started) / self.tick, 6)) - self.current)
+        # Rounded first so float error in whole multiples of the tick does not cost an extra tick
+        ticks = max(1, math.ceil(round(delay / self.tick, 6)))
+        timer = Timer(self.current + lag + ticks, callback, args)
+        self.insert(timer)
+        return timer
+
+    def insert(self, timer):
+        """
+        Puts a timer into the slot of the tick it expires on, in the finest level whose span reaches it.
+
+        Args:
+            timer (Timer): The timer.
+        """
+        ticks = timer.expires - self.current
+        for level in range(self.levels):
+            if ticks < 1 << (self.slot_bits * (level + 1)):
+                index = (timer.expires >> (self.slot_bits * level)) & self.slot_mask
+                break
+        else:
+            # Beyond the wheel's span, park it in the top level slot that comes around last and place it again then
+            index = ((self.current >> (self.slot_bits * level)) - 1) & self.slot_mask
+        timer.slot = self.wheels[level][index]
+        timer.slot.add(timer)
+
+    def __len__(self):
+        """
+        Returns the number of timers waiting to fire.
+
+        Returns:
+            int: The number of pending timers.
+        """
+        return sum(len(slot) for wheel in self.wheels for slot in wheel)
+
+    def advance(self, now=None):
+        """
+        Processes every tick up to the given time, running the callbacks of the timers that expire.
+
+        Args:
+            now (float): The current time, the clock's time if None.
+
+        Returns:
+            int: The number of callbacks run.
+        """
+        if now is None:
+            now = self.clock()
+        target = int(round((now - self.started) / self.tick, 6))
+        fired = 0
+        while self.current < target:
+            self.current += 1
+            self.cascade()
+            slot = self.wheels[0][self.current & self.slot_mask]
+            self.wheels[0][self.current & self.slot_mask] = set()
+            for timer in slot:
+                timer.slot = None
+                fired += 1
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    logging.exception(f"Timer callback {timer.callback} failed")
+        return fired
+
+    def cascade(self):
+        """
+        Moves the timers of the coarser slots the current tick has reached down to finer levels.
+        """
+        for level in range(1, self.levels):
+            if self.current & ((1 << (self.slot_bits * level)) - 1):
+                break
+            index = (self.current >> (self.slot_bits * level)) & self.slot_mask
+            slot = self.wheels[level][index]
+            self.wheels[level][index] = set()
+            for timer in slot:
+                self.insert(timer)
+
+    def next_tick_time(self):
+        """
+        Returns the time the next tick is due.
+
+        Returns:
+            float: The time, on the wheel's clock.
+        """
+        return self.started + (self.current + 1) * self.tick
+
+    async def run(self):
+        """
+        Drives the wheel from the event loop, processing each tick when it is due.
+        """
+        while True:
+            await asyncio.sleep(max(0, self.next_tick_time() - self.clock()))
+            self.advance()
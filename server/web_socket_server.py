@@ -4,7 +4,16 @@ import uuid
 import websockets
 import logging
 import json
+import time
 from game import Game
+from projections import project_game_state, project_private_states, catalog_to_network
+from broadcast import StateFrames, EncodeStats
+from timer_wheel import TimerWheel
+from fan_out import fan_out
+from state_delta import StateHistory
+import codec
+from action_barrier import ActionBarrier
+from event_log import GameEventLog
 
 # logging.basicConfig(level=logging.DEBUG)
 
@@ -27,6 +36,13 @@ class WaitingRoom:
         self.player_sockets = []
         self.timer_duration = 90
         self.game_started = False
+        # Seconds a broadcast waits for every player before giving up on the slow ones
+        self.broadcast_deadline = 5
+        # True once the countdown to the game is running, so only one is ever started
+        self.countdown_started = False
+        # The start of the game on the server's timer wheel, and when it is due on the server's clock
+        self.countdown = None
+        self.starts_at = None
         self.room_name = room_name
         self.server = server
         self.room_id = self.server.generate_unique_id()
@@ -114,41 +130,109 @@ class WaitingRoom:
             self.player_sockets.append(websocket)
         return room_available
 
+    def remove_player(self, websocket):
+        """
+        Removes a player who left the waiting room. If that leaves too few players, the countdown stops until
+        enough players join again.
+        
+        Args:
+            websocket (websockets.WebSocketServerProtocol): The websocket of the client that left.
+        """
+        if websocket not in self.player_sockets:
+            return
+        index = self.player_sockets.index(websocket)
+        del self.players[index]
+        del self.player_sockets[index]
+        counting_down = self.countdown is not None and not self.countdown.cancelled()
+        if counting_down and self.get_player_num() < self.get_min_players():
+            self.countdown_started = False
+            self.set_deadline(None)
+
     async def broadcast_timer(self, timer):
         """
-        Broadcasts the current timer value to all players in the waiting room. This method is thread safe.
+        Broadcasts the current timer value to all players in the waiting room.
         
         Args:
             timer (str): The current timer value to broadcast.
         """
-        for websocket in self.player_sockets:
-            await websocket.send(timer)
+        await self.broadcast(timer)
 
     async def broadcast(self, message):
         """
-        Broadcasts a message to all players in the waiting room. This method is thread safe.
+        Broadcasts a message to all players in the waiting room at once, so a slow player only delays
+        themselves.
         
         Args:
             message (str): The message to broadcast.
+
+        Returns:
+            FanOutReport: The latency of every player, and the players that missed the deadline.
         """
-        for websocket in self.player_sockets:
-            await websocket.send(message)
+        # Encode once, every websocket sends the same bytes
+        frame = message.encode() if isinstance(message, str) else message
 
-    async def start_timer(self, t):
+        async def send(websocket):
+            await self.server.send_frame(websocket, frame)
+
+        report = await fan_out(list(self.player_sockets), send, deadline=self.broadcast_deadline)
+        for websocket, latency in report.latencies().items():
+            logging.debug(f"Broadcast to {websocket.remote_address} took {latency * 1000:.1f}ms")
+        return report
+
+    def start_timer(self, t):
         """
-        Starts a countdown timer for the specified duration. Once the timer reaches zero, the game starts.
+        Starts a countdown timer for the specified duration on the server's timer wheel, which runs the countdown
+        of every room. Once the timer reaches zero, the game starts.
         
         Args:
             t (int): The duration of the timer in seconds.
         """
-        while t >= 0:
-            mins, secs = divmod(t, 60)
-            timer = '{:02d}:{:02d}'.format(mins, secs)
-            serialized_timer = self.server.make_message('countdown', timer)
-            await self.broadcast_timer(serialized_timer)
-            await asyncio.sleep(1)
-            t -= 1
-        await self.start_game()
+        self.countdown_started = True
+        self.set_deadline(t)
+
+    def set_deadline(self, seconds):
+        """
+        Moves the start of the game to the given number of seconds from now, or calls it off, and tells every
+        player. Clients count down to the deadline themselves, so this is the only countdown message they get
+        until it changes again.
+        
+        Args:
+            seconds (float): The seconds until the game starts, None to stop the countdown.
+        """
+        if self.countdown is not None:
+            self.countdown.cancel()
+        if seconds is None:
+            self.countdown = None
+            self.starts_at = None
+        else:
+            self.countdown = self.server.timer_wheel.call_later(seconds, self.countdown_finished)
+            self.starts_at = time.time() + seconds
+        self.server.spawn(self.broadcast_timer(self.countdown_message()))
+
+    def countdown_message(self):
+        """
+        Creates the countdown message: when the game starts on the server's clock, or None if no countdown is
+        running, and the server's time when the message was made, so clients can count down on their own clock.
+        
+        Returns:
+            str: The serialized countdown message.
+        """
+        return self.server.make_message('countdown', {'starts_at': self.starts_at, 'server_time': time.time()})
+
+    def countdown_finished(self):
+        """
+        Starts the game once the countdown is over.
+        """
+        self.server.spawn(self.start_game())
+
+    def is_ready(self):
+        """
+        Returns a boolean indicating whether the room has enough players to start counting down.
+        
+        Returns:
+            bool: True if the countdown should start, False otherwise.
+        """
+        return self.get_player_num() >= self.get_min_players() and not self.countdown_started
 
     async def start_game(self):
         """
@@ -169,13 +253,21 @@ class ActionTranslator:
     """
     The ActionTranslator class is responsible for translating network commands into game actions and game states into network actions.
     """
-    def __init__(self):
+    def __init__(self, player_codecs=None):
         """
         Initializes a new instance of the ActionTranslator class.
+
+        Args:
+            player_codecs (dict): The codec negotiated with each player, keyed by player ID.
         """
+        self.player_codecs = player_codecs or {}
         self.accept_commands_flag = asyncio.Event()
         self.send_game_state_flag = asyncio.Event()
         self.advance_game_state_flag = asyncio.Event()
+        # Number of times game states were encoded, one frame per state change is the target
+        self.encode_stats = EncodeStats()
+        # States sent to the players, so each update can be a patch against what a player already has
+        self.state_history = StateHistory()
     
     def get_accept_commands_flag(self):
         """
@@ -238,42 +330,46 @@ class ActionTranslator:
         Returns:
             dict: The translated network action.
         """
+        return project_game_state(game_state)
 
-        if game_state.get_phase() == "STARTING":
-            network_action = {'round': game_state.get_round(),
-                              'tricks': game_state.get_tricks(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "DEALING":
-            network_action = {'dealer': game_state.get_dealer(),
-                              'round': game_state.get_round(),
-                              'hands': game_state.get_hands(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "START_BIDDING":
-            network_action = {'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "BIDDING":
-            network_action = {'bids': game_state.get_bids(),
-                              'phase': game_state.get_phase()}
-        elif game_state.get_phase() == "START_PLAYING":
-            network_action = {'phase': game_state.get_phase(),
-                              'first_player': game_state.get_current_player()}
-        elif game_state.get_phase() == "PLAYING":
-            network_action = {'phase': game_state.get_phase(),
-                              'previous_player': game_state.get_previous_player(),
-                              'current_player': game_state.get_current_player(),
-                              'trick': game_state.get_trick(),
-                              'player_num': len(game_state.get_players())}
-        elif game_state.get_phase() == "RESOLVING":
-            network_action = {'trick_winner': game_state.get_trick_winner(),
-                              'phase': game_state.get_phase(),
-                              'hands': game_state.get_hands()}
-        elif game_state.get_phase() == "CALCULATE_SCORES":
-            network_action = {'score_sheet': game_state.get_score_sheet(),
-                              'phase': game_state.get_phase()}
- 
-        # self.set_send_game_state_flag(True)
-
-        # self.get_send_game_state_flag().set()
-        return network_action
+    def private_states_to_network(self, game_state):
+        """
+        Translates the parts of a game state only one player may see, such as their hand.
+        
+        Args:
+            game_state (GameState): The game state to translate.
+        
+        Returns:
+            dict: The private network state of each player, keyed by player ID.
+        """
+        return project_private_states(game_state)
+
+    def encode_state_frames(self, network_state, private_states, player_ids):
+        """
+        Numbers a state change and encodes its frames once, to be shared by every player's connection.
+        
+        Args:
+            network_state (dict): The translated public state.
+            private_states (dict): The translated private state of each player, keyed by player ID.
+            player_ids (list): The IDs of the players to encode frames for.
+        
+        Returns:
+            StateFrames: The encoded frames of every player.
+        """
+        self.state_history.push(network_state, private_states)
+        frames = StateFrames(self.state_history, player_ids, self.player_codecs)
+        self.encode_stats.record(frames)
+        return frames
+
+    def acknowledge_state(self, player_id, seq):
+        """
+        Records the last state a player has, which the player sends back with every response.
+        
+        Args:
+            player_id (str): The ID of the player.
+            seq (int): The sequence number of the player's state, None if the player needs the full state.
+        """
+        self.state_history.acknowledge(player_id, seq)
 
 class WebSocketServer:
     def __init__(self):
@@ -291,7 +387,7 @@ class WebSocketServer:
         self.game_states = {}
         # Lock for game actions
         self.game_actions_lock = Lock()
-        # Dictionary for game actions
+        # Dictionary for game action barriers
         self.game_actions = {}
         # Dictionary for client game map
         self.client_game_map = {}
@@ -309,6 +405,18 @@ class WebSocketServer:
         self.active_games_lock = Lock()
         # Lock for room safety
         self.room_lock = Lock()
+        # Codec negotiated with each player when they connected, keyed by player ID
+        self.player_codecs = {}
+        # Card catalog sent to every client when it connects, encoded once
+        self.catalog_message = self.make_message('catalog', catalog_to_network())
+        # Directory the event log and snapshots of every game are written to
+        self.event_log_directory = "game_logs"
+        # Seconds a room counts down once it has enough players
+        self.countdown_seconds = 10
+        # Tasks nothing awaits, such as broadcasts and game starts, kept so they are not garbage collected
+        self.background_tasks = set()
+        # Runs the countdown of every waiting room, and any other timer the server needs
+        self.timer_wheel = TimerWheel()
 
     def generate_unique_id(self):
         """
@@ -319,16 +427,32 @@ class WebSocketServer:
         """
         return str(uuid.uuid4())
 
-    async def monitor_waiting_rooms(self):
+    def spawn(self, coroutine):
         """
-        This function constantly monitors the waiting rooms to see if they're ready to start their game.
+        Runs a coroutine as a task that nothing awaits, holding on to it until it is done. The event loop only
+        keeps weak references to tasks, and nothing else would report the task's exception.
+
+        Args:
+            coroutine (coroutine): The coroutine to run.
+
+        Returns:
+            asyncio.Task: The task.
         """
-        while True:
-            for room in self.waiting_rooms:
-                if room.get_player_num() >= room.get_min_players() and not room.has_game_started():
-                    # room.set_game_started(True)
-                    await room.start_timer(10)
-            await asyncio.sleep(1)
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.task_done)
+        return task
+
+    def task_done(self, task):
+        """
+        Lets go of a task started with spawn once it is done, logging the exception it failed with.
+
+        Args:
+            task (asyncio.Task): The task.
+        """
+        self.background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Background task {task.get_coro().__qualname__} failed", exc_info=task.exception())
 
     async def find_available_room(self, player, client_socket):
         """
@@ -365,6 +489,18 @@ class WebSocketServer:
         new_room_name = "Room " + str(len(self.waiting_rooms) + 1) 
         return WaitingRoom(self, new_room_name)
     
+    async def send_frame(self, websocket, frame, frame_codec=codec.JSON_CODEC):
+        """
+        Sends an encoded frame as it is, so a frame shared by many websockets is never copied. JSON frames go
+        out as text frames, which browsers can parse, and binary codec frames as binary frames.
+
+        Args:
+            websocket (websockets.WebSocketServerProtocol): The websocket to send the frame to.
+            frame (bytes): The encoded frame.
+            frame_codec (str): The codec the frame was encoded with, see codec.py.
+        """
+        await websocket.send(frame, text=frame_codec != codec.BINARY_CODEC)
+
     def make_message(self, type, content):
         """
         Creates a JSON message.
@@ -380,15 +516,15 @@ class WebSocketServer:
     
     def decode_message(self, message):
         """
-        Decodes a JSON message.
+        Decodes a message sent with any of the codecs in codec.py.
 
         Args:
-            message (str): The JSON message to decode.
+            message (str or bytes): The message to decode.
 
         Returns:
             dict: The decoded message.
         """
-        return json.loads(message)
+        return codec.decode_message(message)
 
     async def handle_client(self, websocket):
         print(f"Handling new client: {websocket.remote_address}")
@@ -400,6 +536,7 @@ class WebSocketServer:
         # Add the websocket to the set of connected websockets
         self.connected.add(websocket)
         client_state = "INIT"
+        room = None
         
         while True:
             try:
@@ -414,6 +551,8 @@ class WebSocketServer:
                         print('No message received from client within 1 second')
                         continue  # Continue to the next iteration of the loop
                     player = self.decode_message(message)
+                    # Clients list the codecs they support, older clients only speak JSON
+                    self.player_codecs[player.get('player_id')] = codec.negotiate_codec(player.pop('codecs', None))
                     username = player.get('username')
                     print(f"Received Player: {player}")
                     logging.info(f"Received username...")
@@ -425,10 +564,21 @@ class WebSocketServer:
                     # # async with self.ack_lock:
                     # await self.ack_queue.put(ack)
 
+                    # Game states only carry card ids from here on
+                    await websocket.send(self.catalog_message)
                     room = await self.find_available_room(player, websocket)
+                    # A player added to a room already counting down missed the deadline broadcast
+                    joined_countdown = room.starts_at is not None
                     #logging.info(f"Room found for player {player}")
                     print(f"Here is the latest player: {room.players}")
                     await room.broadcast(self.make_message('INIT', room.players))
+                    if room.is_ready():
+                        room.start_timer(self.countdown_seconds)
+                    elif joined_countdown:
+                        # The deadline has not changed, only the player who just joined needs it. Another
+                        # player's handler may have started the countdown during the broadcast above, and
+                        # then this player was sent it with everyone else.
+                        await websocket.send(room.countdown_message())
                     # ack = await websocket.recv()
                     # await self.ack_queue.put(ack)
                     print("Here")
@@ -447,25 +597,27 @@ class WebSocketServer:
                     print("After...")
                     
                     # async with self.game_states_lock:
-                    game_state = self.game_states.get(game_id).get('game_state')
-                    print(f"Here is the game state right now: {game_state}")
-                    message = self.make_message('gameplay_data', game_state)
-                    await websocket.send(message)
+                    game_state_dict = self.game_states.get(game_id)
+                    print(f"Here is the game state right now: {game_state_dict.get('game_state')}")
+                    message = game_state_dict.get('frames').frame_for(player_id)
+                    await self.send_frame(websocket, message, self.player_codecs.get(player_id, codec.JSON_CODEC))
                     print(message)
                     response = await websocket.recv()
                     client_response = self.decode_message(response)
                     client_response_type = client_response.get('type')
+                    # Every response carries the last state the client has, the next update is a patch against it
+                    action_translator.acknowledge_state(player_id, client_response.get('seq'))
                     print("Here is the response", client_response, "with type: ", client_response_type)
                     if client_response_type == 'ack':
                         # async with self.game_actions_lock:
                         action_queue = self.game_actions.get(game_id)
-                        await action_queue.put(client_response)
+                        await action_queue.put(player_id, client_response)
                     elif client_response_type == 'action':
                         # async with self.game_actions_lock:
                         action_queue = self.game_actions.get(game_id)
                         client_command = client_response.get('payload')
                         game_action = action_translator.network_to_game_action(client_command, player_id)
-                        await action_queue.put(game_action)
+                        await action_queue.put(player_id, game_action)
                     if action_translator.get_send_game_state_flag().is_set():
                         action_translator.get_send_game_state_flag().clear()
                         print("Flag cleared")
@@ -477,6 +629,8 @@ class WebSocketServer:
             except Exception as e:
                 logging.error(f"Exception in handle_client for player {username}: {str(e)}")
                 print(f"Lost connection for player {player}")
+                if room is not None and not room.has_game_started():
+                    room.remove_player(websocket)
                 await websocket.close()
                 break
 
@@ -499,21 +653,26 @@ class WebSocketServer:
             player_sockets (list): The list of player sockets.
         """
         game_id = self.generate_unique_id()
+        player_codecs = {player.get('player_id'): self.player_codecs.get(player.get('player_id'), codec.JSON_CODEC)
+                         for player in players}
         async with self.game_actions_lock:
-            self.game_actions[game_id] = asyncio.Queue(maxsize=len(players))
+            self.game_actions[game_id] = ActionBarrier(len(players))
         async with self.game_states_lock:
             self.game_states[game_id] = {}
         async with self.action_translators_lock:
-            self.action_translators[game_id] = ActionTranslator()
+            self.action_translators[game_id] = ActionTranslator(player_codecs)
         async with self.game_state_acks_lock:
             self.game_state_acks[game_id] = asyncio.Queue(maxsize=len(players))
-        game = Game(players, game_id, self.action_translators.get(game_id), self.game_states.get(game_id), self.game_actions.get(game_id))
+        event_log = GameEventLog(self.event_log_directory, game_id)
+        game = Game(players, game_id, self.action_translators.get(game_id), self.game_states.get(game_id), self.game_actions.get(game_id),
+                    event_log=event_log)
+        logging.info(f"Game {game_id} created with seed {game.get_rng().get_seed()}")
         async with self.active_games_lock:
             self.active_games[game_id] = game
         for player_socket in player_sockets:
             self.client_game_map[player_socket] = game.get_game_id()
         room.set_game_started(True)
-        asyncio.create_task(self.run_game(game))
+        self.spawn(self.run_game(game))
 
     async def run_game(self, game):
         """
@@ -529,8 +688,8 @@ class WebSocketServer:
         start_server = websockets.serve(self.handle_client, "192.168.86.34", 8765, reuse_port=True)
         # Run the server until it is complete
         asyncio.get_event_loop().run_until_complete(start_server)
-        # Start the waiting room monitor
-        asyncio.get_event_loop().create_task(self.monitor_waiting_rooms())
+        # Start the timer wheel, which counts down every waiting room
+        asyncio.get_event_loop().create_task(self.timer_wheel.run())
         # Start the acknowledgement monitor
         asyncio.get_event_loop().create_task(self.monitor_acknowledgements())
         # Keep the server running forever  